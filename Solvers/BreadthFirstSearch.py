@@ -4,139 +4,261 @@ How to Solve a Maze using BFS in Python by Timur Bakibayev:
 https://levelup.gitconnected.com/solve-a-maze-with-python-e9f0580979a1
 """
 
-from PIL import Image, ImageDraw
-import maze_data_generated_mazemate as maze_data
+from collections import deque
+
+import numpy as np
+from maze import Maze, as_maze
+from search_stats import phase
+from jump_point_search import solve_jps
+from wavefront import wavefront_levels
 
-images = []
 zoom = 20
 borders = 6
 
-def solve_bfs(a, start, end):
+def solve_bfs(a, start=None, end=None, mode="queue", sink=None, stats=None):
     """
     Solves the maze 'a' from 'start' to 'end' using BFS.
     start and end are (x, y) tuples corresponding to (column, row).
+    'a' is a list of rows, a Maze or a .maze file (whose start/end are
+    used by default).
     Returns the path as a list of coordinates (x, y).
+
+    Animation frames are passed to 'sink' (see frame_sinks.py) as they are
+    drawn. With sink=None nothing is rendered, and since no frame state is
+    shared between calls, several solves can run at once in threads.
+
+    mode="queue" grows the wavefront from a FIFO queue, so each cell is
+    visited once and the search stops as soon as 'end' is reached (with a
+    sink, once its level is complete, so the frames match mode="scan").
+    mode="scan" is the original version that rescans the whole grid for
+    every distance k (slow, but easy to follow when teaching).
+    mode="wavefront" labels whole BFS levels at once with NumPy
+    (wavefront.py); it builds the same distance map and path as "queue",
+    and is much faster on large open grids.
+    mode="jps" uses Jump Point Search (jump_point_search.py): a path of the
+    same length, found with far fewer expansions in open rooms. It has no
+    wavefront, so only the finished path is drawn.
+
+    stats, a search_stats.SearchStats, collects the counters (expanded =
+    cells labelled, levels, pops, peak_frontier = largest wavefront,
+    frames) and the "search", "render" and "backtrack" phase times. In
+    queue mode its frontier callback gets the queue between levels.
     """
+    a = as_maze(a)
+    if isinstance(a, Maze):
+        start = a.start if start is None else start
+        end = a.end if end is None else end
+        # wavefront mode works on the NumPy grid and never needs list rows
+        a = a.grid if mode == "wavefront" else a.rows()
     start_x, start_y = start
     end_x, end_y = end
+    rows, cols = len(a), len(a[0])
     
     # Check if start or end are walls
     if a[start_y][start_x] == 1 or a[end_y][end_x] == 1:
         print(f"Error: Start {start} or End {end} is inside a wall.")
         return []
 
-    m = []
-    for i in range(len(a)):
-        m.append([])
-        for j in range(len(a[i])):
-            m[-1].append(0)
-    
-    # m[row][col] represents distance/visited
-    m[start_y][start_x] = 1
+    # m[i * cols + j] represents distance/visited of row i, col j
+    m = [0] * (rows * cols)
+    m[start_y * cols + start_x] = 1
+    end_idx = end_y * cols + end_x
 
     def make_step(k):
-        for i in range(len(m)):
-            for j in range(len(m[i])):
-                if m[i][j] == k:
+        for i in range(rows):
+            for j in range(cols):
+                if m[i * cols + j] == k:
                     # Directions: Up, Left, Down, Right
                     # i is row (y), j is col (x)
-                    if i > 0 and m[i - 1][j] == 0 and a[i - 1][j] == 0:
-                        m[i - 1][j] = k + 1
-                    if j > 0 and m[i][j - 1] == 0 and a[i][j - 1] == 0:
-                        m[i][j - 1] = k + 1
-                    if i < len(m) - 1 and m[i + 1][j] == 0 and a[i + 1][j] == 0:
-                        m[i + 1][j] = k + 1
-                    if j < len(m[i]) - 1 and m[i][j + 1] == 0 and a[i][j + 1] == 0:
-                        m[i][j + 1] = k + 1
-
-    def draw_matrix(the_path=[]):
-        im = Image.new('RGB', (zoom * len(a[0]), zoom * len(a)), (255, 255, 255))
-        draw = ImageDraw.Draw(im)
-        for i in range(len(a)):
-            for j in range(len(a[i])):
-                color = (255, 255, 255)
-                r = 0
-                if a[i][j] == 1:
-                    color = (0, 0, 0)
-                if i == start_y and j == start_x:
-                    color = (0, 255, 0)
-                    r = borders
-                if i == end_y and j == end_x:
-                    color = (0, 255, 0)
-                    r = borders
-                draw.rectangle((j * zoom + r, i * zoom + r, j * zoom + zoom - r - 1, i * zoom + zoom - r - 1), fill=color)
-                if m[i][j] > 0:
-                    r = borders
-                    draw.ellipse((j * zoom + r, i * zoom + r, j * zoom + zoom - r - 1, i * zoom + zoom - r - 1),
-                                 fill=(255, 0, 0))
-        for u in range(len(the_path) - 1):
-            # Path coordinates are (x, y) -> (col, row)
-            # x is index 0 of tuple, y is index 1
-            x = the_path[u][0] * zoom + int(zoom / 2)
-            y = the_path[u][1] * zoom + int(zoom / 2)
-            x1 = the_path[u + 1][0] * zoom + int(zoom / 2)
-            y1 = the_path[u + 1][1] * zoom + int(zoom / 2)
-            draw.line((x, y, x1, y1), fill=(255, 0, 0), width=5)
-        draw.rectangle((0, 0, zoom * len(a[0]), zoom * len(a)), outline=(0, 255, 0), width=2)
-        images.append(im)
-
-    k = 0
+                    if i > 0 and m[(i - 1) * cols + j] == 0 and a[i - 1][j] == 0:
+                        m[(i - 1) * cols + j] = k + 1
+                    if j > 0 and m[i * cols + j - 1] == 0 and a[i][j - 1] == 0:
+                        m[i * cols + j - 1] = k + 1
+                    if i < rows - 1 and m[(i + 1) * cols + j] == 0 and a[i + 1][j] == 0:
+                        m[(i + 1) * cols + j] = k + 1
+                    if j < cols - 1 and m[i * cols + j + 1] == 0 and a[i][j + 1] == 0:
+                        m[i * cols + j + 1] = k + 1
+
+    def expand_level(queue, k):
+        # Pop every cell at distance k and push its unvisited neighbours,
+        # stopping as soon as the end cell has been labelled. With a sink
+        # the level is finished, so the last frame shows all of it as in
+        # scan mode. Returns the number of cells popped.
+        level = len(queue)
+        for p in range(level):
+            idx = queue.popleft()
+            i, j = divmod(idx, cols)
+            for n, ok in ((idx - cols, i > 0), (idx - 1, j > 0),
+                          (idx + cols, i < rows - 1), (idx + 1, j < cols - 1)):
+                if ok and m[n] == 0 and free[n]:
+                    m[n] = k + 1
+                    if n == end_idx and sink is None:
+                        return p + 1
+                    queue.append(n)
+        return level
+
+    def make_canvas():
+        # the static layer: walls, start/end squares and the green border,
+        # plus the dot marking a visited cell (raster needs PIL, so it is
+        # only imported once something is drawn)
+        from raster import TileCanvas, shape_mask
+
+        grid = np.array(a)
+        canvas = TileCanvas(rows, cols, zoom)
+        canvas.fill_cells(grid == 1, (0, 0, 0))
+        square = shape_mask(zoom, "rectangle", (borders, borders, zoom - borders - 1, zoom - borders - 1))
+        canvas.stamp([start_y, end_y], [start_x, end_x], square, (0, 255, 0))
+        canvas.outline((0, 255, 0), 2)
+        dot = shape_mask(zoom, "ellipse", (borders, borders, zoom - borders - 1, zoom - borders - 1))
+        return canvas, dot
+
+    def draw_frame(the_path=()):
+        # only the cells labelled since the last frame and new path segments are drawn
+        if not canvas:
+            canvas.extend(make_canvas())
+        canvas[0].stamp_flat(pending, canvas[1], (255, 0, 0))
+        pending.clear()
+        canvas[0].draw_path(the_path, (255, 0, 0), width=5)
+        return canvas[0].image()
+
+    def add_frame(the_path=()):
+        if sink is not None and sink.wants():
+            with phase(stats, "render"):
+                sink.add(draw_frame(the_path))
+            frames[0] += 1
+
+    def hold_final(the_path):
+        if sink is not None and sink.wants(final=True):
+            with phase(stats, "render"):
+                im = draw_frame(the_path)
+                for _ in range(10): # Hold final frame
+                    sink.add(im)
+            frames[0] += 10
+
+    def record(levels):
+        if stats is not None:
+            stats.count("searches")
+            stats.count("expanded", int(np.count_nonzero(m)))
+            stats.count("levels", levels)
+            stats.count("pops", pops)
+            stats.count("frames", frames[0])
+            stats.peak("peak_frontier", peak)
+
+    k = pops = peak = 0
+    frames = [0]
+    canvas = []  # the TileCanvas and the dot mask, made when the first frame is drawn
+    pending = [start_y * cols + start_x]  # labelled cells not drawn yet
     # BFS Expansion
-    while m[end_y][end_x] == 0:
-        k += 1
-        make_step(k)
-        draw_matrix()
-        
-        # Safety break if unreachable
-        if k > len(a) * len(a[0]): 
+    if mode == "queue":
+        # free[i * cols + j] is 1 for open cells, so the hot loop avoids nested lists
+        free = bytearray(1 if v == 0 else 0 for row in a for v in row)
+        queue = deque([start_y * cols + start_x])
+        next_sample = stats.first_sample() if stats is not None else -1
+        with phase(stats, "search"):
+            while m[end_idx] == 0:
+                k += 1
+                if len(queue) > peak:
+                    peak = len(queue)
+                pops += expand_level(queue, k)
+                if sink is not None:
+                    pending.extend(queue)
+                if 0 <= next_sample <= pops:
+                    stats.sample("bfs", pops, pops + len(queue), queue, k)
+                    next_sample = pops + stats.sample_every
+                add_frame()
+
+                # Queue ran dry before reaching the end
+                if m[end_idx] == 0 and not queue:
+                    print("Target unreachable from Start.")
+                    record(k)
+                    return []
+    elif mode == "scan":
+        with phase(stats, "search"):
+            while m[end_idx] == 0:
+                k += 1
+                make_step(k)
+                if sink is not None:
+                    pending.extend(idx for idx, v in enumerate(m) if v == k + 1)
+                add_frame()
+
+                # Safety break if unreachable
+                if k > rows * cols:
+                    print("Target unreachable from Start.")
+                    record(k)
+                    return []
+    elif mode == "wavefront":
+        # m becomes a NumPy array; backtracking below indexes it the same way
+        m = np.zeros(rows * cols, dtype=np.int32)
+        m[start_y * cols + start_x] = 1
+        free = (np.asarray(a) == 0).ravel()
+        with phase(stats, "search"):
+            levels = wavefront_levels(free, cols, start_y * cols + start_x, m) if m[end_idx] == 0 else ()
+            for k, cells in levels:
+                k -= 1  # the level that labelled 'cells', as in the other modes
+                pops += len(cells)
+                if len(cells) > peak:
+                    peak = len(cells)
+                if sink is not None:
+                    pending.extend(cells.tolist())
+                add_frame()
+                if m[end_idx]:
+                    break
+        if m[end_idx] == 0:
             print("Target unreachable from Start.")
+            record(k)
             return []
+    elif mode == "jps":
+        # value 2 cells stay walls except at the endpoints, as in the other modes
+        the_path = solve_jps(a, start, end, bridges={}, stats=stats)
+        if the_path:
+            hold_final(the_path)
+        return the_path
+    else:
+        raise ValueError(f"Unknown BFS mode: {mode!r}")
+
+    levels = k
 
     # Backtracking to find path
     # i is row (y), j is col (x)
-    i, j = end_y, end_x
-    k = m[i][j]
-    # Path stored as (x, y)
-    the_path = [(j, i)] 
-    while k > 1:
-        if i > 0 and m[i - 1][j] == k - 1:
-            i, j = i - 1, j
-            the_path.append((j, i))
-            k -= 1
-        elif j > 0 and m[i][j - 1] == k - 1:
-            i, j = i, j - 1
-            the_path.append((j, i))
-            k -= 1
-        elif i < len(m) - 1 and m[i + 1][j] == k - 1:
-            i, j = i + 1, j
-            the_path.append((j, i))
-            k -= 1
-        elif j < len(m[i]) - 1 and m[i][j + 1] == k - 1:
-            i, j = i, j + 1
+    with phase(stats, "backtrack"):
+        i, j = end_y, end_x
+        k = m[end_idx]
+        # Path stored as (x, y)
+        the_path = [(j, i)] 
+        while k > 1:
+            if i > 0 and m[(i - 1) * cols + j] == k - 1:
+                i, j = i - 1, j
+            elif j > 0 and m[i * cols + j - 1] == k - 1:
+                i, j = i, j - 1
+            elif i < rows - 1 and m[(i + 1) * cols + j] == k - 1:
+                i, j = i + 1, j
+            elif j < cols - 1 and m[i * cols + j + 1] == k - 1:
+                i, j = i, j + 1
             the_path.append((j, i))
             k -= 1
-        draw_matrix(the_path)
+            add_frame(the_path)
 
-    for _ in range(10): # Hold final frame
-        draw_matrix(the_path)
-    
+    hold_final(the_path)
+    record(levels)
     # Return path reversed (Start -> End)
     return the_path[::-1]
 
 # --- Main Execution ---
 
 if __name__ == "__main__":
-    # 1. Setup Data
-    maze_grid = maze_data.maze_grid
-    start_pos = maze_data.start
-    end_pos = maze_data.end
+    import maze_data_generated_mazemate as maze_data
+    from frame_sinks import GifSink
+
+    # 1. Setup Data (this demo uses the MazeMate coordinates unflipped)
+    maze = Maze.from_module(maze_data, flip_y=False)
+    start_pos = maze.start
+    end_pos = maze.end
     
     # MODIFICATION FOR DEMO: 
     # Open a detour path and place a heart there to show "out of the way" logic
-    # Open Wall at (2,1) - Row 1, Col 2
-    maze_grid[1][2] = 0
-    # Open Wall at (4,2) - Row 2, Col 4
-    maze_grid[2][4] = 0
+    # Open Wall at (2,1) - Row 1, Col 2 and at (4,2) - Row 2, Col 4
+    # (an overlay, so maze_data itself is left untouched)
+    maze = maze.open_cells([(2, 1), (4, 2)])
     
     # Set Heart to Top Right (6, 1) which requires a detour
     heart_positions = [(6, 1)]
@@ -148,12 +270,11 @@ if __name__ == "__main__":
     # SCENARIO 1: Direct Path (Start -> Goal)
     # ==========================================
     print(f"Solving Maze directly from {start_pos} to {end_pos}...")
-    images = [] # Reset images
-    path = solve_bfs(maze_grid, start_pos, end_pos)
+    with GifSink('maze_sols/default_bfs_sol.gif', duration=50) as sink:
+        path = solve_bfs(maze, sink=sink)
     print("Direct Path found:", path)
 
-    if images:
-        images[0].save('maze_sols/default_bfs_sol.gif', save_all=True, append_images=images[1:], optimize=False, duration=50, loop=0)
+    if sink.written:
         print("Direct animation saved to 'maze_sols/default_bfs_sol.gif'")
 
     # ==========================================
@@ -165,31 +286,30 @@ if __name__ == "__main__":
         target_heart = heart_positions[0]
         print(f"Attempting to visit Heart at {target_heart} first...")
         
-        # Reset images for the new animation so it doesn't include the previous run
-        images = [] 
-        
-        # Step 1: Start -> Heart
+        # Step 1: Start -> Heart, Step 2: Heart -> End
         print("  Segment 1: Start -> Heart")
-        path_to_heart = solve_bfs(maze_grid, start_pos, target_heart)
-        
+        path_to_heart = solve_bfs(maze, start_pos, target_heart)
+        path_to_end = []
         if path_to_heart:
-            # Step 2: Heart -> End
             print("  Segment 2: Heart -> Goal")
-            path_to_end = solve_bfs(maze_grid, target_heart, end_pos)
-            
-            if path_to_end:
-                # Step 3: Combine
-                # path_to_end[1:] skips the duplicate Heart position
-                full_path = path_to_heart + path_to_end[1:] 
-                print("Full Path via Heart:", full_path)
-                
-                # Save the combined animation
-                if images:
-                    images[0].save('maze_sols/heart_bfs_sol.gif', save_all=True, append_images=images[1:], optimize=False, duration=50, loop=0)
-                    print("Heart-visiting animation saved to 'maze_sols/heart_bfs_sol.gif'")
-            else:
-                print("Could not reach Goal from Heart.")
-        else:
+            path_to_end = solve_bfs(maze, target_heart, end_pos)
+
+        if not path_to_heart:
             print("Could not reach Heart from Start.")
+        elif not path_to_end:
+            print("Could not reach Goal from Heart.")
+        else:
+            # Step 3: Combine
+            # path_to_end[1:] skips the duplicate Heart position
+            full_path = path_to_heart + path_to_end[1:]
+            print("Full Path via Heart:", full_path)
+
+            # Both legs are reachable, so animate them into one GIF; a new sink,
+            # so the animation doesn't include the previous run
+            with GifSink('maze_sols/heart_bfs_sol.gif', duration=50) as sink:
+                solve_bfs(maze, start_pos, target_heart, sink=sink)
+                solve_bfs(maze, target_heart, end_pos, sink=sink)
+            if sink.written:
+                print("Heart-visiting animation saved to 'maze_sols/heart_bfs_sol.gif'")
     else:
         print("No hearts defined in maze_data!")
@@ -4,27 +4,11 @@ Solving Maze with Python by Max Reynolds:
 https://towardsdatascience.com/solving-mazes-with-python-f7a412f2493f
 """
 
-import cv2  # install opencv-python package to use cv2
-import matplotlib.pyplot as plt  # install matplotlib package to use pyplot
 import numpy as np
+import heapq
 
-# draw starting and ending points in maze image
-# default maze - mazes/dijkstra_default.png
-img = cv2.imread('mazes/dijkstra_default.png')  # read an image from a file using
-cv2.circle(img, (25, 5), 3, (0, 0, 255), -1)  # add a circle at (25, 5) - start point - blue
-cv2.circle(img, (9, 220), 3, (255, 0, 0), -1)  # add a circle at (9, 220) - end point - red
-
-"""
-your maze - dijkstra_maze.png --- TO CHANGE FOR YOUR MAZE DESIGN ---
-"""
-# img = cv2.imread('mazes/dijkstra_maze.png')  # read an image from a file using
-# cv2.circle(img, (40, 35), 3, (0, 0, 255), -1)  # add a circle at (40, 35) - start point - blue
-# cv2.circle(img, (180, 190), 3, (255, 0, 0), -1)  # add a circle at (180, 190) - end point - red
-
-
-plt.figure()
-plt.imshow(img)  # show the image
-plt.show()
+from maze import Maze, as_maze
+from search_stats import phase
 
 """
 DO NOT NEED TO CHANGE THIS SECTION --- START
@@ -104,6 +88,8 @@ def get_distance(img, u, v):
 
 
 def drawPath(img, path, thickness=2):  # path is a list of (x, y) tuples
+    import cv2  # install opencv-python package to use cv2
+
     x0, y0 = path[0]
     for vertex in path[1:]:
         x1, y1 = vertex
@@ -111,7 +97,7 @@ def drawPath(img, path, thickness=2):  # path is a list of (x, y) tuples
         x0, y0 = vertex
 
 
-def find_shortest_path(img, src, dst):
+def find_shortest_path_legacy(img, src, dst):
     pq = []  # min-heap priority queue
     source_x = src[0]
     source_y = src[1]
@@ -171,18 +157,299 @@ def find_shortest_path(img, src, dst):
 DO NOT NEED TO CHANGE THIS SECTION --- END
 """
 
-# draw shortest route in maze
-# default maze - dijkstra_default.png
-img = cv2.imread('mazes\dijkstra_default.png')  # read an image from a file using opencv (cv2) library
-p = find_shortest_path(img, (25, 5), (9, 220))  # call the function with image, start point and end point
+# pre-computed edge weights and a heapq engine for find_shortest_path
+def down_right_weights(img):
+    """
+    Computes get_distance() for every down and right edge of the image in one
+    NumPy pass: down[r][c] is the weight of the edge from (r, c) to (r + 1, c)
+    and right[r][c] the weight from (r, c) to (r, c + 1). Edges that leave
+    the image have weight inf. The weight is symmetric, so the up and left
+    edges of (r, c) are down[r - 1][c] and right[r][c - 1].
+    """
+    rows, cols = img.shape[0], img.shape[1]
+    down = np.full((rows, cols), np.inf)
+    right = np.full((rows, cols), np.inf)
+    # one channel at a time, in the same operation order as get_distance,
+    # so the weights are bit-identical and no float copy of the image is made
+    for plane, a, b in ((down[:-1], img[:-1], img[1:]), (right[:, :-1], img[:, :-1], img[:, 1:])):
+        plane[:] = 0.1
+        for ch in range(3):
+            diff = b[:, :, ch].astype(np.float64)
+            diff -= a[:, :, ch]
+            diff **= 2
+            plane += diff
+    return down, right
+
+
+def trace_path(parent, cols, src, dst):
+    # walk the parent indices back from dst, in the same (x, y) format as
+    # find_shortest_path_legacy: [dst, dst, ..., src]
+    source = src[1] * cols + src[0]
+    path = [dst]
+    v = dst[1] * cols + dst[0]
+    while v != source:
+        path.append((v % cols, v // cols))
+        v = int(parent[v])
+    path.append(src)
+    return path
 
-"""
-your maze - dijkstra_maze.png --- TO CHANGE FOR YOUR MAZE DESIGN ---
-"""
-# img = cv2.imread('mazes\dijkstra_maze.png')  # read an image from a file using opencv (cv2) library
-# p = find_shortest_path(img, (40, 35), (180, 190))
 
-drawPath(img, p)
-plt.figure()
-plt.imshow(img)  # show the image on the screen
-plt.show()
+def new_search_state(n, store):
+    """
+    Per-pixel search state (dist, parent, processed), addressed by flat
+    index r * cols + c. store="list" uses Python lists, which are the
+    fastest to index. store="array" uses contiguous NumPy arrays (float64
+    distance, int32 parent, bool processed): 13 bytes per pixel instead of
+    one Python Vertex object each, at the cost of slower element access.
+    """
+    if store == "list":
+        return [float('inf')] * n, [-1] * n, bytearray(n)
+    if store == "array":
+        return (np.full(n, np.inf), np.full(n, -1, dtype=np.int32 if n < 2 ** 31 else np.int64),
+                np.zeros(n, dtype=bool))
+    raise ValueError(f"Unknown Dijkstra store: {store!r}")
+
+
+def flat_weights(img, store):
+    # down/right weight planes, flattened to match the search state
+    down, right = down_right_weights(img)
+    if store == "list":
+        return down.ravel().tolist(), right.ravel().tolist()
+    return down.ravel(), right.ravel()
+
+
+def dijkstra_search(down, right, cols, source, target, state, heuristic=None, stats=None):
+    """
+    Dijkstra on flat pixel indices with heapq and lazy deletion: a pixel is
+    pushed again whenever its distance improves, and stale entries are
+    skipped when they are popped. Neighbours are relaxed in the same order
+    as get_neighbors (up, down, left, right).
+    target=None settles every pixel, otherwise the search stops as soon as
+    target is settled. heuristic(v), if given, is added to the queue key (A*).
+    Returns the number of settled pixels.
+    """
+    dist, parent, processed = state
+    inf = float('inf')
+    dist[source] = 0
+    pq = [(0.0, source)]
+    settled = pops = 0
+    tracing = stats is not None
+    peak = 1
+    next_sample = stats.first_sample() if tracing else -1
+
+    while pq:
+        if tracing:
+            if len(pq) > peak:
+                peak = len(pq)
+            if pops == next_sample:
+                stats.sample("dijkstra", pops, settled, pq, pq[0][0])
+                next_sample += stats.sample_every
+        u = heapq.heappop(pq)[1]
+        pops += 1
+        if processed[u]:
+            continue  # stale entry, u was settled with a smaller distance
+        processed[u] = True
+        settled += 1
+        if u == target:
+            break
+
+        d = float(dist[u])
+        # weight inf means the edge leaves the image
+        for v, w in ((u - cols, down[u - cols] if u >= cols else inf), (u + cols, down[u]),
+                     (u - 1, right[u - 1] if u % cols else inf), (u + 1, right[u])):
+            if w == inf or processed[v]:
+                continue
+            nd = d + float(w)
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd + heuristic(v) if heuristic else nd, v))
+    if tracing:
+        stats.record_heap(pops, settled, len(pq), peak)
+    return settled
+
+
+def bidirectional_search(down, right, cols, source, target, forward, backward, stats=None):
+    """
+    Dijkstra from source and from target at the same time, always advancing
+    the side with the smaller queue key. The weights are symmetric, so the
+    backward search uses the same planes. Stops once the two smallest keys
+    add up to at least the best source-target distance seen so far.
+    Returns (meeting edge, settled count); the meeting edge (a, b) means
+    source ... a is in forward's parents and b ... target in backward's.
+    """
+    inf = float('inf')
+    forward[0][source] = 0
+    backward[0][target] = 0
+    queues = ([(0.0, source)], [(0.0, target)])
+    best, meet, settled = inf, (source, target), 0
+    if source == target:
+        return (source, source), 0
+    pops = 0
+    tracing = stats is not None
+    peak = 2
+    next_sample = stats.first_sample() if tracing else -1
+
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        pq = queues[side]
+        dist, parent, processed = (forward, backward)[side]
+        other_dist = (backward, forward)[side][0]
+
+        if tracing:
+            size = len(queues[0]) + len(queues[1])
+            if size > peak:
+                peak = size
+            if pops == next_sample:
+                stats.sample("bidirectional", pops, settled, pq, pq[0][0])
+                next_sample += stats.sample_every
+        d, u = heapq.heappop(pq)
+        pops += 1
+        if processed[u]:
+            continue
+        processed[u] = True
+        settled += 1
+
+        for v, w in ((u - cols, down[u - cols] if u >= cols else inf), (u + cols, down[u]),
+                     (u - 1, right[u - 1] if u % cols else inf), (u + 1, right[u])):
+            if w == inf or processed[v]:
+                continue
+            nd = d + float(w)
+            if nd < dist[v]:
+                dist[v] = nd
+                parent[v] = u
+                heapq.heappush(pq, (nd, v))
+            # the two searches touch: source ... u - v ... target
+            if nd + other_dist[v] < best:
+                best = nd + float(other_dist[v])
+                meet = (u, v) if side == 0 else (v, u)
+    if tracing:
+        stats.record_heap(pops, settled, len(queues[0]) + len(queues[1]), peak, initial=2)
+    return meet, settled
+
+
+def chain(parent, v, stop):
+    # pixel indices from v back to stop, following parent
+    out = [v]
+    while v != stop:
+        v = int(parent[v])
+        out.append(v)
+    return out
+
+
+def find_shortest_path(img, src=None, dst=None, engine="heapq", store="list", mode="full", stats=None):
+    """
+    Shortest path from src to dst, both (x, y). Returns the path from dst
+    back to src as a list of (x, y) tuples: [dst, dst, ..., src].
+    img is a cv2 image, an image Maze or a .maze file with an image
+    (whose start/end are the defaults).
+
+    engine="heapq" is the fast engine above; engine="legacy" is the
+    original Vertex/bubble_up implementation.
+    store picks how the heapq engine keeps its per-pixel state: "list"
+    (Python lists, fastest) or "array" (NumPy arrays, for very large images).
+    mode picks how much of the image the heapq engine explores:
+        "full"          - settle every pixel, like the original
+        "early"         - stop as soon as dst is settled
+        "astar"         - early exit plus a 0.1-per-step Manhattan heuristic
+                          (0.1 is the smallest possible get_distance)
+        "bidirectional" - search from src and dst at once until they meet
+    stats, a search_stats.SearchStats, collects the search counters
+    (expanded = settled pixels) and the time spent in the "weights",
+    "search" and "trace" phases.
+    """
+    img = as_maze(img)
+    if isinstance(img, Maze):
+        if img.image is None:
+            raise ValueError("find_shortest_path needs an image maze")
+        src = img.start if src is None else src
+        dst = img.end if dst is None else dst
+        img = img.image
+    if engine == "legacy":
+        if mode != "full":
+            raise ValueError("The legacy engine only supports mode='full'")
+        with phase(stats, "search"):
+            path = find_shortest_path_legacy(img, src, dst)
+        if stats is not None:
+            stats.count("searches")
+            stats.count("expanded", img.shape[0] * img.shape[1])
+        return path
+    if engine != "heapq":
+        raise ValueError(f"Unknown Dijkstra engine: {engine!r}")
+
+    rows, cols = img.shape[0], img.shape[1]
+    n = rows * cols
+    source = src[1] * cols + src[0]
+    target = dst[1] * cols + dst[0]
+    if mode not in ("full", "early", "astar", "bidirectional"):
+        raise ValueError(f"Unknown Dijkstra mode: {mode!r}")
+    with phase(stats, "weights"):
+        state = new_search_state(n, store)
+        down, right = flat_weights(img, store)
+
+    if mode == "bidirectional":
+        with phase(stats, "weights"):
+            backward = new_search_state(n, store)
+        with phase(stats, "search"):
+            a, b = bidirectional_search(down, right, cols, source, target, state, backward, stats)[0]
+        with phase(stats, "trace"):
+            # target ... b from the backward parents, then a ... source from the forward ones
+            pixels = chain(backward[1], b, target)[::-1] if b != a else []
+            pixels += chain(state[1], a, source)
+            path = [dst] + [(v % cols, v // cols) for v in pixels]
+        return path
+
+    heuristic = None
+    if mode == "full":
+        target = None
+    elif mode == "astar":
+        step = 0.1 * (1 - 1e-9)  # a hair below 0.1, so float rounding never overestimates
+        tx, ty = dst
+
+        def heuristic(v):
+            return step * (abs(v % cols - tx) + abs(v // cols - ty))
+
+    with phase(stats, "search"):
+        dijkstra_search(down, right, cols, source, target, state, heuristic, stats)
+    with phase(stats, "trace"):
+        return trace_path(state[1], cols, src, dst)
+
+
+if __name__ == "__main__":
+    import cv2  # install opencv-python package to use cv2
+    import matplotlib.pyplot as plt  # install matplotlib package to use pyplot
+
+    # draw starting and ending points in maze image
+    # default maze - mazes/dijkstra_default.png
+    img = cv2.imread('mazes/dijkstra_default.png')  # read an image from a file using
+    cv2.circle(img, (25, 5), 3, (0, 0, 255), -1)  # add a circle at (25, 5) - start point - blue
+    cv2.circle(img, (9, 220), 3, (255, 0, 0), -1)  # add a circle at (9, 220) - end point - red
+
+    """
+    your maze - dijkstra_maze.png --- TO CHANGE FOR YOUR MAZE DESIGN ---
+    """
+    # img = cv2.imread('mazes/dijkstra_maze.png')  # read an image from a file using
+    # cv2.circle(img, (40, 35), 3, (0, 0, 255), -1)  # add a circle at (40, 35) - start point - blue
+    # cv2.circle(img, (180, 190), 3, (255, 0, 0), -1)  # add a circle at (180, 190) - end point - red
+
+    plt.figure()
+    plt.imshow(img)  # show the image
+    plt.show()
+
+    # draw shortest route in maze
+    # default maze - dijkstra_default.png
+    img = cv2.imread('mazes/dijkstra_default.png')  # read an image from a file using opencv (cv2) library
+    p = find_shortest_path(img, (25, 5), (9, 220))  # call the function with image, start point and end point
+
+    """
+    your maze - dijkstra_maze.png --- TO CHANGE FOR YOUR MAZE DESIGN ---
+    """
+    # img = cv2.imread('mazes/dijkstra_maze.png')  # read an image from a file using opencv (cv2) library
+    # p = find_shortest_path(img, (40, 35), (180, 190))
+
+    drawPath(img, p)
+    plt.figure()
+    plt.imshow(img)  # show the image on the screen
+    plt.show()
@@ -4,10 +4,12 @@ How to Solve a Maze using BFS in Python by Timur Bakibayev:
 https://levelup.gitconnected.com/solve-a-maze-with-python-e9f0580979a1
 """
 
-from PIL import Image, ImageDraw
-import maze_data_generated_mazemate as maze_data
+import numpy as np
+from maze import Maze, as_maze
+from search_stats import phase
 import itertools
-import copy
+import math
+from concurrent.futures import ProcessPoolExecutor
 
 monster_stats = {
     "Bat": {"damage": 20, "freq": 1},
@@ -29,15 +31,79 @@ step_score = 50
 
 import heapq
 
-def solve_dijkstra_complex(a, start, end, current_health, bridges, current_monsters):
+def unpack_level(a, bridges=None, monsters=None):
+    # A Maze (or .maze file) supplies its own grid rows, bridges and
+    # monsters; plain lists need them passed in (missing ones mean none)
+    a = as_maze(a)
+    if isinstance(a, Maze):
+        return (a.rows(), a.bridge_dict() if bridges is None else bridges,
+                a.monster_dict() if monsters is None else monsters)
+    return a, bridges or {}, monsters or {}
+
+
+def unpack_plan(grid, start, end, gems, monsters, bridges):
+    # Planner arguments, with anything left as None taken from a Maze
+    grid = as_maze(grid)
+    if isinstance(grid, Maze):
+        maze = grid
+        grid, bridges, monsters = unpack_level(maze, bridges, monsters)
+        start = maze.start if start is None else start
+        end = maze.end if end is None else end
+        gems = maze.gem_list() if gems is None else gems
+        return grid, start, end, gems, monsters, bridges
+    return grid, start, end, gems or [], monsters or {}, bridges or {}
+
+
+def add_monster_damage(field, pos, kind, sign=1):
+    # Adds (sign=1) or removes (sign=-1) one monster's damage in its 3x3 window:
+    # its neighbours take proximity damage, its own tile the contact damage
+    x, y = pos
+    rows, cols = field.shape
+    if not (-1 <= x <= cols and -1 <= y <= rows):
+        return  # too far outside the grid to reach any tile
+    stat = monster_stats[kind]
+    field[max(y - 1, 0):y + 2, max(x - 1, 0):x + 2] += sign * stat["damage"]
+    if 0 <= x < cols and 0 <= y < rows:
+        field[y, x] += sign * (stat["damage"] * stat["freq"] - stat["damage"])
+
+
+def build_damage_field(shape, monsters):
+    """
+    Damage taken when stepping onto each tile, as an int32 array indexed
+    [y, x]: contact damage (damage * freq) of a monster on the tile plus the
+    damage of every monster in the 8 surrounding tiles.
+    """
+    field = np.zeros(shape, dtype=np.int32)
+    for pos, kind in monsters.items():
+        add_monster_damage(field, pos, kind)
+    return field
+
+
+def solve_dijkstra_complex(a, start, end, current_health, bridges=None, current_monsters=None, damage_field=None,
+                           stats=None, engine="heapq"):
+    # stats (a search_stats.SearchStats) collects the queue counters and the
+    # "setup" and "search" phase times. engine="buckets" runs the same search
+    # on a bucket queue (see dial_search) and returns the same result.
+    a, bridges, current_monsters = unpack_level(a, bridges, current_monsters)
+    if engine == "buckets":
+        return dial_search(a, start, end, current_health, bridges, current_monsters, damage_field, stats)
+    if engine != "heapq":
+        raise ValueError(f"Unknown complex engine: {engine!r}")
     start_x, start_y = start
     end_x, end_y = end
-    
-    # score_matrix[y][x] stores the highest score achieved to reach this tile
-    # Initialize with negative infinity
-    score_matrix = [[-float('inf') for _ in range(len(a[0]))] for _ in range(len(a))]
-    parent_matrix = [[None for _ in range(len(a[0]))] for _ in range(len(a))]
-    health_matrix = [[0 for _ in range(len(a[0]))] for _ in range(len(a))]
+
+    with phase(stats, "setup"):
+        # damage[y][x] is what stepping onto (x, y) costs, so the relaxation loop
+        # reads one value instead of scanning the 3x3 neighbourhood for monsters
+        if damage_field is None:
+            damage_field = build_damage_field((len(a), len(a[0])), current_monsters)
+        damage = damage_field.tolist()
+
+        # score_matrix[y][x] stores the highest score achieved to reach this tile
+        # Initialize with negative infinity
+        score_matrix = [[-float('inf') for _ in range(len(a[0]))] for _ in range(len(a))]
+        parent_matrix = [[None for _ in range(len(a[0]))] for _ in range(len(a))]
+        health_matrix = [[0 for _ in range(len(a[0]))] for _ in range(len(a))]
 
     # Priority Queue stores: (-current_score, x, y, current_hp, steps)
     # We use negative score because heapq is a min-heap
@@ -45,194 +111,625 @@ def solve_dijkstra_complex(a, start, end, current_health, bridges, current_monst
     score_matrix[start_y][start_x] = 0
     health_matrix[start_y][start_x] = current_health
 
+    expanded = 0
+    tracing = stats is not None
+    peak = 1
+    next_sample = stats.first_sample() if tracing else -1
+    with phase(stats, "search"):
+        while pq:
+            if tracing:
+                if len(pq) > peak:
+                    peak = len(pq)
+                if expanded == next_sample:
+                    stats.sample("complex", expanded, expanded, pq, pq[0][0])
+                    next_sample += stats.sample_every
+            neg_score, x, y, hp, steps = heapq.heappop(pq)
+            curr_score = -neg_score
+            expanded += 1
+
+            # If we reached the goal, this is the highest score path due to PQ
+            if (x, y) == (end_x, end_y):
+                if tracing:
+                    stats.record_heap(expanded, expanded, len(pq), peak)
+                # Backtrack to find the path
+                path = []
+                curr = (x, y)
+                while curr:
+                    path.append(curr)
+                    curr = parent_matrix[curr[1]][curr[0]]
+                return path[::-1], hp
+
+            # Check bridge constraints
+            allowed_dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
+            if (x, y) in bridges:
+                orientation = bridges[(x, y)]
+                allowed_dirs = [(-1, 0), (1, 0)] if orientation == "NS" else [(0, -1), (0, 1)]
+
+            for dy, dx in allowed_dirs:
+                nx, ny = x + dx, y + dy
+                
+                if 0 <= ny < len(a) and 0 <= nx < len(a[0]):
+                    if a[ny][nx] == 1 and (nx, ny) not in current_monsters:
+                        continue
+
+                    # Contact plus proximity (8-square) damage
+                    step_damage = damage[ny][nx]
+
+                    new_hp = hp - step_damage
+                    if new_hp <= 0: continue
+
+                    # Calculate new score for this step
+                    # These weights define if circumvention is better than combat
+                    step_penalty = step_score
+                    hp_weight = hp_score
+                    
+                    # Move Score = (points from health) - (points lost from steps)
+                    # Note: We use relative score change here
+                    move_score = curr_score - (step_damage * hp_weight) - step_penalty
+
+                    if move_score > score_matrix[ny][nx]:
+                        score_matrix[ny][nx] = move_score
+                        health_matrix[ny][nx] = new_hp
+                        parent_matrix[ny][nx] = (x, y)
+                        heapq.heappush(pq, (-move_score, nx, ny, new_hp, steps + 1))
+
+    if tracing:
+        stats.record_heap(expanded, expanded, len(pq), peak)
+    return None # No survivable path
+
+def dial_search(a, start, end, current_health, bridges, current_monsters, damage_field=None, stats=None):
+    """
+    solve_dijkstra_complex with a monotone bucket queue (Dial's algorithm)
+    instead of heapq. Every step costs step_score + damage * hp_score, a
+    positive integer, so a label's negated score is an integer cost and the
+    queue is a ring of buckets, one per cost (in steps of
+    gcd(step_score, hp_score)), as long as the dearest step. A push is an
+    append and a pop walks forward to the next non-empty bucket.
+
+    A bucket gets no new entries once the search reaches it (every step
+    costs at least step_score), so it is sorted then and pops in heapq's
+    order: the path and HP match engine="heapq". Entries whose tile was
+    since reached with a higher score and at least as much HP are skipped,
+    as nothing they could relax beats what the better label relaxed.
+    """
+    if not isinstance(step_score, int) or not isinstance(hp_score, int) or step_score <= 0:
+        raise ValueError("The bucket engine needs integer step_score and hp_score, and step_score > 0")
+    rows, cols = len(a), len(a[0])
+    start_x, start_y = start
+    target = end[1] * cols + end[0]
+
+    with phase(stats, "setup"):
+        if damage_field is None:
+            damage_field = build_damage_field((rows, cols), current_monsters)
+        damage = damage_field.ravel().tolist()
+        if step_score + hp_score * min(damage) <= 0:
+            raise ValueError("The bucket engine needs every step to cost more than 0")
+        unit = math.gcd(step_score, hp_score)
+        ring = (step_score + hp_score * max(damage)) // unit + 1
+        # open_[v] is 1 for tiles that can be entered (monster tiles even on a wall)
+        open_ = bytearray(0 if v == 1 else 1 for row in a for v in row)
+        for x, y in current_monsters:
+            if 0 <= x < cols and 0 <= y < rows:
+                open_[y * cols + x] = 1
+        bridge_at = {y * cols + x: orientation for (x, y), orientation in bridges.items()}
+        cost_of = [float('inf')] * (rows * cols)  # -score of the best label per tile
+        health = [0] * (rows * cols)
+        parent = [-1] * (rows * cols)
+
+    source = start_y * cols + start_x
+    cost_of[source] = 0
+    health[source] = current_health
+    # buckets[(cost // unit) % ring] holds the queued (x, y, hp) with that cost
+    buckets = [[] for _ in range(ring)]
+    buckets[0].append((start_x, start_y, current_health))
+    queued = 1
+    level = 0  # cost // unit of the bucket being popped
+    last_row = rows - 1
+    pops = stale = 0
+    tracing = stats is not None
+    peak = 1
+    next_sample = stats.first_sample() if tracing else -1
+    with phase(stats, "search"):
+        while queued:
+            i = level % ring
+            bucket = buckets[i]
+            cost = level * unit
+            level += 1
+            if not bucket:
+                continue
+            buckets[i] = []
+            queued -= len(bucket)
+            bucket.sort()
+            for k, (x, y, hp) in enumerate(bucket):
+                if tracing:
+                    frontier = queued + len(bucket) - k
+                    if frontier > peak:
+                        peak = frontier
+                    if pops == next_sample:
+                        stats.sample("complex", pops, pops - stale,
+                                     bucket[k:] + [entry for later in buckets for entry in later], cost)
+                        next_sample += stats.sample_every
+                pops += 1
+                v = y * cols + x
+                if cost > cost_of[v] and hp <= health[v]:
+                    stale += 1
+                    continue
+
+                if v == target:
+                    if tracing:
+                        stats.record_heap(pops, pops - stale, queued + len(bucket) - k - 1, peak)
+                        stats.count("stale", stale)
+                    path = []
+                    while v != -1:
+                        path.append((v % cols, v // cols))
+                        v = parent[v]
+                    return path[::-1], hp
+
+                moves = ((x, y - 1, v - cols, y > 0), (x, y + 1, v + cols, y < last_row),
+                         (x - 1, y, v - 1, x > 0), (x + 1, y, v + 1, x < cols - 1))
+                orientation = bridge_at.get(v)
+                if orientation is not None:
+                    moves = moves[:2] if orientation == "NS" else moves[2:]
+                for nx, ny, u, ok in moves:
+                    if not ok or not open_[u]:
+                        continue
+                    step_damage = damage[u]
+                    new_hp = hp - step_damage
+                    if new_hp <= 0:
+                        continue
+                    new_cost = cost + step_score + step_damage * hp_score
+                    if new_cost < cost_of[u]:
+                        cost_of[u] = new_cost
+                        health[u] = new_hp
+                        parent[u] = v
+                        buckets[new_cost // unit % ring].append((nx, ny, new_hp))
+                        queued += 1
+
+    if tracing:
+        stats.record_heap(pops, pops - stale, 0, peak)
+        stats.count("stale", stale)
+    return None  # No survivable path
+
+def solve_dijkstra_labels(a, start, end, current_health, bridges=None, current_monsters=None, damage_field=None,
+                          max_labels=16, return_front=False):
+    """
+    Multi-criteria version of solve_dijkstra_complex. Instead of one score
+    per tile it keeps a bucket of labels (score, hp) per tile and only drops
+    a label when another label on the same tile has at least its score and
+    at least its HP. An arrival with a lower score but more HP survives, so
+    routes that need the HP later are not lost.
+
+    Labels are expanded best score first, so the first label to reach 'end'
+    is the highest-scoring survivable route. max_labels caps each tile's
+    bucket (the lowest-scoring label is evicted) to bound memory on large
+    monster-heavy levels.
+
+    Returns (path, hp) like solve_dijkstra_complex, or None. With
+    return_front=True the search runs to completion and returns every
+    non-dominated arrival at 'end' as a list of (path, hp, score), best
+    score first.
+    """
+    a, bridges, current_monsters = unpack_level(a, bridges, current_monsters)
+    rows, cols = len(a), len(a[0])
+    if damage_field is None:
+        damage_field = build_damage_field((rows, cols), current_monsters)
+    damage = damage_field.tolist()
+
+    # Label arena: label i sits on tile[i] with score[i], hp[i], and came
+    # from label parent[i]. buckets[y * cols + x] holds the live label ids.
+    tile, score, health, parent, alive = [], [], [], [], []
+    buckets = {}
+
+    def add_label(idx, new_score, new_hp, from_label):
+        bucket = buckets.setdefault(idx, [])
+        for other in bucket:
+            if score[other] >= new_score and health[other] >= new_hp:
+                return None  # dominated
+        label = len(tile)
+        tile.append(idx)
+        score.append(new_score)
+        health.append(new_hp)
+        parent.append(from_label)
+        alive.append(True)
+        for other in bucket:
+            if new_score >= score[other] and new_hp >= health[other]:
+                alive[other] = False
+        bucket[:] = [other for other in bucket if alive[other]]
+        bucket.append(label)
+        if len(bucket) > max_labels:
+            worst = min(bucket, key=lambda i: (score[i], health[i]))
+            alive[worst] = False
+            bucket.remove(worst)
+            if worst == label:
+                return None
+        return label
+
+    def trace(label):
+        path = []
+        while label is not None:
+            path.append((tile[label] % cols, tile[label] // cols))
+            label = parent[label]
+        return path[::-1]
+
+    end_idx = end[1] * cols + end[0]
+    first = add_label(start[1] * cols + start[0], 0, current_health, None)
+    # (-score, -hp, label): best score first, then most HP
+    pq = [(0, -current_health, first)]
+    front = []
+
     while pq:
-        neg_score, x, y, hp, steps = heapq.heappop(pq)
-        curr_score = -neg_score
-
-        # If we reached the goal, this is the highest score path due to PQ
-        if (x, y) == (end_x, end_y):
-            # Backtrack to find the path
-            path = []
-            curr = (x, y)
-            while curr:
-                path.append(curr)
-                curr = parent_matrix[curr[1]][curr[0]]
-            return path[::-1], hp
-
-        # Check bridge constraints
+        _, _, label = heapq.heappop(pq)
+        if not alive[label]:
+            continue  # dominated or evicted after it was pushed
+        idx = tile[label]
+        if idx == end_idx:
+            if not return_front:
+                return trace(label), health[label]
+            front.append(label)
+            continue
+
+        x, y = idx % cols, idx // cols
         allowed_dirs = [(-1, 0), (1, 0), (0, -1), (0, 1)]
         if (x, y) in bridges:
-            orientation = bridges[(x, y)]
-            allowed_dirs = [(-1, 0), (1, 0)] if orientation == "NS" else [(0, -1), (0, 1)]
+            allowed_dirs = [(-1, 0), (1, 0)] if bridges[(x, y)] == "NS" else [(0, -1), (0, 1)]
 
         for dy, dx in allowed_dirs:
             nx, ny = x + dx, y + dy
-            
-            if 0 <= ny < len(a) and 0 <= nx < len(a[0]):
-                is_monster = (nx, ny) in current_monsters
-                if a[ny][nx] == 1 and not is_monster:
-                    continue
+            if not (0 <= ny < rows and 0 <= nx < cols):
+                continue
+            if a[ny][nx] == 1 and (nx, ny) not in current_monsters:
+                continue
+            step_damage = damage[ny][nx]
+            new_hp = health[label] - step_damage
+            if new_hp <= 0:
+                continue
+            move_score = score[label] - (step_damage * hp_score) - step_score
+            new = add_label(ny * cols + nx, move_score, new_hp, label)
+            if new is not None:
+                heapq.heappush(pq, (-move_score, -new_hp, new))
 
-                # Calculate damage
-                damage = 0
-                if is_monster:
-                    m_stat = monster_stats[current_monsters[(nx, ny)]]
-                    damage += m_stat["damage"] * m_stat["freq"]
-                
-                # Proximity damage (8-square)
-                for sy in range(ny - 1, ny + 2):
-                    for sx in range(nx - 1, nx + 2):
-                        if (sx, sy) in current_monsters and (sx, sy) != (nx, ny):
-                            damage += monster_stats[current_monsters[(sx, sy)]]["damage"]
-
-                new_hp = hp - damage
-                if new_hp <= 0: continue
-
-                # Calculate new score for this step
-                # These weights define if circumvention is better than combat
-                step_penalty = step_score
-                hp_weight = hp_score
-                
-                # Move Score = (points from health) - (points lost from steps)
-                # Note: We use relative score change here
-                move_score = curr_score - (damage * hp_weight) - step_penalty
-
-                if move_score > score_matrix[ny][nx]:
-                    score_matrix[ny][nx] = move_score
-                    health_matrix[ny][nx] = new_hp
-                    parent_matrix[ny][nx] = (x, y)
-                    heapq.heappush(pq, (-move_score, nx, ny, new_hp, steps + 1))
-
-    return None # No survivable path
+    if not return_front:
+        return None # No survivable path
+    return [(trace(label), health[label], score[label]) for label in front if alive[label]]
 
 def generate_maze_image(grid, path, monsters, gems, start, end, filename="solved_path.png"):
+    from PIL import ImageColor  # drawing needs PIL; solving does not
+    from raster import TileCanvas, shape_mask
+
     zoom = 40  # Size of each cell in pixels
-    rows = len(grid)
-    cols = len(grid[0])
-    
-    # Create a blank RGB image
-    img = Image.new("RGB", (cols * zoom, rows * zoom), "white")
-    draw = ImageDraw.Draw(img)
-
-    for y in range(rows):
-        for x in range(cols):
-            top_left = (x * zoom, y * zoom)
-            bottom_right = ((x + 1) * zoom, (y + 1) * zoom)
-            rect = [top_left, bottom_right]
-
-            # Color coding the grid
-            if grid[y][x] == 1:
-                draw.rectangle(rect, fill="black") # Walls
-            
-            # Special Markers
-            if (x, y) == start:
-                draw.rectangle(rect, fill="green") # Start
-            elif (x, y) == end:
-                draw.rectangle(rect, fill="red")   # Exit
-            elif (x, y) in gems:
-                draw.ellipse([x*zoom+10, y*zoom+10, (x+1)*zoom-10, (y+1)*zoom-10], fill="blue") # Gems
-            elif (x, y) in monsters:
-                draw.polygon([(x*zoom+20, y*zoom+5), (x*zoom+5, y*zoom+35), (x*zoom+35, y*zoom+35)], fill="purple") # Monsters
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    canvas = TileCanvas(rows, cols, zoom)
+
+    # Walls, Start and Exit are whole-cell rectangles, filled in one go
+    squares = grid == 1
+    colors = np.zeros((rows, cols, 3), dtype=np.uint8)  # Walls
+    for (x, y), color in ((end, "red"), (start, "green")):  # Start wins if they coincide
+        squares[y, x] = True
+        colors[y, x] = ImageColor.getrgb(color)
+    canvas.fill_cells(squares, colors, overflow=True)
+
+    # Special Markers (cells already showing Start or Exit are skipped)
+    gem_cells = [p for p in gems if p not in (start, end)]
+    monster_cells = [p for p in monsters if p not in (start, end) and p not in gems]
+    for cells, shape, coords, color in (
+            (gem_cells, "ellipse", [10, 10, zoom - 10, zoom - 10], "blue"),  # Gems
+            (monster_cells, "polygon", [(20, 5), (5, 35), (35, 35)], "purple")):  # Monsters
+        canvas.stamp([y for _, y in cells], [x for x, _ in cells], shape_mask(zoom, shape, coords),
+                     ImageColor.getrgb(color))
 
     # Draw the Path
     if path:
-        for i in range(len(path) - 1):
-            p1 = path[i]
-            p2 = path[i+1]
-            # Draw line between centers of cells
-            line_start = (p1[0] * zoom + zoom//2, p1[1] * zoom + zoom//2)
-            line_end = (p2[0] * zoom + zoom//2, p2[1] * zoom + zoom//2)
-            draw.line([line_start, line_end], fill="orange", width=5)
-
-    img.save(filename)
+        canvas.draw_path(path, ImageColor.getrgb("orange"), width=5)
+
+    canvas.image().save(filename)
     print(f"Maze image saved as {filename}")
 
 
+def clear_monsters(grid, monsters, path, damage_field):
+    """
+    Removes the monsters defeated along 'path'. Returns (grid, monsters,
+    damage_field) without touching the inputs: only the grid rows of
+    defeated monsters are copied, every other row is shared, and the damage
+    field is copied once and patched in each defeated monster's 3x3 window.
+    """
+    defeated = [coord for coord in path if coord in monsters]
+    if not defeated:
+        return grid, monsters, damage_field
+    grid = list(grid)
+    monsters = dict(monsters)
+    damage_field = damage_field.copy()
+    for x, y in defeated:
+        kind = monsters.pop((x, y), None)
+        if kind is not None:
+            grid[y] = list(grid[y])
+            grid[y][x] = 0
+            add_monster_damage(damage_field, (x, y), kind, sign=-1)
+    return grid, monsters, damage_field
+
+
+def route_score(num_gems, hp, path):
+    # Rubric score of a complete route: gems collected, HP left and steps taken
+    total_steps = len(path) - 1  # steps are transitions
+    return (num_gems * gem_score) + (hp * hp_score) - (total_steps * step_score)
+
+
+def run_sequence(grid, start, end, sequence, monsters, bridges, start_hp, damage_field=None,
+                 solver=solve_dijkstra_complex):
+    """
+    Walks Start -> each gem in 'sequence' -> End, solving each segment with
+    'solver' (solve_dijkstra_complex or solve_dijkstra_labels).
+    Returns (path, hp) or None if some segment is not survivable.
+    """
+    if damage_field is None:
+        damage_field = build_damage_field((len(grid), len(grid[0])), monsters)
+    current_loc = start
+    current_hp = start_hp
+    total_path = []
+    for next_goal in list(sequence) + [end]:
+        result = solver(grid, current_loc, next_goal, current_hp, bridges, monsters, damage_field)
+        if result is None:
+            return None
+        segment_path, current_hp = result
+        grid, monsters, damage_field = clear_monsters(grid, monsters, segment_path, damage_field)
+        # Combine paths (avoiding duplicating the stop-over point)
+        total_path += segment_path if not total_path else segment_path[1:]
+        current_loc = next_goal
+    return total_path, current_hp
+
+
+def counting_solver(solver, stats):
+    # 'solver' counting each segment it solves into stats.counters["segments"]
+    if stats is None:
+        return solver
+
+    def counted(*args):
+        stats.count("segments")
+        return solver(*args)
+
+    return counted
+
+
+def plan_permutations(grid, start=None, end=None, gems=None, monsters=None, bridges=None, start_hp=300,
+                      verbose=False, stats=None, solver=solve_dijkstra_complex):
+    """
+    Brute force over every order of the gems (factorial in len(gems)).
+    'grid' may be a Maze or .maze file, which supplies any level argument
+    left as None.
+    Returns (best_path, best_score, best_sequence); best_path is [] if no
+    order is survivable.
+
+    stats (a search_stats.SearchStats) counts the segments solved and times
+    the planner under "plan"; pass it to the solver too for search totals.
+    """
+    with phase(stats, "plan"):
+        grid, start, end, gems, monsters, bridges = unpack_plan(grid, start, end, gems, monsters, bridges)
+        damage_field = build_damage_field((len(grid), len(grid[0])), monsters)
+        solver = counting_solver(solver, stats)
+        best = ([], -float('inf'), None)
+        for sequence in itertools.permutations(gems):
+            result = run_sequence(grid, start, end, sequence, monsters, bridges, start_hp, damage_field, solver)
+            if result is None:
+                continue
+            path, hp = result
+            score = route_score(len(gems), hp, path)
+            if score > best[1]:
+                best = (path, score, sequence)
+                if verbose:
+                    print(f"New Best Path Found! Order: {sequence} | Score: {score}")
+        return best
+
+
+def plan_held_karp(grid, start=None, end=None, gems=None, monsters=None, bridges=None, start_hp=300,
+                   stats=None, solver=solve_dijkstra_complex):
+    """
+    Dynamic programming over (current stop, set of collected gems) instead of
+    every permutation. Segments still come from 'solver', so the result
+    matches plan_permutations with the same solver.
+
+    Each state keeps a list of labels (hp, steps, defeated monsters, path,
+    order). Two orders that reach the same state can differ in HP, steps and
+    which monsters they already killed, so a label is only dropped when
+    another one has at least as much HP, no more steps and a superset of the
+    defeated monsters (and is strictly better, or comes first in permutation
+    order, so ties resolve like the brute force).
+
+    Returns (best_path, best_score, best_sequence) and fills stats like
+    plan_permutations.
+    """
+    with phase(stats, "plan"):
+        return _held_karp(grid, start, end, gems, monsters, bridges, start_hp, counting_solver(solver, stats))
+
+
+def _held_karp(grid, start, end, gems, monsters, bridges, start_hp, solver):
+    grid, start, end, gems, monsters, bridges = unpack_plan(grid, start, end, gems, monsters, bridges)
+    n = len(gems)
+    all_monsters = frozenset(monsters)
+    # (grid, damage field) with the given monsters cleared, shared between labels
+    levels = {frozenset(): (grid, build_damage_field((len(grid), len(grid[0])), monsters))}
+
+    def extend(label, goal):
+        hp, steps, defeated, path, order = label
+        current_monsters = {c: t for c, t in monsters.items() if c not in defeated}
+        level_grid, level_field = levels[defeated]
+        result = solver(level_grid, path[-1], goal, hp, bridges, current_monsters, level_field)
+        if result is None:
+            return None
+        segment_path, new_hp = result
+        new_grid, remaining, new_field = clear_monsters(level_grid, current_monsters, segment_path, level_field)
+        new_defeated = all_monsters - frozenset(remaining)
+        levels.setdefault(new_defeated, (new_grid, new_field))
+        new_path = path + segment_path[1:]
+        return new_hp, len(new_path) - 1, new_defeated, new_path, order
+
+    def dominates(a, b):
+        # a is at least as good as b in HP, steps and monsters already defeated
+        if a[0] < b[0] or a[1] > b[1] or not a[2] >= b[2]:
+            return False
+        return a[0] > b[0] or a[1] < b[1] or a[2] > b[2] or a[4] < b[4]
+
+    def add_label(labels, new):
+        if any(dominates(old, new) for old in labels):
+            return
+        labels[:] = [old for old in labels if not dominates(new, old)]
+        labels.append(new)
+
+    # states[(gem index, mask)] -> labels; the start label has collected nothing
+    states = {(None, 0): [(start_hp, 0, frozenset(), [start], ())]}
+    for size in range(n):
+        next_states = {}
+        for (_, mask), labels in states.items():
+            for j in range(n):
+                if mask & (1 << j):
+                    continue
+                for label in labels:
+                    new = extend(label, gems[j])
+                    if new is not None:
+                        new = new[:4] + (label[4] + (j,),)
+                        add_label(next_states.setdefault((j, mask | (1 << j)), []), new)
+        states = next_states
+
+    best = ([], -float('inf'), None)
+    best_order = None
+    for labels in states.values():
+        for label in labels:
+            final = extend(label, end)
+            if final is None:
+                continue
+            hp, _, _, path, order = final
+            score = route_score(n, hp, path)
+            if score > best[1] or (score == best[1] and order < best_order):
+                best = (path, score, tuple(gems[j] for j in order))
+                best_order = order
+    return best
+
+
+def solve_segment_cached(cache, counters, solver, grid, start, goal, hp, bridges, monsters, damage_field):
+    """
+    'solver' with memoisation. The grid and damage field only
+    differ from the original where monsters were cleared, so (start, goal,
+    hp, remaining monsters) fully determines the result.
+    """
+    key = (start, goal, hp, frozenset(monsters))
+    counters["lookups"] += 1
+    if key in cache:
+        counters["hits"] += 1
+        return cache[key]
+    result = solver(grid, start, goal, hp, bridges, monsters, damage_field)
+    cache[key] = result
+    return result
+
+
+def walk_prefix_tree(solver, grid, field, end, gems, bridges, loc, hp, monsters, path, order, cache, counters,
+                     best):
+    # Depth-first over the remaining gems in index order, so every shared
+    # prefix is solved once and leaves are visited in permutation order.
+    remaining = [j for j in range(len(gems)) if j not in order]
+    goals = [(j, gems[j]) for j in remaining] if remaining else [(None, end)]
+    for j, goal in goals:
+        result = solve_segment_cached(cache, counters, solver, grid, loc, goal, hp, bridges, monsters, field)
+        if result is None:
+            continue
+        segment_path, new_hp = result
+        new_grid, new_monsters, new_field = clear_monsters(grid, monsters, segment_path, field)
+        new_path = path + segment_path[1:]
+        if j is None:
+            score = route_score(len(gems), new_hp, new_path)
+            if score > best[1]:
+                best[:] = [new_path, score, order]
+        else:
+            walk_prefix_tree(solver, new_grid, new_field, end, gems, bridges, goal, new_hp, new_monsters,
+                             new_path, order + (j,), cache, counters, best)
+
+
+def evaluate_subtree(grid, start, end, gems, monsters, bridges, start_hp, first, solver=solve_dijkstra_complex):
+    """
+    Best route among the orders that start with gems[first] (or all orders if
+    first is None). Runs in a worker process for plan_prefix_tree.
+    Returns (best, counters) with best = [path, score, order].
+    """
+    cache = {}
+    counters = {"lookups": 0, "hits": 0}
+    best = [[], -float('inf'), None]
+    field = build_damage_field((len(grid), len(grid[0])), monsters)
+    order = () if first is None else (first,)
+    if first is None:
+        walk_prefix_tree(solver, grid, field, end, gems, bridges, start, start_hp, monsters, [start], order,
+                         cache, counters, best)
+        return best, counters
+    result = solve_segment_cached(cache, counters, solver, grid, start, gems[first], start_hp, bridges, monsters,
+                                  field)
+    if result is not None:
+        segment_path, hp = result
+        new_grid, new_monsters, new_field = clear_monsters(grid, monsters, segment_path, field)
+        walk_prefix_tree(solver, new_grid, new_field, end, gems, bridges, gems[first], hp, new_monsters,
+                         segment_path, order, cache, counters, best)
+    return best, counters
+
+
+def plan_prefix_tree(grid, start=None, end=None, gems=None, monsters=None, bridges=None, start_hp=300,
+                     workers=None, stats=None, solver=solve_dijkstra_complex):
+    """
+    Evaluates every gem order like plan_permutations, but as a prefix tree:
+    (A, B, C) and (A, C, B) share the start -> A segment, which is solved
+    once, and segment results are cached on (location, goal, HP, remaining
+    monsters). The subtrees for each first gem are independent: with
+    workers=N they run on a pool of N processes. That only pays off when
+    the segments are expensive (large levels, many gems): on small levels
+    starting the pool and pickling the level cost more than the search, so
+    by default everything runs in this process.
+
+    Returns (best_path, best_score, best_sequence) and fills stats like
+    plan_permutations, plus the "segment_lookups" and "cache_hits" counters.
+    Segments solved in worker processes are counted, but their searches are
+    not: the solver's own stats stay in the worker.
+    """
+    with phase(stats, "plan"):
+        return _prefix_tree(grid, start, end, gems, monsters, bridges, start_hp, workers, stats, solver)
+
+
+def _prefix_tree(grid, start, end, gems, monsters, bridges, start_hp, workers, stats, solver):
+    grid, start, end, gems, monsters, bridges = unpack_plan(grid, start, end, gems, monsters, bridges)
+    if not workers or len(gems) < 2:
+        subtrees = [evaluate_subtree(grid, start, end, gems, monsters, bridges, start_hp, None, solver)]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(evaluate_subtree, grid, start, end, gems, monsters, bridges, start_hp, j, solver)
+                       for j in range(len(gems))]
+            subtrees = [f.result() for f in futures]  # first-gem order keeps ties like the brute force
+
+    best = [[], -float('inf'), None]
+    lookups = hits = 0
+    for sub_best, counters in subtrees:
+        lookups += counters["lookups"]
+        hits += counters["hits"]
+        if sub_best[1] > best[1]:
+            best = sub_best
+    if stats is not None:
+        stats.count("segments", lookups - hits)
+        stats.count("segment_lookups", lookups)
+        stats.count("cache_hits", hits)
+    sequence = None if best[2] is None else tuple(gems[j] for j in best[2])
+    return best[0], best[1], sequence
+
+
 # --- Main Execution ---
 if __name__ == "__main__":
-    # Import and correct the maze data
-    original_grid = copy.deepcopy(maze_data.maze_grid)
-    HEIGHT = len(original_grid)
-    WIDTH = len(original_grid[0])
-    
-    # 2. COORDINATE TRANSFORMATION (Unity Y -> Python Row Index)
-    # Unity (0,0) is bottom-left. Python [0][0] is top-left.
-    # Because the grid is top-down, we only need to flip the Y value.
-    def ty(y): return (HEIGHT - 1) - y
-
-    start_pos = (maze_data.start[0], ty(maze_data.start[1]))
-    end_pos = (maze_data.end[0], ty(maze_data.end[1]))
-    gems = [(x, ty(y)) for x, y in maze_data.gem_positions]
-    
-    # Transform dictionary keys for Monsters and Bridges
-    master_monster_types = {(x, ty(y)): t for (x, y), t in maze_data.monster_types.items()}
-    bridges = {(x, ty(y)): o for (x, y), o in getattr(maze_data, 'bridge_data', {}).items()}
-
+    import maze_data_generated_mazemate as maze_data
 
+    # Load the maze data. MazeMate uses Unity coordinates ((0,0) is
+    # bottom-left) while Python [0][0] is top-left, so from_module flips
+    # every entity's y value to a row index.
+    maze = Maze.from_module(maze_data)
+    original_grid = maze.rows()
+    start_pos, end_pos = maze.start, maze.end
+    gems = maze.gem_list()
+    master_monster_types = maze.monster_dict()
 
     # Run Dijkstra
-    best_overall_path = []
-    max_total_score = -float('inf')
-    best_sequence = None
-
-    # 2. Brute Force the Order of Gems
-    gem_sequences = list(itertools.permutations(gems))
-    print(f"--- Starting Dijkstra-Permutation Search ({len(gem_sequences)} sequences) ---")
-
-    for sequence in gem_sequences:
-        current_grid = copy.deepcopy(original_grid)
-        current_monsters = copy.deepcopy(master_monster_types)
-        current_hp = 300
-        current_loc = start_pos
-        current_total_path = []
-        valid_sequence = True
-        
-        # Journey stops: Start -> Gem A -> Gem B -> Gem C -> End
-        full_stops = list(sequence) + [end_pos]
-        
-        for next_goal in full_stops:
-            # solve_dijkstra_complex returns the path with the best possible score
-            result = solve_dijkstra_complex(
-                current_grid, 
-                current_loc, 
-                next_goal, 
-                current_hp, 
-                bridges, 
-                current_monsters
-            )
-            
-            if result is None:
-                valid_sequence = False
-                break
-            
-            segment_path, segment_end_hp = result
-            
-            # Update local state: Remove monsters defeated in this segment
-            for coord in segment_path:
-                if coord in current_monsters:
-                    current_grid[coord[1]][coord[0]] = 0 
-                    current_monsters.pop(coord)
-            
-            # Combine paths (avoiding duplicating the stop-over point)
-            if not current_total_path:
-                current_total_path += segment_path
-            else:
-                current_total_path += segment_path[1:]
-                
-            current_hp = segment_end_hp
-            current_loc = next_goal
-
-        # 3. Final Scoring and Path Selection
-        if valid_sequence:
-            total_steps = len(current_total_path) - 1 # steps are transitions
-            # Rubric Score: (Gems * 1000) + (HP * 10) - (Steps * 2)
-            final_score = (len(gems) * gem_score) + (current_hp * hp_score) - (total_steps * step_score)
-            
-            if final_score > max_total_score:
-                max_total_score = final_score
-                best_overall_path = current_total_path
-                best_sequence = sequence
-                print(f"New Best Path Found! Order: {sequence} | Score: {final_score}")
+    # 2. Plan the Order of Gems (Held-Karp DP; plan_permutations is the brute force)
+    print(f"--- Starting Dijkstra Gem-Order Search ({len(gems)} gems) ---")
+    best_overall_path, max_total_score, best_sequence = plan_held_karp(maze)
 
     # 4. Final Result Output
     print("\n" + "="*50)
@@ -0,0 +1,185 @@
+"""
+Batch solver for directories of maze images.
+
+Solves many (image, src, dst) jobs with find_shortest_path on a process
+pool, writes each path and an annotated image without opening any
+matplotlib windows, and streams one JSON line per finished job.
+
+    python batch_dijkstra.py mazes --src 25 5 --dst 9 220 --out batch_out
+    python batch_dijkstra.py jobs.jsonl --workers 8 --results results.jsonl
+
+A job source is either
+  - a directory of images. src/dst come from a sidecar <image>.json
+    ({"src": [x, y], "dst": [x, y]}) or from --src/--dst, or
+  - a manifest: .jsonl with one {"image": ..., "src": [x, y], "dst": [x, y]}
+    object per line, or .csv with rows image,src_x,src_y,dst_x,dst_y.
+    Relative image paths are relative to the manifest.
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.tif', '.tiff')
+
+
+def jobs_from_directory(directory, src=None, dst=None):
+    jobs = []
+    for name in sorted(os.listdir(directory)):
+        if not name.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        image = os.path.join(directory, name)
+        job = {"image": image, "src": src, "dst": dst}
+        sidecar = os.path.splitext(image)[0] + '.json'
+        if os.path.exists(sidecar):
+            with open(sidecar) as f:
+                job.update(json.load(f))
+        if job["src"] is None or job["dst"] is None:
+            print(f"Skipping {image}: no src/dst (add {sidecar} or pass --src/--dst)", file=sys.stderr)
+            continue
+        jobs.append(job)
+    return jobs
+
+
+def jobs_from_manifest(manifest):
+    # lines without an image are reported and skipped, like images without src/dst
+    base = os.path.dirname(os.path.abspath(manifest))
+    jobs = []
+    with open(manifest, newline='') as f:
+        if manifest.lower().endswith('.csv'):
+            for line, row in enumerate(csv.reader(f), 1):
+                if not row or row[0].startswith('#') or row[0] == 'image':
+                    continue  # blank line, comment or header
+                if len(row) < 5:
+                    print(f"Skipping {manifest}:{line}: expected image,src_x,src_y,dst_x,dst_y",
+                          file=sys.stderr)
+                    continue
+                jobs.append({"image": row[0], "src": [int(row[1]), int(row[2])],
+                             "dst": [int(row[3]), int(row[4])]})
+        else:
+            for line, text in enumerate(f, 1):
+                if not text.strip():
+                    continue
+                job = json.loads(text)
+                if not isinstance(job, dict) or not job.get("image"):
+                    print(f"Skipping {manifest}:{line}: no \"image\"", file=sys.stderr)
+                    continue
+                jobs.append(job)
+    for job in jobs:
+        job["image"] = os.path.join(base, job["image"])
+    return jobs
+
+
+def load_jobs(source, src=None, dst=None):
+    if os.path.isdir(source):
+        return jobs_from_directory(source, src, dst)
+    return jobs_from_manifest(source)
+
+
+def solve_job(job, out_dir, options):
+    """
+    Runs one job in a worker process and returns its JSON-serialisable
+    result. Errors are reported in the result instead of raised, so one bad
+    image does not stop the batch.
+    """
+    import cv2
+    import Dijkstra
+    from search_stats import SearchStats
+
+    t0 = time.perf_counter()
+    stem = job.get("id") or os.path.splitext(os.path.basename(job.get("image") or ""))[0]
+    result = {"id": stem, "image": job.get("image"), "src": job.get("src"), "dst": job.get("dst")}
+    try:
+        src, dst = tuple(job["src"]), tuple(job["dst"])
+        result["src"], result["dst"] = list(src), list(dst)
+        img = cv2.imread(job["image"])
+        if img is None:
+            raise ValueError("could not read image")
+        stats = SearchStats()
+        t1 = time.perf_counter()
+        path = Dijkstra.find_shortest_path(img, src, dst, stats=stats, **options)
+        result["solve_seconds"] = time.perf_counter() - t1
+        result["settled"] = stats.counters["expanded"]
+        result["counters"] = stats.counters
+        result["timings"] = stats.timings
+        result["path_length"] = len(path)
+
+        if out_dir is not None:
+            result["path_file"] = os.path.join(out_dir, stem + '.path.json')
+            with open(result["path_file"], 'w') as f:
+                json.dump(path, f)
+            result["annotated"] = os.path.join(out_dir, stem + '_solution.png')
+            Dijkstra.drawPath(img, path)
+            cv2.imwrite(result["annotated"], img)
+        result["ok"] = True
+    except Exception as e:
+        result["ok"] = False
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - t0
+    return result
+
+
+def run_batch(jobs, out_dir=None, workers=None, results=sys.stdout, **options):
+    """
+    Fans the jobs out over a process pool and writes one JSON line to
+    'results' per job as soon as it finishes. 'options' are passed on to
+    find_shortest_path (engine, store, mode). Returns a summary dict.
+    """
+    if out_dir is not None:
+        os.makedirs(out_dir, exist_ok=True)
+    latencies = []
+    failed = 0
+    t0 = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(solve_job, job, out_dir, options) for job in jobs]
+        for future in as_completed(futures):
+            result = future.result()
+            latencies.append(result["seconds"])
+            failed += not result["ok"]
+            results.write(json.dumps(result) + '\n')
+            results.flush()
+
+    latencies.sort()
+    wall = time.perf_counter() - t0
+    summary = {"jobs": len(jobs), "failed": failed, "wall_seconds": wall,
+               "jobs_per_second": len(jobs) / wall if wall else 0.0}
+    if latencies:
+        summary["p50_seconds"] = latencies[len(latencies) // 2]
+        summary["p99_seconds"] = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Solve a batch of image mazes with Dijkstra.")
+    parser.add_argument('source', help="directory of images, or a .jsonl/.csv manifest")
+    parser.add_argument('--src', type=int, nargs=2, metavar=('X', 'Y'), help="default start point")
+    parser.add_argument('--dst', type=int, nargs=2, metavar=('X', 'Y'), help="default end point")
+    parser.add_argument('--out', default='batch_out', help="folder for paths and annotated images")
+    parser.add_argument('--no-output', action='store_true', help="only report results, write no files")
+    parser.add_argument('--results', help="write JSON lines here instead of stdout")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--engine', default='heapq')
+    parser.add_argument('--store', default='list')
+    parser.add_argument('--mode', default='early')
+    args = parser.parse_args(argv)
+
+    jobs = load_jobs(args.source, args.src, args.dst)
+    out_dir = None if args.no_output else args.out
+    results = open(args.results, 'w') if args.results else sys.stdout
+    try:
+        summary = run_batch(jobs, out_dir, args.workers, results,
+                            engine=args.engine, store=args.store, mode=args.mode)
+    finally:
+        if results is not sys.stdout:
+            results.close()
+    print(json.dumps(summary), file=sys.stderr)
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,394 @@
+"""
+Benchmarks for the maze solvers.
+
+Run from the Solvers folder:
+    python benchmark.py                        # Dijkstra engine/mode comparison
+    python benchmark.py suite --out bench.json # seeded suite over all solvers
+    python benchmark.py suite --quick --compare bench.json
+    python benchmark.py complex                # solve_dijkstra_complex heapq vs buckets
+    python benchmark.py startup                # cold start of a headless solve
+
+The suite builds its mazes with maze_generator.py from fixed seeds, so two
+runs (or two commits) solve exactly the same inputs. Each case records wall
+time, peak memory, nodes expanded and the result (path length / score);
+--compare reports cases that got slower or whose result changed.
+"""
+
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import cv2  # install opencv-python package to use cv2
+import numpy as np
+
+import Dijkstra
+import advanced_dijkstra
+from BreadthFirstSearch import solve_bfs
+from hierarchical import HierarchicalGraph
+from jump_point_search import solve_jps
+from maze_file import save_maze
+from maze_generator import generate_maze, generate_image_maze
+from search_stats import SearchStats
+
+
+def time_call(fn, *args, repeat=3, **kwargs):
+    # best wall time over 'repeat' runs, plus the result of the last run
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def path_cost(img, path):
+    # total get_distance() along a find_shortest_path result (dst, dst, ..., src)
+    cost = 0
+    for (x0, y0), (x1, y1) in zip(path[1:], path[2:]):
+        cost += Dijkstra.get_distance(img, (y0, x0), (y1, x1))
+    return cost
+
+
+def peak_memory(fn, *args, **kwargs):
+    # peak Python/NumPy allocation while fn runs, in bytes
+    tracemalloc.start()
+    try:
+        fn(*args, **kwargs)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_dijkstra_engines(filename='mazes/dijkstra_default.png', src=(25, 5), dst=(9, 220),
+                           configs=(("legacy", "list"), ("heapq", "list"), ("heapq", "array")), repeat=3):
+    """
+    Times every find_shortest_path engine/store on one image maze, measures
+    its peak memory and checks that they all find a path of the same cost.
+    """
+    img = cv2.imread(filename)
+    pixels = img.shape[0] * img.shape[1]
+    results = {}
+    for engine, store in configs:
+        name = f"{engine}/{store}"
+        seconds, path = time_call(Dijkstra.find_shortest_path, img, src, dst, engine=engine, store=store,
+                                  repeat=repeat)
+        peak = peak_memory(Dijkstra.find_shortest_path, img, src, dst, engine=engine, store=store)
+        results[name] = {"seconds": seconds, "peak_bytes": peak, "path_length": len(path),
+                         "cost": path_cost(img, path)}
+        print(f"{name:>12}: {seconds:.3f}s  {peak / pixels:6.1f} bytes/pixel  "
+              f"path length {len(path)}  cost {results[name]['cost']:.4f}")
+    return results
+
+
+def bench_dijkstra_modes(filename='mazes/dijkstra_default.png', src=(25, 5), dst=(9, 220),
+                         modes=("full", "early", "astar", "bidirectional"), repeat=3):
+    """
+    Times every goal-directed find_shortest_path mode and reports how many
+    pixels each one settled.
+    """
+    img = cv2.imread(filename)
+    results = {}
+    for mode in modes:
+        stats = SearchStats()
+        seconds, path = time_call(Dijkstra.find_shortest_path, img, src, dst, mode=mode, stats=stats,
+                                  repeat=repeat)
+        settled = stats.counters["expanded"] // stats.counters["searches"]
+        results[mode] = {"seconds": seconds, "settled": settled, "cost": path_cost(img, path)}
+        print(f"{mode:>13}: {seconds:.3f}s  settled {settled:>7}  cost {results[mode]['cost']:.4f}")
+    return results
+
+
+COMPLEX_LEVELS = (
+    {"kind": "rooms", "width": 501, "height": 501, "seed": 1, "monster_density": 0.02, "bridges": 20},
+    {"kind": "rooms", "width": 1001, "height": 1001, "seed": 1, "monster_density": 0.05},
+    {"kind": "random", "width": 1001, "height": 1001, "seed": 1, "wall_density": 0.15, "monster_density": 0.1},
+)
+
+
+def bench_complex_engines(levels=COMPLEX_LEVELS, start_hp=100000, engines=("heapq", "buckets"), repeat=3):
+    """
+    Times every solve_dijkstra_complex engine on large, monster-dense
+    generated levels and checks that they return the same path and HP.
+    start_hp is high enough that the whole level stays reachable.
+    """
+    results = {}
+    for maze_args in levels:
+        maze = generate_maze(**maze_args)
+        field = advanced_dijkstra.build_damage_field(maze.shape, maze.monster_dict())
+        name = f"{maze_args['kind']}-{maze_args['width']}-m{maze_args['monster_density']}"
+        answers = []
+        for engine in engines:
+            stats = SearchStats()
+            seconds, result = time_call(advanced_dijkstra.solve_dijkstra_complex, maze, maze.start, maze.end,
+                                        start_hp, damage_field=field, engine=engine, repeat=repeat)
+            advanced_dijkstra.solve_dijkstra_complex(maze, maze.start, maze.end, start_hp, damage_field=field,
+                                                     engine=engine, stats=stats)
+            answers.append(result)
+            results[f"{name}/{engine}"] = {"seconds": seconds, "pops": stats.counters["pops"],
+                                           "stale": stats.counters.get("stale", 0)}
+            print(f"{name:>22} {engine:>8}: {seconds:.3f}s  pops {stats.counters['pops']:>8}  "
+                  f"path length {len(result[0]) if result else 0}")
+        if any(answer != answers[0] for answer in answers):
+            print(f"{name}: engines disagree", file=sys.stderr)
+    return results
+
+
+# --- Seeded suite ---
+
+# (name, solver, maze arguments, solver options). Sizes are grid cells, or
+# image maze cells for "dijkstra" (each drawn as scale x scale pixels).
+SUITE = [
+    ("bfs/perfect-101", "bfs", {"kind": "perfect", "width": 101, "height": 101, "seed": 1}, {}),
+    ("bfs/perfect-501", "bfs", {"kind": "perfect", "width": 501, "height": 501, "seed": 1}, {}),
+    ("bfs/rooms-501", "bfs", {"kind": "rooms", "width": 501, "height": 501, "seed": 1}, {}),
+    ("bfs/perfect-1001", "bfs", {"kind": "perfect", "width": 1001, "height": 1001, "seed": 1}, {}),
+    ("jps/perfect-501", "jps", {"kind": "perfect", "width": 501, "height": 501, "seed": 1}, {}),
+    ("jps/rooms-501", "jps", {"kind": "rooms", "width": 501, "height": 501, "seed": 1}, {}),
+    ("hierarchical/perfect-1001", "hierarchical",
+     {"kind": "perfect", "width": 1001, "height": 1001, "seed": 1}, {"cluster_size": 32}),
+    ("hierarchical/rooms-501", "hierarchical", {"kind": "rooms", "width": 501, "height": 501, "seed": 1},
+     {"cluster_size": 32}),
+    ("dijkstra/image-25x4", "dijkstra", {"cells": 25, "scale": 4, "seed": 1}, {"mode": "full"}),
+    ("dijkstra/image-50x4", "dijkstra", {"cells": 50, "scale": 4, "seed": 1}, {"mode": "full"}),
+    ("dijkstra/image-50x8", "dijkstra", {"cells": 50, "scale": 8, "seed": 1}, {"mode": "full"}),
+    ("dijkstra/image-50x8-astar", "dijkstra", {"cells": 50, "scale": 8, "seed": 1}, {"mode": "astar"}),
+    ("complex/rooms-101-m0.005", "complex",
+     {"kind": "rooms", "width": 101, "height": 101, "seed": 1, "monster_density": 0.005, "bridges": 5}, {}),
+    ("complex/rooms-101-m0.02", "complex",
+     {"kind": "rooms", "width": 101, "height": 101, "seed": 1, "monster_density": 0.02, "bridges": 5}, {}),
+    ("complex/random-201-m0.01", "complex",
+     {"kind": "random", "width": 201, "height": 201, "seed": 1, "wall_density": 0.2, "monster_density": 0.01}, {}),
+    ("complex/rooms-501-m0.02", "complex",
+     {"kind": "rooms", "width": 501, "height": 501, "seed": 1, "monster_density": 0.02, "bridges": 20}, {}),
+    ("complex/rooms-501-m0.02-buckets", "complex",
+     {"kind": "rooms", "width": 501, "height": 501, "seed": 1, "monster_density": 0.02, "bridges": 20},
+     {"engine": "buckets"}),
+    ("planner/rooms-31-g4", "permutations",
+     {"kind": "rooms", "width": 31, "height": 31, "seed": 1, "gems": 4, "monster_density": 0.01, "bridges": 2}, {}),
+    ("planner/rooms-31-g6", "permutations",
+     {"kind": "rooms", "width": 31, "height": 31, "seed": 1, "gems": 6, "monster_density": 0.01, "bridges": 2}, {}),
+    ("planner/rooms-31-g6-held-karp", "held_karp",
+     {"kind": "rooms", "width": 31, "height": 31, "seed": 1, "gems": 6, "monster_density": 0.01, "bridges": 2}, {}),
+]
+
+# Cases small enough for a quick check before committing
+QUICK = ("bfs/perfect-101", "bfs/rooms-501", "dijkstra/image-25x4", "complex/rooms-101-m0.005",
+         "planner/rooms-31-g4")
+
+
+def _case_call(solver, maze, options):
+    """
+    Returns fn(stats) running one solve of 'maze' (stats is a SearchStats
+    or None), and a function turning fn's result + stats into the recorded
+    result fields.
+    """
+    if solver == "bfs":
+        def fn(stats):
+            return solve_bfs(maze, stats=stats, **options)
+        return fn, lambda path, stats: {"path_length": len(path), "expanded": stats.counters.get("expanded", 0)}
+    if solver == "jps":
+        def fn(stats):
+            return solve_jps(maze, stats=stats, **options)
+        return fn, lambda path, stats: {"path_length": len(path), "expanded": stats.counters.get("expanded", 0)}
+    if solver == "hierarchical":
+        graph = HierarchicalGraph.from_grid(maze, **options)  # built once, only queries are timed
+
+        def fn(stats):
+            return graph.path(maze.start, maze.end, stats=stats)[0]
+        return fn, lambda path, stats: {"path_length": len(path),
+                                        "expanded": stats.counters.get("abstract_expanded", 0)}
+    if solver == "dijkstra":
+        def fn(stats):
+            return Dijkstra.find_shortest_path(maze, stats=stats, **options)
+        return fn, lambda path, stats: {"path_length": len(path), "expanded": stats.counters["expanded"],
+                                        "cost": round(path_cost(maze.image, path), 6)}
+    if solver == "complex":
+        def fn(stats):
+            return advanced_dijkstra.solve_dijkstra_complex(maze, maze.start, maze.end, 300, stats=stats, **options)
+
+        def summary(result, stats):
+            path, hp = result if result is not None else ([], 0)
+            return {"path_length": len(path), "hp": hp, "expanded": stats.counters["expanded"]}
+        return fn, summary
+    if solver in ("permutations", "held_karp"):
+        planner = advanced_dijkstra.plan_permutations if solver == "permutations" else advanced_dijkstra.plan_held_karp
+
+        def fn(stats):
+            # one SearchStats across every segment solve adds up their counters
+            return planner(maze, solver=functools.partial(advanced_dijkstra.solve_dijkstra_complex, stats=stats),
+                           **options)
+
+        def summary(result, stats):
+            path, score, _ = result
+            return {"path_length": len(path), "score": score if path else None,
+                    "expanded": stats.counters.get("expanded", 0), "segments": stats.counters.get("searches", 0)}
+        return fn, summary
+    raise ValueError(f"Unknown benchmark solver: {solver!r}")
+
+
+def run_case(solver, maze_args, options=None, repeat=3):
+    """
+    Generates the case's maze and measures one solver on it: best wall time
+    over 'repeat' runs, peak traced memory of one more run, and the nodes
+    expanded and result of that run.
+    """
+    if solver == "dijkstra":
+        maze = generate_image_maze(**maze_args)
+    else:
+        maze = generate_maze(**maze_args)
+    fn, summarize = _case_call(solver, maze, options or {})
+
+    seconds, _ = time_call(fn, None, repeat=repeat)
+    stats = SearchStats()
+    tracemalloc.start()
+    try:
+        result = fn(stats)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    height, width = maze.shape
+    record = {"seconds": seconds, "peak_bytes": peak, "cells": width * height}
+    record.update(summarize(result, stats))
+    return record
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(cases=SUITE, repeat=3, verbose=True):
+    # Runs every case and returns the JSON-serialisable report
+    report = {
+        "meta": {"commit": _git_commit(), "python": platform.python_version(), "numpy": np.__version__,
+                 "machine": platform.machine(), "repeat": repeat, "time": time.strftime("%Y-%m-%dT%H:%M:%S")},
+        "results": {},
+    }
+    for name, solver, maze_args, options in cases:
+        record = run_case(solver, maze_args, options, repeat)
+        report["results"][name] = record
+        if verbose:
+            print(f"{name:>32}: {record['seconds']:8.3f}s  {record['peak_bytes'] / 2 ** 20:8.1f} MiB  "
+                  f"expanded {record['expanded']:>9}  path {record['path_length']}", file=sys.stderr)
+    return report
+
+
+def compare_reports(old, new, tolerance=0.25):
+    """
+    Lists the differences that matter between two suite reports: cases that
+    got more than 'tolerance' slower or used more than 'tolerance' more
+    memory, and cases whose result (path length, cost, hp, score, nodes
+    expanded) changed.
+    """
+    problems = []
+    for name, now in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        for key in ("seconds", "peak_bytes"):
+            if before[key] and now[key] > before[key] * (1 + tolerance):
+                problems.append(f"{name}: {key} {before[key]:.4g} -> {now[key]:.4g} "
+                                f"(+{now[key] / before[key] - 1:.0%})")
+        for key in ("path_length", "cost", "hp", "score", "expanded"):
+            if key in before and before[key] != now.get(key):
+                problems.append(f"{name}: {key} changed {before[key]} -> {now.get(key)}")
+    return problems
+
+
+STARTUP_BUDGET = 0.5  # seconds from a cold interpreter to a printed BFS path
+HEAVY_MODULES = ("cv2", "PIL", "matplotlib")  # a headless solve must not import these
+_STARTUP_PROBE = ("import sys, maze_cli; status = maze_cli.main(sys.argv[1:]); "
+                  "print(*(m for m in %r if m in sys.modules)); sys.exit(status)" % (HEAVY_MODULES,))
+
+
+def bench_startup(budget=STARTUP_BUDGET, repeat=5):
+    """
+    Runs `maze_cli bfs` on a small generated level in a fresh interpreter
+    'repeat' times and prints the best and worst wall time. Returns the
+    problems found: a best time over 'budget' seconds, or any of
+    HEAVY_MODULES loaded by the solve.
+    """
+    problems = []
+    with tempfile.TemporaryDirectory() as tmp:
+        level = os.path.join(tmp, "startup.maze")
+        save_maze(generate_maze("perfect", 41, 41), level)
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            run = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, "bfs", level], capture_output=True,
+                                 text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+            times.append(time.perf_counter() - t0)
+            if run.returncode != 0:
+                return [f"maze_cli bfs failed: {run.stderr.strip()}"]
+    heavy = run.stdout.splitlines()[-1].split()
+    print(f"startup: best {min(times):.3f}s, worst {max(times):.3f}s (budget {budget:.3f}s), "
+          f"heavy modules: {', '.join(heavy) or 'none'}")
+    if min(times) > budget:
+        problems.append(f"startup: {min(times):.3f}s is over the {budget:.3f}s budget")
+    if heavy:
+        problems.append(f"startup: a headless solve imported {', '.join(heavy)}")
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the maze solvers.")
+    parser.add_argument('command', nargs='?', default='dijkstra', choices=('dijkstra', 'complex', 'suite', 'startup'))
+    parser.add_argument('--out', help="write the suite report (JSON) here")
+    parser.add_argument('--compare', help="earlier suite report to check for regressions")
+    parser.add_argument('--quick', action='store_true', help="only run the small cases")
+    parser.add_argument('--only', nargs='*', help="only run cases whose name starts with one of these")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--budget', type=float, default=STARTUP_BUDGET, help="startup budget in seconds")
+    args = parser.parse_args(argv)
+
+    if args.command == 'complex':
+        bench_complex_engines(repeat=args.repeat)
+        return 0
+
+    if args.command == 'startup':
+        problems = bench_startup(args.budget, max(args.repeat, 5))
+        for problem in problems:
+            print("REGRESSION " + problem, file=sys.stderr)
+        return 1 if problems else 0
+
+    if args.command == 'dijkstra':
+        bench_dijkstra_engines(repeat=args.repeat)
+        bench_dijkstra_modes(repeat=args.repeat)
+        return 0
+
+    cases = SUITE
+    if args.quick:
+        cases = [c for c in cases if c[0] in QUICK]
+    if args.only:
+        cases = [c for c in cases if c[0].startswith(tuple(args.only))]
+    report = run_suite(cases, args.repeat)
+    text = json.dumps(report, indent=2, sort_keys=True)
+    if args.out:
+        with open(args.out, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            problems = compare_reports(json.load(f), report, args.tolerance)
+        for problem in problems:
+            print("REGRESSION " + problem, file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
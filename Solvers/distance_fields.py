@@ -0,0 +1,243 @@
+"""
+Distance fields from points of interest, for multi-waypoint queries.
+
+A distance field is one complete BFS from a source cell: the number of
+steps to every reachable cell of the grid (walkable cells are the 0 cells,
+as in solve_bfs). With a field per point of interest (start, end, gems,
+hearts), any path or distance between them is a lookup instead of a new
+search:
+
+    fields = DistanceFields(maze)               # Maze, list of rows or .maze file
+    fields.distance(maze.start, gem)            # steps, or None if unreachable
+    fields.path(maze.start, gem)                # same path solve_bfs returns
+    fields.waypoint_path([maze.start, heart, maze.end])
+    fields.distance_matrix()                    # start, gems, hearts, end
+
+Fields live in an LRU cache keyed by the maze's content hash and the
+source cell, bounded by a memory budget, so a planner or service asking
+about the same maze again reuses them:
+
+    cache = FieldCache(max_bytes=512 * 2 ** 20)
+    fields = DistanceFields(maze, cache)
+"""
+
+from collections import OrderedDict, deque
+
+import numpy as np
+
+from maze import Maze, PATH, WALL, as_maze, grid_hash
+
+UNREACHED = -1
+
+
+class DistanceField:
+    """
+    Steps from 'source' ((x, y)) to every cell, as an int32 array indexed
+    [y, x], UNREACHED (-1) for walls and cells that cannot be reached.
+    """
+
+    def __init__(self, source, dist):
+        self.source = source
+        self.dist = dist
+        self._parent = None
+
+    @property
+    def nbytes(self):
+        return self.dist.nbytes + (0 if self._parent is None else self._parent.nbytes)
+
+    def distance(self, target):
+        d = int(self.dist[target[1], target[0]])
+        return None if d == UNREACHED else d
+
+    @property
+    def parent(self):
+        """
+        Flat index (y * cols + x) of each cell's predecessor towards the
+        source, -1 for the source and unreached cells. The first neighbour
+        one step closer wins, in solve_bfs's Up, Left, Down, Right order.
+        Computed from the distances on first use.
+        """
+        if self._parent is None:
+            dist = self.dist
+            rows, cols = dist.shape
+            index = np.arange(rows * cols, dtype=np.int32).reshape(rows, cols)
+            parent = np.full((rows, cols), -1, dtype=np.int32)
+            want = np.where(dist > 0, dist - 1, -2)  # no cell has distance -2
+            # walk the directions in reverse, so earlier ones overwrite later ones
+            for dy, dx in ((0, 1), (1, 0), (0, -1), (-1, 0)):
+                ys = slice(max(-dy, 0), rows - max(dy, 0))
+                xs = slice(max(-dx, 0), cols - max(dx, 0))
+                ny = slice(max(dy, 0), rows - max(-dy, 0))
+                nx = slice(max(dx, 0), cols - max(-dx, 0))
+                hit = dist[ny, nx] == want[ys, xs]
+                parent[ys, xs][hit] = index[ny, nx][hit]
+            self._parent = parent.ravel()
+        return self._parent
+
+    def path(self, target):
+        """
+        Path from the source to 'target' as a list of (x, y), identical to
+        solve_bfs(grid, source, target); [] if target is unreachable.
+        """
+        x, y = target
+        k = int(self.dist[y, x])
+        if k == UNREACHED:
+            return []
+        parent = self.parent
+        cols = self.dist.shape[1]
+        the_path = [(x, y)]
+        v = y * cols + x
+        for _ in range(k):
+            v = int(parent[v])
+            the_path.append((v % cols, v // cols))
+        return the_path[::-1]
+
+
+def bfs_field(grid, source):
+    """
+    Full BFS from 'source' over a uint8 grid indexed [y, x]. Returns the
+    int32 distance array (UNREACHED where no path exists). As in solve_bfs,
+    only a wall source is refused: a source on any other cell (e.g. a
+    bridge, 2) is searched from, and only 0 cells are stepped onto.
+    """
+    rows, cols = grid.shape
+    x, y = source
+    if not (0 <= x < cols and 0 <= y < rows) or grid[y, x] == WALL:
+        raise ValueError(f"Source {source} is not an open cell")
+    # flat bytearray/list state, like solve_bfs's queue mode
+    free = bytearray((grid.ravel() == PATH).tobytes())
+    dist = [UNREACHED] * (rows * cols)
+    start = y * cols + x
+    dist[start] = 0
+    queue = deque([start])
+    while queue:
+        idx = queue.popleft()
+        d = dist[idx] + 1
+        j = idx % cols
+        for n, ok in ((idx - cols, idx >= cols), (idx - 1, j > 0),
+                      (idx + cols, idx < (rows - 1) * cols), (idx + 1, j < cols - 1)):
+            if ok and free[n] and dist[n] == UNREACHED:
+                dist[n] = d
+                queue.append(n)
+    return np.array(dist, dtype=np.int32).reshape(rows, cols)
+
+
+class FieldCache:
+    """
+    LRU cache of DistanceFields keyed by (maze content hash, source). When
+    the fields held exceed max_bytes the least recently used are dropped.
+    A field larger than the whole budget is returned but not kept.
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._fields = OrderedDict()
+
+    def __len__(self):
+        return len(self._fields)
+
+    def get(self, key, compute):
+        field = self._fields.get(key)
+        if field is not None:
+            self.hits += 1
+            self._fields.move_to_end(key)
+            return field
+        self.misses += 1
+        field = compute()
+        self.put(key, field)
+        return field
+
+    def put(self, key, field):
+        old = self._fields.pop(key, None)
+        if old is not None:
+            self.nbytes -= old.nbytes
+        if field.nbytes > self.max_bytes:
+            return
+        self._fields[key] = field
+        self.nbytes += field.nbytes
+        while self.nbytes > self.max_bytes:
+            _, dropped = self._fields.popitem(last=False)
+            self.nbytes -= dropped.nbytes
+
+    def clear(self):
+        self._fields.clear()
+        self.nbytes = 0
+
+
+default_cache = FieldCache()
+
+
+class DistanceFields:
+    """
+    Distance queries on one maze, answered from cached per-source fields.
+    'maze' is a Maze, a .maze file or a list of rows; with a Maze the
+    points of interest default to its start, gems, hearts and end.
+    """
+
+    def __init__(self, maze, cache=None):
+        maze = as_maze(maze)
+        if isinstance(maze, Maze):
+            self.maze = maze
+            self.grid = maze.grid
+            self.key = maze.content_hash()
+        else:
+            self.maze = None
+            self.grid = np.ascontiguousarray(maze, dtype=np.uint8)
+            self.key = grid_hash(self.grid)
+        self.cache = default_cache if cache is None else cache
+
+    def points_of_interest(self):
+        if self.maze is None:
+            return []
+        m = self.maze
+        points = [m.start] + m.gem_list() + m.heart_list() + [m.end]
+        return [p for p in points if p is not None]
+
+    def field(self, source):
+        source = (int(source[0]), int(source[1]))
+
+        def compute():
+            field = DistanceField(source, bfs_field(self.grid, source))
+            field.parent  # built now, so the cache accounts for its memory
+            return field
+        return self.cache.get((self.key, source), compute)
+
+    def precompute(self, points=None):
+        # computes (or refreshes in the cache) the field of every point
+        for p in self.points_of_interest() if points is None else points:
+            self.field(p)
+
+    def distance(self, a, b):
+        return self.field(a).distance(b)
+
+    def path(self, a, b):
+        return self.field(a).path(b)
+
+    def waypoint_path(self, points):
+        """
+        Path visiting 'points' in order, joined without repeating the
+        waypoints (like the BFS heart demo). [] if any leg is unreachable.
+        """
+        full = []
+        for a, b in zip(points, points[1:]):
+            leg = self.path(a, b)
+            if not leg:
+                return []
+            full += leg if not full else leg[1:]
+        return full
+
+    def distance_matrix(self, points=None):
+        """
+        Pairwise step counts between 'points' (default: the points of
+        interest) as an int32 array, UNREACHED (-1) where there is no path.
+        """
+        points = self.points_of_interest() if points is None else list(points)
+        xs = np.array([p[0] for p in points], dtype=np.intp)
+        ys = np.array([p[1] for p in points], dtype=np.intp)
+        matrix = np.empty((len(points), len(points)), dtype=np.int32)
+        for i, p in enumerate(points):
+            matrix[i] = self.field(p).dist[ys, xs]
+        return matrix
@@ -0,0 +1,234 @@
+"""
+Frame sinks for solver animations.
+
+A solver hands every frame it produces to a sink instead of keeping a list
+of images in memory. Sinks write frames out as soon as they arrive, so a
+long animation only ever holds one frame at a time.
+
+    with GifSink('maze_sols/default_bfs_sol.gif', every=5) as sink:
+        solve_bfs(maze_grid, start_pos, end_pos, sink=sink)
+
+Solvers call sink.wants() before drawing a frame, so frames dropped by
+decimation (or by NullSink) are never rendered at all.
+"""
+
+import os
+import struct
+import zlib
+from io import BytesIO
+
+from PIL import GifImagePlugin, Image
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+
+
+class FrameSink:
+    """
+    Base class for all sinks.
+
+    every: keep one frame out of every N progress frames.
+    max_frames: stop accepting progress frames after this many were kept.
+    Final frames (the finished path held at the end) ignore both limits.
+    """
+
+    def __init__(self, every=1, max_frames=None):
+        if every < 1:
+            raise ValueError("every must be at least 1")
+        self.every = every
+        self.max_frames = max_frames
+        self.offered = 0  # progress frames the solver could have drawn
+        self.written = 0  # frames actually handed to write()
+        self.closed = False
+
+    def wants(self, final=False):
+        if final:
+            return True
+        self.offered += 1
+        if self.max_frames is not None and self.written >= self.max_frames:
+            return False
+        return (self.offered - 1) % self.every == 0
+
+    def add(self, im):
+        if self.closed:
+            raise ValueError("Frame sink is already closed")
+        self.written += 1
+        self.write(im)
+
+    def write(self, im):
+        raise NotImplementedError
+
+    def close(self):
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+class NullSink(FrameSink):
+    """
+    No-render mode: the solver never draws a single frame.
+    """
+
+    def wants(self, final=False):
+        return False
+
+    def write(self, im):
+        pass
+
+
+class ListSink(FrameSink):
+    """
+    Keeps the frames in memory (the old behaviour), e.g. for notebooks.
+    """
+
+    def __init__(self, every=1, max_frames=None):
+        super().__init__(every, max_frames)
+        self.images = []
+
+    def write(self, im):
+        self.images.append(im)
+
+
+class DirectorySink(FrameSink):
+    """
+    Writes every frame as a numbered image file (frame_000000.png, ...).
+    """
+
+    def __init__(self, directory, every=1, max_frames=None, ext='png'):
+        super().__init__(every, max_frames)
+        self.directory = directory
+        self.ext = ext
+        os.makedirs(directory, exist_ok=True)
+
+    def write(self, im):
+        name = f"frame_{self.written - 1:06d}.{self.ext}"
+        im.save(os.path.join(self.directory, name))
+
+
+class GifSink(FrameSink):
+    """
+    Streams frames into an animated GIF.
+
+    All frames share the 216 colour web palette (which contains the pure
+    black/white/red/green used by the solvers), so each frame can be
+    encoded and written as soon as it arrives.
+    """
+
+    def __init__(self, filename, every=1, max_frames=None, duration=50, loop=0):
+        super().__init__(every, max_frames)
+        self.filename = filename
+        self.duration = duration
+        self.loop = loop
+        self.fp = None
+
+    def write(self, im):
+        frame = im.convert('RGB').convert('P', palette=Image.Palette.WEB, dither=Image.Dither.NONE)
+        if self.fp is None:
+            self.fp = open(self.filename, 'wb')
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': self.loop, 'optimize': False})
+            for chunk in header:
+                self.fp.write(chunk)
+        for chunk in GifImagePlugin.getdata(frame, duration=self.duration):
+            self.fp.write(chunk)
+
+    def close(self):
+        if self.fp is not None and not self.closed:
+            self.fp.write(b';')  # GIF trailer
+            self.fp.close()
+        super().close()
+
+
+class ApngSink(FrameSink):
+    """
+    Streams frames into an animated PNG.
+
+    Each frame is PNG-encoded on its own and its image data copied into the
+    output as IDAT (first frame) or fdAT (later frames) chunks. The frame
+    count in the acTL chunk is patched in when the sink is closed.
+    """
+
+    def __init__(self, filename, every=1, max_frames=None, duration=50, loop=0):
+        super().__init__(every, max_frames)
+        self.filename = filename
+        self.duration = duration
+        self.loop = loop
+        self.fp = None
+        self.size = None
+        self.sequence = 0
+        self.actl_offset = None
+
+    def _chunk(self, kind, data):
+        self.fp.write(struct.pack('>I', len(data)) + kind + data)
+        self.fp.write(struct.pack('>I', zlib.crc32(kind + data) & 0xffffffff))
+
+    def write(self, im):
+        frame = im.convert('RGB')
+        if self.size is not None and frame.size != self.size:
+            raise ValueError(f"Frame size {frame.size} does not match {self.size}")
+        chunks = _read_png_chunks(frame)
+
+        if self.fp is None:
+            self.size = frame.size
+            self.fp = open(self.filename, 'wb')
+            self.fp.write(PNG_SIGNATURE)
+            self._chunk(b'IHDR', chunks[0][1])
+            self.actl_offset = self.fp.tell()
+            self._chunk(b'acTL', struct.pack('>II', 0, self.loop))
+
+        width, height = self.size
+        self._chunk(b'fcTL', struct.pack('>IIIIIHHBB', self.sequence, width, height, 0, 0,
+                                         self.duration, 1000, 0, 0))
+        self.sequence += 1
+        for kind, data in chunks:
+            if kind != b'IDAT':
+                continue
+            if self.written == 1:
+                self._chunk(b'IDAT', data)
+            else:
+                self._chunk(b'fdAT', struct.pack('>I', self.sequence) + data)
+                self.sequence += 1
+
+    def close(self):
+        if self.fp is not None and not self.closed:
+            self._chunk(b'IEND', b'')
+            self.fp.seek(self.actl_offset)
+            self._chunk(b'acTL', struct.pack('>II', self.written, self.loop))
+            self.fp.close()
+        super().close()
+
+
+def _read_png_chunks(im):
+    # Encode one frame as a plain PNG and split it into (type, data) chunks
+    buf = BytesIO()
+    im.save(buf, 'PNG')
+    raw = buf.getvalue()
+    chunks = []
+    pos = len(PNG_SIGNATURE)
+    while pos < len(raw):
+        length, kind = struct.unpack('>I4s', raw[pos:pos + 8])
+        chunks.append((kind, raw[pos + 8:pos + 8 + length]))
+        pos += 12 + length
+    return chunks
+
+
+def open_sink(filename, every=1, max_frames=None, duration=50):
+    """
+    Picks a sink from the output name: .gif, .png/.apng, or a directory
+    (a name with no extension, or ending in a path separator). None gives a
+    NullSink (no rendering). Any other extension raises ValueError.
+    """
+    if filename is None:
+        return NullSink()
+    if filename.endswith((os.sep, '/')) or os.path.isdir(filename):
+        return DirectorySink(filename, every, max_frames)
+    ext = os.path.splitext(filename)[1].lower()
+    if ext == '.gif':
+        return GifSink(filename, every, max_frames, duration)
+    if ext in ('.png', '.apng'):
+        return ApngSink(filename, every, max_frames, duration)
+    if ext:
+        raise ValueError(f"Unknown animation format {ext!r}: use .gif, .png/.apng or a directory")
+    return DirectorySink(filename, every, max_frames)
@@ -0,0 +1,378 @@
+"""
+Hierarchical (HPA*-style) pathfinding for very large grids and images.
+
+The grid or image is cut into square clusters. Where two neighbouring
+clusters can be crossed, entrance cells are placed on both sides of the
+border, and the cost between every pair of entrances inside a cluster is
+precomputed with a search limited to that cluster. A query then only
+searches this small abstract graph (plus the start and goal clusters) and
+refines each abstract step with a local search inside one cluster.
+
+    graph = HierarchicalGraph.from_grid(maze_grid, cluster_size=32)   # solve_bfs's 0/1 grids
+    graph = HierarchicalGraph.from_image(img, cluster_size=64)        # Dijkstra.py's pixel graph
+    path, cost = graph.path(start, end)                               # [(x, y), ...] start -> end
+
+    graph.edit_grid({(x, y): 1})        # or graph.edit_image(x, y, patch)
+
+Edits only rebuild the clusters they touch (and the entrances those
+clusters share with their neighbours).
+
+Paths are near-optimal, not optimal: the abstract graph only crosses
+borders at the chosen entrances. On 0/1 grids with narrow doors the
+result is usually the BFS length or within a few percent of it.
+
+Both kinds of graph are stored as two edge-weight planes like
+Dijkstra.down_right_weights: down[r][c] is the weight from (r, c) to
+(r + 1, c), right[r][c] from (r, c) to (r, c + 1), inf where there is no
+edge. Weights are symmetric.
+"""
+
+import heapq
+
+import numpy as np
+
+from maze import Maze, PATH, as_maze
+
+INF = float('inf')
+LONG_ENTRANCE = 6  # entrances at least this wide get a node at each end
+
+
+def grid_weights(grid):
+    # unit-cost edges between open (0) cells, as solve_bfs moves
+    open_ = np.asarray(grid) == PATH
+    down = np.full(open_.shape, np.inf)
+    right = np.full(open_.shape, np.inf)
+    down[:-1][open_[:-1] & open_[1:]] = 1.0
+    right[:, :-1][open_[:, :-1] & open_[:, 1:]] = 1.0
+    return down, right
+
+
+class HierarchicalGraph:
+    def __init__(self, down, right, cluster_size=32, split=None):
+        if cluster_size < 2:
+            raise ValueError("cluster_size must be at least 2")
+        self.down = down
+        self.right = right
+        self.rows, self.cols = down.shape
+        self.size = cluster_size
+        self.grid = None  # set by from_grid, for edit_grid
+        self.image = None  # set by from_image, for edit_image
+        finite = np.concatenate((down[np.isfinite(down)], right[np.isfinite(right)]))
+        self.min_weight = float(finite.min()) if finite.size else 1.0
+        self.split = 2 * self.min_weight if split is None else split
+
+        self.crows = (self.rows + cluster_size - 1) // cluster_size
+        self.ccols = (self.cols + cluster_size - 1) // cluster_size
+        self.nodes = {}  # cluster -> set of entrance cells (flat index)
+        self.refs = {}  # entrance cell -> number of border entrances using it
+        self.inter = {}  # entrance cell -> {cell across the border: weight}
+        self.intra = {}  # cluster -> {cell: {cell: cost}}
+        self.entrances = {}  # border -> [(cell, cell across, weight)]
+        self._rebuild({(cr, cc) for cr in range(self.crows) for cc in range(self.ccols)})
+
+    # --- constructors ---
+
+    @classmethod
+    def from_grid(cls, grid, cluster_size=32):
+        grid = as_maze(grid)
+        if isinstance(grid, Maze):
+            grid = grid.grid
+        grid = np.array(grid, dtype=np.uint8)
+        graph = cls(*grid_weights(grid), cluster_size)
+        graph.grid = grid
+        return graph
+
+    @classmethod
+    def from_image(cls, img, cluster_size=64):
+        import Dijkstra
+
+        img = as_maze(img)
+        if isinstance(img, Maze):
+            img = img.image
+        graph = cls(*Dijkstra.down_right_weights(img), cluster_size)
+        graph.image = np.array(img)
+        return graph
+
+    # --- clusters ---
+
+    def cluster_of(self, cell):
+        r, c = divmod(cell, self.cols)
+        return r // self.size, c // self.size
+
+    def bounds(self, cluster):
+        cr, cc = cluster
+        return (cr * self.size, min((cr + 1) * self.size, self.rows),
+                cc * self.size, min((cc + 1) * self.size, self.cols))
+
+    def _borders(self, cluster):
+        # borders (cluster, right/lower neighbour) that 'cluster' is part of
+        cr, cc = cluster
+        out = []
+        for a, b in (((cr, cc - 1), cluster), (cluster, (cr, cc + 1)), ((cr - 1, cc), cluster), (cluster, (cr + 1, cc))):
+            if 0 <= a[0] and 0 <= a[1] and b[0] < self.crows and b[1] < self.ccols:
+                out.append((a, b))
+        return out
+
+    def _find_entrances(self, border):
+        """
+        (cell, cell across, weight) for each entrance on one border. The
+        border is cut into runs of crossable edges; a run also ends where a
+        step along the border (on either side) costs more than self.split,
+        so e.g. a corridor and the wall next to it get separate entrances.
+        """
+        a, b = border
+        r0, r1, c0, c1 = self.bounds(a)
+        if a[0] == b[0]:  # left/right neighbours: cross right[r][c1 - 1]
+            weights = self.right[r0:r1, c1 - 1]
+            along = np.maximum(self.down[r0:r1 - 1, c1 - 1], self.down[r0:r1 - 1, c1])
+            cells = [(r * self.cols + c1 - 1, r * self.cols + c1) for r in range(r0, r1)]
+        else:  # upper/lower neighbours: cross down[r1 - 1][c]
+            weights = self.down[r1 - 1, c0:c1]
+            along = np.maximum(self.right[r1 - 1, c0:c1 - 1], self.right[r1, c0:c1 - 1])
+            cells = [((r1 - 1) * self.cols + c, r1 * self.cols + c) for c in range(c0, c1)]
+        crossable = np.isfinite(weights).tolist()
+        joined = (along <= self.split).tolist()
+        entrances = []
+        i, n = 0, len(cells)
+        while i < n:
+            if not crossable[i]:
+                i += 1
+                continue
+            j = i
+            while j + 1 < n and crossable[j + 1] and joined[j]:
+                j += 1
+            for k in ((i, j) if j - i + 1 >= LONG_ENTRANCE else ((i + j) // 2,)):
+                entrances.append((cells[k][0], cells[k][1], float(weights[k])))
+            i = j + 1
+        return entrances
+
+    def _rebuild(self, clusters):
+        """
+        Recomputes the entrances on every border of 'clusters' and the
+        intra-cluster costs of those clusters and of the neighbours whose
+        entrances changed.
+        """
+        borders = {b for cluster in clusters for b in self._borders(cluster)}
+        affected = set(clusters)
+        for border in borders:
+            affected.update(border)
+            for u, v, _ in self.entrances.pop(border, []):
+                self.inter[u].pop(v, None)
+                self.inter[v].pop(u, None)
+                self._unref(u)
+                self._unref(v)
+            entrances = self._find_entrances(border)
+            self.entrances[border] = entrances
+            for u, v, w in entrances:
+                self.inter.setdefault(u, {})[v] = w
+                self.inter.setdefault(v, {})[u] = w
+                self._ref(u)
+                self._ref(v)
+        for cluster in affected:
+            self._build_intra(cluster)
+
+    def _ref(self, cell):
+        self.refs[cell] = self.refs.get(cell, 0) + 1
+        self.nodes.setdefault(self.cluster_of(cell), set()).add(cell)
+
+    def _unref(self, cell):
+        self.refs[cell] -= 1
+        if not self.refs[cell]:
+            del self.refs[cell]
+            del self.inter[cell]
+            self.nodes[self.cluster_of(cell)].discard(cell)
+
+    def _build_intra(self, cluster):
+        nodes = self.nodes.get(cluster, set())
+        block = self._block(cluster)
+        edges = {u: {} for u in nodes}
+        order = sorted(nodes)
+        for k, u in enumerate(order):
+            # costs are symmetric: search from u only for the nodes after it
+            found, _ = self._local_search(block, u, order[k + 1:])
+            for v, d in found.items():
+                edges[u][v] = edges[v][u] = d
+        self.intra[cluster] = edges
+
+    def _block(self, cluster):
+        # the cluster's edge weights as flat lists, edges leaving it set to inf
+        r0, r1, c0, c1 = self.bounds(cluster)
+        down = self.down[r0:r1, c0:c1].copy()
+        right = self.right[r0:r1, c0:c1].copy()
+        down[-1] = np.inf
+        right[:, -1] = np.inf
+        return r0, c0, c1 - c0, down.ravel().tolist(), right.ravel().tolist()
+
+    def _local_search(self, block, source, targets):
+        """
+        Dijkstra from 'source' limited to one cluster's block, until every
+        cell in 'targets' is settled. Returns ({target: distance}, parent)
+        where parent holds block-local indices.
+        """
+        r0, c0, w, down, right = block
+        cols = self.cols
+
+        def local(cell):
+            r, c = divmod(cell, cols)
+            return (r - r0) * w + c - c0
+        wanted = {local(v): v for v in targets}
+        found = {}
+        s = local(source)
+        dist = [INF] * len(down)
+        parent = [-1] * len(down)
+        dist[s] = 0.0
+        pq = [(0.0, s)]
+        while pq and len(found) < len(wanted):
+            d, i = heapq.heappop(pq)
+            if d > dist[i]:
+                continue
+            if i in wanted:
+                found[wanted[i]] = d
+            # right[] is inf in the last column, so right[i - 1] also guards the left edge
+            for j, cost in ((i - w, down[i - w] if i >= w else INF), (i + w, down[i]),
+                            (i - 1, right[i - 1] if i else INF), (i + 1, right[i])):
+                nd = d + cost
+                if cost != INF and nd < dist[j]:
+                    dist[j] = nd
+                    parent[j] = i
+                    heapq.heappush(pq, (nd, j))
+        return found, parent
+
+    def _local_path(self, cluster, a, b):
+        block = self._block(cluster)
+        r0, c0, w = block[:3]
+        _, parent = self._local_search(block, a, {b})
+        ra, ca = divmod(a, self.cols)
+        rb, cb = divmod(b, self.cols)
+        i, stop = (rb - r0) * w + cb - c0, (ra - r0) * w + ca - c0
+        out = [i]
+        while i != stop:
+            i = parent[i]
+            out.append(i)
+        return [(r0 + i // w) * self.cols + c0 + i % w for i in reversed(out)]
+
+    # --- queries ---
+
+    def path(self, start, end, stats=None):
+        """
+        Path from start to end, both (x, y), as ([(x, y), ...], cost), or
+        ([], inf) if the abstract graph has no route.
+        stats, a search_stats.SearchStats, counts "abstract_expanded" and
+        "refined" (cells on refined segments).
+        """
+        cols = self.cols
+        s = start[1] * cols + start[0]
+        t = end[1] * cols + end[0]
+        if s == t:
+            return [tuple(start)], 0.0
+        cs, ct = self.cluster_of(s), self.cluster_of(t)
+
+        # temporary edges from start and to end inside their clusters
+        extra = {s: {}, t: {}}
+        targets = self.nodes.get(cs, set()) | ({t} if cs == ct else set())
+        found, _ = self._local_search(self._block(cs), s, targets)
+        for v, d in found.items():
+            extra[s][v] = d
+        found, _ = self._local_search(self._block(ct), t, self.nodes.get(ct, set()))
+        for v, d in found.items():
+            extra.setdefault(v, {})[t] = d
+
+        tx, ty = end
+        h_scale = self.min_weight * (1 - 1e-9)
+
+        def h(u):
+            r, c = divmod(u, cols)
+            return h_scale * (abs(c - tx) + abs(r - ty))
+
+        dist = {s: 0.0}
+        parent = {s: None}
+        done = set()
+        pq = [(h(s), 0.0, s)]
+        expanded = 0
+        while pq:
+            _, d, u = heapq.heappop(pq)
+            if u in done:
+                continue
+            done.add(u)
+            expanded += 1
+            if u == t:
+                break
+            neighbours = list(self.inter.get(u, {}).items())
+            if u in self.refs:
+                neighbours += self.intra[self.cluster_of(u)][u].items()
+            neighbours += extra.get(u, {}).items()
+            for v, w in neighbours:
+                nd = d + w
+                if nd < dist.get(v, INF):
+                    dist[v] = nd
+                    parent[v] = u
+                    heapq.heappush(pq, (nd + h(v), nd, v))
+        if t not in done:
+            print("Target unreachable from Start.")
+            return [], INF
+
+        abstract = [t]
+        while parent[abstract[-1]] is not None:
+            abstract.append(parent[abstract[-1]])
+        abstract.reverse()
+
+        cells = [s]
+        for a, b in zip(abstract, abstract[1:]):
+            ca, cb = self.cluster_of(a), self.cluster_of(b)
+            if ca != cb:
+                cells.append(b)  # crossing a border
+            else:
+                cells += self._local_path(ca, a, b)[1:]
+        if stats is not None:
+            stats.count("abstract_expanded", expanded)
+            stats.count("refined", len(cells))
+        return [(v % cols, v // cols) for v in cells], dist[t]
+
+    # --- edits ---
+
+    def rebuild_region(self, r0, r1, c0, c1):
+        """
+        Call after changing down/right for rows r0..r1-1 and columns
+        c0..c1-1: rebuilds only the clusters overlapping that region.
+        """
+        s = self.size
+        clusters = {(cr, cc) for cr in range(max(r0, 0) // s, (min(r1, self.rows) - 1) // s + 1)
+                    for cc in range(max(c0, 0) // s, (min(c1, self.cols) - 1) // s + 1)}
+        self._rebuild(clusters)
+        return clusters
+
+    def edit_grid(self, cells):
+        """
+        Sets grid cells ({(x, y): value}, e.g. 1 to add a wall) and rebuilds
+        the affected clusters. Returns the set of rebuilt clusters.
+        """
+        if self.grid is None:
+            raise ValueError("edit_grid needs a graph built with from_grid")
+        for (x, y), value in cells.items():
+            self.grid[y, x] = value
+        xs = [x for x, _ in cells]
+        ys = [y for _, y in cells]
+        r0, r1 = max(min(ys) - 1, 0), min(max(ys) + 2, self.rows)
+        c0, c1 = max(min(xs) - 1, 0), min(max(xs) + 2, self.cols)
+        down, right = grid_weights(self.grid[r0:r1, c0:c1])
+        self.down[r0:r1 - 1, c0:c1] = down[:-1]
+        self.right[r0:r1, c0:c1 - 1] = right[:, :-1]
+        return self.rebuild_region(r0, r1, c0, c1)
+
+    def edit_image(self, x, y, patch):
+        """
+        Pastes 'patch' (h, w, 3) into the image at (x, y), recomputes the
+        edge weights around it and rebuilds the affected clusters.
+        """
+        import Dijkstra
+
+        if self.image is None:
+            raise ValueError("edit_image needs a graph built with from_image")
+        h, w = patch.shape[:2]
+        self.image[y:y + h, x:x + w] = patch
+        r0, r1 = max(y - 1, 0), min(y + h + 1, self.rows)
+        c0, c1 = max(x - 1, 0), min(x + w + 1, self.cols)
+        down, right = Dijkstra.down_right_weights(self.image[r0:r1, c0:c1])
+        self.down[r0:r1 - 1, c0:c1] = down[:-1]
+        self.right[r0:r1, c0:c1 - 1] = right[:, :-1]
+        return self.rebuild_region(r0, r1, c0, c1)
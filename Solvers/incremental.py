@@ -0,0 +1,263 @@
+"""
+Incremental replanning with Lifelong Planning A* (LPA*).
+
+A plain solver forgets everything between calls, so opening one wall or
+defeating one monster means searching the whole level again. LPAStar keeps
+its g / rhs values and priority queue between calls: after some cells
+change cost it only re-expands the cells whose distance from the start
+actually changed.
+
+    search = LPAStar.from_grid(maze_grid, start, end)   # 0 cells, unit steps
+    path = search.path()
+    search.set_costs({(2, 1): 1, (4, 2): 1})            # open two walls
+    path = search.path()                                # repaired, not re-solved
+
+Costs are per cell: costs[y][x] is the cost of stepping onto (x, y), inf
+for cells that cannot be entered. Bridges ({(x, y): "NS" or "EW"}) may be
+entered from any side but only left along their orientation, as in
+advanced_dijkstra.py.
+
+IncrementalSolver wraps one LPAStar per (start, goal) pair behind
+solve_dijkstra_complex's signature, so the gem planners can use it:
+
+    plan_held_karp(maze, solver=IncrementalSolver())
+
+The planners re-solve the same segment with different monsters defeated;
+each such call only repairs the cells around the defeated monsters.
+"""
+
+import heapq
+from collections import OrderedDict
+
+import numpy as np
+
+from maze import PATH, WALL
+
+INF = float('inf')
+
+
+class LPAStar:
+    """
+    LPA* from 'start' to 'goal' ((x, y)) over a 2D cost array. min_cost is
+    a lower bound on every finite cell cost (default: the smallest one) and
+    scales the Manhattan heuristic, so it must stay valid as costs change.
+    """
+
+    def __init__(self, costs, start, goal, bridges=None, min_cost=None):
+        costs = np.asarray(costs, dtype=np.float64)
+        self.rows, self.cols = costs.shape
+        self.costs = costs.copy()
+        self.cost = costs.ravel().tolist()
+        if min_cost is None:
+            finite = costs[np.isfinite(costs)]
+            min_cost = float(finite.min()) if finite.size else 1.0
+        self.min_cost = min_cost
+        self.bridge_at = {y * self.cols + x: o for (x, y), o in (bridges or {}).items()}
+        self.last_row = (self.rows - 1) * self.cols
+        self.start = start[1] * self.cols + start[0]
+        self.goal = goal[1] * self.cols + goal[0]
+        n = self.rows * self.cols
+        self.g = [INF] * n
+        self.rhs = [INF] * n
+        self.rhs[self.start] = 0.0
+        self.queued = {}  # cell -> its key while it is in the queue
+        self.queue = []
+        self.expanded = 0  # total over every compute()
+        self._push(self.start)
+
+    @classmethod
+    def from_grid(cls, grid, start, goal):
+        # solve_bfs's rules: 0 cells cost one step, everything else is blocked
+        return cls(grid_costs(grid), start, goal, min_cost=1.0)
+
+    # --- graph ---
+
+    def _neighbours(self, v):
+        cols = self.cols
+        x = v % cols
+        return [u for u, ok in ((v - cols, v >= cols), (v - 1, x > 0), (v + cols, v < self.last_row),
+                                (v + 1, x < cols - 1)) if ok]
+
+    def _moves(self, u):
+        # cells reachable in one step from u
+        orientation = self.bridge_at.get(u)
+        if orientation is None:
+            return self._neighbours(u)
+        vertical = orientation == "NS"
+        return [v for v in self._neighbours(u) if (abs(v - u) == self.cols) == vertical]
+
+    def _preds(self, v):
+        # cells that can step onto v: its neighbours, unless a bridge forbids it
+        return [u for u in self._neighbours(v) if u not in self.bridge_at or v in self._moves(u)]
+
+    # --- LPA* ---
+
+    def _key(self, u):
+        m = min(self.g[u], self.rhs[u])
+        x, y = u % self.cols, u // self.cols
+        gx, gy = self.goal % self.cols, self.goal // self.cols
+        return m + self.min_cost * (abs(x - gx) + abs(y - gy)), m
+
+    def _push(self, u):
+        key = self._key(u)
+        self.queued[u] = key
+        heapq.heappush(self.queue, (key, u))
+
+    def _update(self, u):
+        if u != self.start:
+            cost = self.cost[u]
+            best = INF
+            if cost != INF:
+                for p in self._preds(u):
+                    if self.g[p] + cost < best:
+                        best = self.g[p] + cost
+            self.rhs[u] = best
+        if self.g[u] != self.rhs[u]:
+            self._push(u)
+        else:
+            self.queued.pop(u, None)
+
+    def _top(self):
+        # smallest valid queue entry (stale entries are dropped lazily)
+        queue = self.queue
+        while queue:
+            key, u = queue[0]
+            if self.queued.get(u) == key:
+                return key, u
+            heapq.heappop(queue)
+        return (INF, INF), None
+
+    def compute(self):
+        """
+        Brings g up to date for the goal. Returns the number of cells
+        expanded by this call.
+        """
+        goal = self.goal
+        expanded = 0
+        while True:
+            key, u = self._top()
+            if u is None or (key >= self._key(goal) and self.rhs[goal] == self.g[goal]):
+                break
+            heapq.heappop(self.queue)
+            del self.queued[u]
+            expanded += 1
+            if self.g[u] > self.rhs[u]:
+                self.g[u] = self.rhs[u]
+                for v in self._moves(u):
+                    self._update(v)
+            else:
+                self.g[u] = INF
+                self._update(u)
+                for v in self._moves(u):
+                    self._update(v)
+        self.expanded += expanded
+        return expanded
+
+    def set_costs(self, cells):
+        # {(x, y): new cost}; the next path() repairs around them
+        for (x, y), cost in cells.items():
+            self.costs[y, x] = cost
+            v = y * self.cols + x
+            self.cost[v] = float(cost)
+            self._update(v)
+
+    def update_costs(self, costs):
+        # Replaces the whole cost array, updating only the cells that differ
+        costs = np.asarray(costs, dtype=np.float64)
+        ys, xs = np.nonzero(costs != self.costs)
+        self.set_costs({(int(x), int(y)): costs[y, x] for y, x in zip(ys, xs)})
+        return len(ys)
+
+    def path(self, stats=None):
+        """
+        Cheapest path from start to goal as a list of (x, y), [] if the goal
+        cannot be reached. stats, a search_stats.SearchStats, counts the
+        "expanded" cells of this repair.
+        """
+        expanded = self.compute()
+        if stats is not None:
+            stats.count("searches")
+            stats.count("expanded", expanded)
+        if self.g[self.goal] == INF:
+            return []
+        # walk back from the goal along predecessors that explain g; among
+        # equally good ones take the smallest (x, y), the one
+        # solve_dijkstra_complex's heap pops first and keeps as the parent
+        cols = self.cols
+        v = self.goal
+        out = [v]
+        while v != self.start:
+            v = min(self._preds(v), key=lambda p: (self.g[p], p % cols, p // cols))
+            out.append(v)
+        return [(v % self.cols, v // self.cols) for v in reversed(out)]
+
+    @property
+    def distance(self):
+        return self.g[self.goal]
+
+
+def grid_costs(grid):
+    # unit step costs for solve_bfs's 0 cells, inf elsewhere
+    return np.where(np.asarray(grid) == PATH, 1.0, INF)
+
+
+def level_costs(a, monsters, damage_field):
+    """
+    solve_dijkstra_complex's step costs: step_score + damage * hp_score for
+    every tile that is not a wall (monster tiles are open even on a wall).
+    """
+    import advanced_dijkstra
+
+    open_ = np.asarray(a) != WALL
+    for x, y in monsters:
+        open_[y, x] = True
+    return np.where(open_, advanced_dijkstra.step_score + damage_field * advanced_dijkstra.hp_score, INF)
+
+
+class IncrementalSolver:
+    """
+    Drop-in replacement for solve_dijkstra_complex that keeps an LPAStar
+    per (start, goal) pair (the last max_searches of them) and repairs it
+    when the same segment is asked for again with other monsters defeated.
+    Use one instance per level.
+
+    The LPA* path minimises the same score as solve_dijkstra_complex, and
+    breaks ties between equally scored paths the same way, so the planners
+    find the same plans; it ignores HP on the way, and if that path is not
+    survivable the call falls back to solve_dijkstra_complex.
+    """
+
+    def __init__(self, max_searches=256):
+        self.max_searches = max_searches
+        self.searches = OrderedDict()
+        self.fallbacks = 0
+
+    def __call__(self, a, start, end, current_health, bridges=None, current_monsters=None, damage_field=None,
+                 stats=None):
+        import advanced_dijkstra
+
+        a, bridges, current_monsters = advanced_dijkstra.unpack_level(a, bridges, current_monsters)
+        if damage_field is None:
+            damage_field = advanced_dijkstra.build_damage_field((len(a), len(a[0])), current_monsters)
+        costs = level_costs(a, current_monsters, damage_field)
+
+        key = (tuple(start), tuple(end))
+        search = self.searches.get(key)
+        if search is None or search.costs.shape != costs.shape:
+            search = LPAStar(costs, start, end, bridges, min_cost=advanced_dijkstra.step_score)
+            self.searches[key] = search
+            if len(self.searches) > self.max_searches:
+                self.searches.popitem(last=False)
+        else:
+            self.searches.move_to_end(key)
+            search.update_costs(costs)
+
+        path = search.path(stats)
+        if not path:
+            return None
+        hp = current_health - int(sum(damage_field[y, x] for x, y in path[1:]))
+        if hp <= 0:
+            self.fallbacks += 1
+            return advanced_dijkstra.solve_dijkstra_complex(a, start, end, current_health, bridges, current_monsters,
+                                                            damage_field, stats=stats)
+        return path, hp
@@ -0,0 +1,163 @@
+"""
+Jump Point Search for uniform-cost grid mazes (4-connected moves).
+
+In open rooms solve_bfs labels every cell. JPS instead runs A* over "jump
+points": from each expanded cell it scans in a straight line and only
+stops where the path could turn (a forced neighbour), at the goal, or at a
+cell next to a bridge. Straight runs between jump points are never put on
+the queue, so large open areas cost a handful of expansions.
+
+    path = solve_jps(maze)                       # Maze, .maze file or list of rows
+    path = solve_jps(grid, start, end, bridges={(4, 4): "NS"})
+
+The paths have the same length as solve_bfs's (they may take a different
+one of several equally short routes). The pruning rules follow the
+orthogonal-only ("never move diagonally") variant of JPS.
+
+Walkable cells are the 0 cells plus the bridge cells listed in 'bridges'
+({(x, y): "NS" or "EW"}), and the start and end unless they are walls (as
+in solve_bfs, a value 2 start or end is still a valid endpoint). As in advanced_dijkstra.py, a bridge may be
+entered from any side but only left along its orientation. The pruning
+rules assume every cell can be left in any direction, so bridges and the
+cells around them (and around the endpoints) are always jump points and are expanded without pruning.
+"""
+
+import heapq
+
+import numpy as np
+
+from maze import Maze, PATH, WALL, as_maze
+
+# (dx, dy) moves allowed out of a bridge cell
+BRIDGE_MOVES = {"NS": ((0, -1), (0, 1)), "EW": ((-1, 0), (1, 0))}
+ALL_MOVES = ((0, -1), (-1, 0), (0, 1), (1, 0))  # Up, Left, Down, Right, like solve_bfs
+
+
+def solve_jps(a, start=None, end=None, bridges=None, stats=None):
+    """
+    Shortest 4-connected path from start to end, both (x, y), as a list of
+    (x, y) from start to end; [] if there is none. With a Maze, start, end
+    and bridges default to the maze's own.
+    stats, a search_stats.SearchStats, gets the usual heap counters
+    (expanded = jump points expanded) plus "scanned", the cells looked at
+    while jumping.
+    """
+    a = as_maze(a)
+    if isinstance(a, Maze):
+        start = a.start if start is None else start
+        end = a.end if end is None else end
+        bridges = a.bridge_dict() if bridges is None else bridges
+        grid = a.grid
+    else:
+        grid = np.asarray(a, dtype=np.uint8)
+        bridges = bridges or {}
+    rows, cols = grid.shape
+
+    start_x, start_y = start
+    end_x, end_y = end
+    if not (0 <= start_x < cols and 0 <= start_y < rows and 0 <= end_x < cols and 0 <= end_y < rows) \
+            or grid[start_y, start_x] == WALL or grid[end_y, end_x] == WALL:
+        print(f"Error: Start {start} or End {end} is inside a wall.")
+        return []
+
+    walkable = grid == PATH
+    special = np.zeros((rows, cols), dtype=bool)
+    for bx, by in list(bridges) + [tuple(start), tuple(end)]:
+        if 0 <= bx < cols and 0 <= by < rows:
+            walkable[by, bx] = True
+            special[max(by - 1, 0):by + 2, max(bx - 1, 0):bx + 2] = True
+    walk = bytearray(walkable.ravel().tobytes())
+    spec = bytearray(special.ravel().tobytes())
+
+    scanned = 0
+
+    def w(x, y):
+        return 0 <= x < cols and 0 <= y < rows and walk[y * cols + x]
+
+    def jump(x, y, dx, dy):
+        # Step from (x, y) in direction (dx, dy) until a jump point; None if blocked
+        nonlocal scanned
+        while True:
+            x += dx
+            y += dy
+            scanned += 1
+            if not w(x, y):
+                return None
+            if (x == end_x and y == end_y) or spec[y * cols + x]:
+                return x, y
+            if dx:
+                if (w(x, y - 1) and not w(x - dx, y - 1)) or (w(x, y + 1) and not w(x - dx, y + 1)):
+                    return x, y
+            else:
+                if (w(x - 1, y) and not w(x - 1, y - dy)) or (w(x + 1, y) and not w(x + 1, y - dy)):
+                    return x, y
+                # a vertical run must stop wherever a horizontal run would find a jump point
+                if jump(x, y, 1, 0) is not None or jump(x, y, -1, 0) is not None:
+                    return x, y
+
+    def moves(x, y, parent):
+        if (x, y) in bridges:
+            return BRIDGE_MOVES[bridges[(x, y)]]
+        if parent is None or spec[y * cols + x]:
+            return ALL_MOVES
+        px, py = parent
+        if x != px:
+            dx = 1 if x > px else -1
+            return (0, -1), (0, 1), (dx, 0)
+        dy = 1 if y > py else -1
+        return (-1, 0), (1, 0), (0, dy)
+
+    def h(x, y):
+        return abs(x - end_x) + abs(y - end_y)
+
+    g = {start: 0}
+    parent = {start: None}
+    closed = set()
+    pq = [(h(start_x, start_y), 0, start)]
+    pops = expanded = 0
+    peak = 1
+    found = False
+    while pq:
+        if len(pq) > peak:
+            peak = len(pq)
+        _, cost, node = heapq.heappop(pq)
+        pops += 1
+        if node in closed:
+            continue
+        closed.add(node)
+        expanded += 1
+        if node == (end_x, end_y):
+            found = True
+            break
+        x, y = node
+        for dx, dy in moves(x, y, parent[node]):
+            jp = jump(x, y, dx, dy)
+            if jp is None or jp in closed:
+                continue
+            new_cost = cost + abs(jp[0] - x) + abs(jp[1] - y)
+            if new_cost < g.get(jp, new_cost + 1):
+                g[jp] = new_cost
+                parent[jp] = node
+                heapq.heappush(pq, (new_cost + h(*jp), new_cost, jp))
+
+    if stats is not None:
+        stats.record_heap(pops, expanded, len(pq), peak)
+        stats.count("scanned", scanned)
+    if not found:
+        print("Target unreachable from Start.")
+        return []
+
+    # Fill in the straight runs between jump points
+    jump_points = []
+    node = (end_x, end_y)
+    while node is not None:
+        jump_points.append(node)
+        node = parent[node]
+    jump_points.reverse()
+    path = [jump_points[0]]
+    for (x0, y0), (x1, y1) in zip(jump_points, jump_points[1:]):
+        dx = (x1 > x0) - (x1 < x0)
+        dy = (y1 > y0) - (y1 < y0)
+        for step in range(1, abs(x1 - x0) + abs(y1 - y0) + 1):
+            path.append((x0 + dx * step, y0 + dy * step))
+    return path
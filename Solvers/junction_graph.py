@@ -0,0 +1,302 @@
+"""
+Corridor contraction and dead-end filling.
+
+Most open cells of a maze are corridor cells with exactly two open
+neighbours, or sit in dead-end branches that no shortest path can use. A
+JunctionGraph reduces a grid (or a binarised image) to its junctions:
+
+    1. dead ends are filled: a cell with at most one open neighbour is
+       removed, repeatedly, so whole dead-end branches disappear;
+    2. each corridor between two junctions becomes one weighted edge.
+
+Cells holding the start, end, gems, hearts, monsters or bridges (and any
+cell in 'keep') are never removed and are always nodes, so solvers can
+start and stop there. Searches run on the junction graph and the result
+is expanded back to a cell path:
+
+    graph = JunctionGraph.from_grid(maze)          # solve_bfs's 0/1 cells
+    path = graph.shortest_path(maze.start, maze.end)
+
+    graph = JunctionGraph.from_level(maze)         # advanced_dijkstra's rules
+    path, hp = graph.solve_complex(None, maze.start, maze.end, 300)
+    plan_held_karp(maze, solver=graph.solve_complex)
+
+    graph = JunctionGraph.from_image(img)          # pixels >= 128 are open
+
+As in advanced_dijkstra.py, a bridge may be entered from any side but only
+left along its orientation.
+"""
+
+import heapq
+
+import numpy as np
+
+from maze import Maze, PATH, WALL, as_maze
+
+
+def binarise(img, threshold=128):
+    # 0/1 grid from an image: pixels darker than 'threshold' are walls
+    img = np.asarray(img)
+    gray = img.mean(axis=2) if img.ndim == 3 else img
+    return np.where(gray >= threshold, PATH, WALL).astype(np.uint8)
+
+
+class JunctionGraph:
+    """
+    'walkable' is a (rows, cols) bool array, 'keep' the (x, y) cells that
+    must stay nodes and 'bridges' {(x, y): "NS" or "EW"}.
+
+    Nodes are flat cell indices (y * cols + x). edges[i] is (u, v, inner)
+    with 'inner' the corridor cells strictly between u and v, in order from
+    u; its length is len(inner) + 1 steps. adj[u] lists (v, i) for every
+    edge touching u.
+    """
+
+    def __init__(self, walkable, keep=(), bridges=None):
+        walkable = np.asarray(walkable, dtype=bool)
+        rows, cols = walkable.shape
+        self.rows, self.cols = rows, cols
+        self.bridges = dict(bridges or {})
+        kept = {y * cols + x for x, y in keep if 0 <= x < cols and 0 <= y < rows and walkable[y, x]}
+        free = bytearray(walkable.ravel().tobytes())
+
+        def neighbours(v):
+            j = v % cols
+            return [n for n, ok in ((v - cols, v >= cols), (v - 1, j > 0),
+                                    (v + cols, v < (rows - 1) * cols), (v + 1, j < cols - 1))
+                    if ok and free[n]]
+
+        padded = np.pad(walkable, 1)
+        degree = (padded[:-2, 1:-1].astype(np.int8) + padded[2:, 1:-1] + padded[1:-1, :-2] + padded[1:-1, 2:])
+        degree = degree.ravel().tolist()
+
+        # 1. dead-end filling
+        stack = [v for v in np.flatnonzero(walkable).tolist() if degree[v] <= 1 and v not in kept]
+        self.filled = 0
+        while stack:
+            v = stack.pop()
+            if not free[v]:
+                continue
+            free[v] = 0
+            self.filled += 1
+            for n in neighbours(v):
+                degree[n] -= 1
+                if degree[n] <= 1 and n not in kept:
+                    stack.append(n)
+
+        # 2. corridor contraction: trace every corridor leaving a junction
+        nodes = [v for v in np.flatnonzero(np.frombuffer(free, dtype=np.uint8)).tolist()
+                 if degree[v] != 2 or v in kept]
+        node_set = set(nodes)
+        self.adj = {v: [] for v in nodes}
+        self.edges = []
+        for u in nodes:
+            for n in neighbours(u):
+                inner = []
+                prev, cur = u, n
+                while cur not in node_set:
+                    inner.append(cur)
+                    a, b = neighbours(cur)
+                    prev, cur = cur, (b if a == prev else a)
+                # each corridor is traced from both ends; keep it once (and drop loops)
+                if u < cur:
+                    self.adj[u].append((cur, len(self.edges)))
+                    self.adj[cur].append((u, len(self.edges)))
+                    self.edges.append((u, cur, inner))
+
+        self._inner_cells = np.array([c for _, _, inner in self.edges for c in inner], dtype=np.intp)
+        self._inner_edge = np.repeat(np.arange(len(self.edges)), [len(inner) for _, _, inner in self.edges])
+        self._damage_cache = (None, None)
+
+    # --- constructors ---
+
+    @classmethod
+    def from_grid(cls, a, keep=()):
+        """
+        solve_bfs's rules: only 0 cells are open. A Maze (or .maze file)
+        keeps its start, end, gems, hearts, monsters and bridges.
+        """
+        a = as_maze(a)
+        keep = list(keep)
+        if isinstance(a, Maze):
+            keep += _points_of_interest(a)
+            a = a.grid
+        return cls(np.asarray(a) == PATH, keep)
+
+    @classmethod
+    def from_level(cls, a, keep=(), bridges=None, monsters=None):
+        """
+        solve_dijkstra_complex's rules: every cell except walls is open, and
+        monster tiles are open even on a wall. Monsters and bridges are kept,
+        plus a Maze's start, end, gems and hearts.
+        """
+        a = as_maze(a)
+        keep = list(keep)
+        if isinstance(a, Maze):
+            keep += _points_of_interest(a)
+            bridges = a.bridge_dict() if bridges is None else bridges
+            monsters = a.monster_dict() if monsters is None else monsters
+            a = a.grid
+        bridges, monsters = bridges or {}, monsters or {}
+        walkable = np.asarray(a) != WALL
+        for x, y in monsters:
+            walkable[y, x] = True
+        return cls(walkable, keep + list(monsters) + list(bridges), bridges)
+
+    @classmethod
+    def from_image(cls, img, threshold=128, keep=()):
+        # binarised image (see binarise); an image Maze keeps its start and end
+        img = as_maze(img)
+        keep = list(keep)
+        if isinstance(img, Maze):
+            keep += [p for p in (img.start, img.end) if p is not None]
+            img = img.image
+        return cls(binarise(img, threshold) == PATH, keep)
+
+    # --- helpers ---
+
+    def _node(self, p):
+        v = p[1] * self.cols + p[0]
+        if v not in self.adj:
+            raise ValueError(f"{p} is not a node of the junction graph; pass it in 'keep'")
+        return v
+
+    def _leaves(self, u, i, bridges):
+        # can the search leave node u along edge i? (bridges only along their orientation)
+        orientation = bridges.get((u % self.cols, u // self.cols))
+        if orientation is None:
+            return True
+        a, b, inner = self.edges[i]
+        first = inner[0] if inner else b
+        if u == b:
+            first = inner[-1] if inner else a
+        return (abs(first - u) == self.cols) == (orientation == "NS")
+
+    def expand(self, route):
+        """
+        Cell path [(x, y), ...] for a route given as [start node, (edge, next
+        node), (edge, next node), ...].
+        """
+        cells = [route[0]]
+        for i, v in route[1:]:
+            a, b, inner = self.edges[i]
+            cells += inner if v == b else inner[::-1]
+            cells.append(v)
+        return [(v % self.cols, v // self.cols) for v in cells]
+
+    def _route(self, parent, t):
+        route = []
+        while parent[t] is not None:
+            u, i = parent[t]
+            route.append((i, t))
+            t = u
+        route.append(t)
+        return route[::-1]
+
+    # --- solvers ---
+
+    def shortest_path(self, start, end, stats=None):
+        """
+        Shortest path in steps from start to end, both (x, y) and kept
+        cells, as a list of (x, y) like solve_bfs; [] if there is none.
+        """
+        s, t = self._node(start), self._node(end)
+        dist = {s: 0}
+        parent = {s: None}
+        done = set()
+        pq = [(0, s)]
+        pops = 0
+        peak = 1
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            d, u = heapq.heappop(pq)
+            pops += 1
+            if u in done:
+                continue
+            done.add(u)
+            if u == t:
+                break
+            for v, i in self.adj[u]:
+                if v in done or not self._leaves(u, i, self.bridges):
+                    continue
+                nd = d + len(self.edges[i][2]) + 1
+                if nd < dist.get(v, nd + 1):
+                    dist[v] = nd
+                    parent[v] = (u, i)
+                    heapq.heappush(pq, (nd, v))
+        if stats is not None:
+            stats.record_heap(pops, len(done), len(pq), peak)
+        if t not in done:
+            print("Target unreachable from Start.")
+            return []
+        return self.expand(self._route(parent, t))
+
+    def edge_damage(self, damage_field):
+        """
+        Damage of the inner cells of every edge, summed from an
+        advanced_dijkstra damage field. The last result is cached, since a
+        planner reuses one field until a monster is defeated.
+        """
+        field, damage = self._damage_cache
+        if field is not damage_field:
+            flat = np.asarray(damage_field).ravel()
+            damage = np.bincount(self._inner_edge, weights=flat[self._inner_cells],
+                                 minlength=len(self.edges)).astype(np.int64).tolist()
+            self._damage_cache = (damage_field, damage)
+        return damage
+
+    def solve_complex(self, a, start, end, current_health, bridges=None, current_monsters=None, damage_field=None,
+                      stats=None):
+        """
+        advanced_dijkstra.solve_dijkstra_complex on the junction graph, with
+        the same arguments so it can be passed as a planner's 'solver'. The
+        graph must have been built with from_level on the same level; 'a'
+        is only used for its size when no damage_field is given.
+        Returns (path, hp) or None if no survivable path exists.
+        """
+        import advanced_dijkstra
+
+        bridges = self.bridges if bridges is None else bridges
+        if damage_field is None:
+            damage_field = advanced_dijkstra.build_damage_field((self.rows, self.cols), current_monsters or {})
+        inner_damage = self.edge_damage(damage_field)
+        damage = np.asarray(damage_field).ravel()
+        step_score, hp_score = advanced_dijkstra.step_score, advanced_dijkstra.hp_score
+
+        s, t = self._node(start), self._node(end)
+        score = {s: 0}
+        parent = {s: None}
+        pq = [(0, s, current_health)]
+        expanded = 0
+        peak = 1
+        while pq:
+            if len(pq) > peak:
+                peak = len(pq)
+            neg_score, u, hp = heapq.heappop(pq)
+            expanded += 1
+            if u == t:
+                if stats is not None:
+                    stats.record_heap(expanded, expanded, len(pq), peak)
+                return self.expand(self._route(parent, t)), hp
+            for v, i in self.adj[u]:
+                if not self._leaves(u, i, bridges):
+                    continue
+                step_damage = inner_damage[i] + int(damage[v])
+                new_hp = hp - step_damage
+                if new_hp <= 0:
+                    continue
+                move_score = -neg_score - step_damage * hp_score - (len(self.edges[i][2]) + 1) * step_score
+                if move_score > score.get(v, -float('inf')):
+                    score[v] = move_score
+                    parent[v] = (u, i)
+                    heapq.heappush(pq, (-move_score, v, new_hp))
+        if stats is not None:
+            stats.record_heap(expanded, expanded, len(pq), peak)
+        return None
+
+
+def _points_of_interest(maze):
+    points = [maze.start, maze.end] + maze.gem_list() + maze.heart_list()
+    points += list(maze.monster_dict()) + list(maze.bridge_dict())
+    return [p for p in points if p is not None]
@@ -0,0 +1,212 @@
+"""
+Compact maze representation shared by all solvers.
+
+A Maze keeps the grid as a uint8 NumPy array indexed [y, x] (0 = path,
+1 = wall, 2 = bridge tile, as exported by MazeMate) and every entity as an
+indexed array: gems, hearts, monsters (+ their kinds) and bridges (+ their
+orientations). Image mazes for Dijkstra.py carry the pixel array instead.
+
+    maze = Maze.from_module(maze_data)
+    solve_bfs(maze)
+    solve_dijkstra_complex(maze, maze.start, maze.end, 300)
+
+Solvers also accept the path of a binary .maze file (see maze_file.py),
+which is opened with its grid memory-mapped.
+
+with_edits() returns a copy-on-write overlay for "monster removed" or
+"wall opened" changes: the overlay shares every array with its base and
+only builds its own grid when it is first read.
+"""
+
+import hashlib
+import os
+
+import numpy as np
+
+PATH, WALL, BRIDGE = 0, 1, 2
+ORIENTATIONS = ("NS", "EW")
+
+
+def _points(points):
+    # list of (x, y) -> (N, 2) int32 array
+    return np.array(list(points), dtype=np.int32).reshape(-1, 2)
+
+
+def grid_hash(grid):
+    # content hash of any 2D grid (list of rows or array) as uint8 cells
+    grid = np.ascontiguousarray(grid, dtype=np.uint8)
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.array(grid.shape, dtype=np.int64).tobytes())
+    h.update(grid)  # hashes the buffer in place, no copy
+    return h.hexdigest()
+
+
+def as_maze(a):
+    # A .maze file path becomes a memory-mapped Maze; anything else is returned as is
+    if isinstance(a, (str, os.PathLike)):
+        from maze_file import load_maze
+        return load_maze(a)
+    return a
+
+
+class Maze:
+    def __init__(self, grid=None, start=None, end=None, gems=(), hearts=(), monsters=None, bridges=None,
+                 image=None):
+        """
+        grid: 2D array-like, indexed [y][x]. start/end: (x, y).
+        monsters: {(x, y): kind}, bridges: {(x, y): "NS" or "EW"}.
+        image: optional (rows, cols, 3) pixel array for image mazes.
+        """
+        if grid is None and image is not None:
+            grid = np.zeros(image.shape[:2], dtype=np.uint8)
+        self._grid = np.ascontiguousarray(grid, dtype=np.uint8)
+        self._base = None  # set on overlays: (base grid, {(x, y): value})
+        self.start = None if start is None else tuple(int(v) for v in start)
+        self.end = None if end is None else tuple(int(v) for v in end)
+        self.gems = _points(gems)
+        self.hearts = _points(hearts)
+        monsters = monsters or {}
+        self.monster_xy = _points(monsters.keys())
+        self.monster_kinds = list(monsters.values())
+        bridges = bridges or {}
+        self.bridge_xy = _points(bridges.keys())
+        self.bridge_dirs = np.array([ORIENTATIONS.index(o) for o in bridges.values()], dtype=np.uint8)
+        self.image = image
+        self._rows = None
+        self._hash = None
+
+    # --- constructors ---
+
+    @classmethod
+    def from_module(cls, module, flip_y=True):
+        """
+        Builds a Maze from a generated MazeMate module (maze_grid, start, end,
+        gem_positions, heart_positions, monster_types, bridge_data).
+        MazeMate uses Unity coordinates with (0, 0) at the bottom-left, so by
+        default entity y values are flipped to row indices, like
+        advanced_dijkstra.py does. BreadthFirstSearch.py uses them unflipped.
+        """
+        height = len(module.maze_grid)
+
+        def ty(y):
+            return (height - 1) - y if flip_y else y
+
+        def pt(p):
+            return p[0], ty(p[1])
+
+        return cls(
+            module.maze_grid,
+            start=pt(module.start),
+            end=pt(module.end),
+            gems=[pt(p) for p in getattr(module, 'gem_positions', [])],
+            hearts=[pt(p) for p in getattr(module, 'heart_positions', [])],
+            monsters={pt(p): t for p, t in getattr(module, 'monster_types', {}).items()},
+            bridges={pt(p): o for p, o in getattr(module, 'bridge_data', {}).items()},
+        )
+
+    @classmethod
+    def from_image(cls, image, start=None, end=None):
+        # Image maze for Dijkstra.py; 'image' is a cv2 (rows, cols, 3) array
+        return cls(image=image, start=start, end=end)
+
+    # --- grid access ---
+
+    @property
+    def grid(self):
+        if self._grid is None:
+            base, edits = self._base
+            grid = base.copy()
+            for (x, y), value in edits.items():
+                grid[y, x] = value
+            self._grid = grid
+        return self._grid
+
+    @property
+    def shape(self):
+        if self._grid is None:
+            return self._base[0].shape
+        return self._grid.shape
+
+    def cell(self, x, y):
+        if self._grid is None:
+            base, edits = self._base
+            return edits.get((x, y), int(base[y, x]))
+        return int(self._grid[y, x])
+
+    def rows(self):
+        """
+        The grid as a list of lists (cached), for the pure-Python solvers.
+        Treat it as read-only: it is shared by every caller.
+        """
+        if self._rows is None:
+            self._rows = self.grid.tolist()
+        return self._rows
+
+    def content_hash(self):
+        """
+        Hex digest of the grid (shape and cell values), cached. Entities are
+        not included: it identifies the walkable layout, e.g. for caches.
+        """
+        if self._hash is None:
+            self._hash = grid_hash(self.grid)
+        return self._hash
+
+    @property
+    def bridge_tiles(self):
+        # (x, y) of every grid cell with value 2
+        return np.argwhere(self.grid == BRIDGE)[:, ::-1].astype(np.int32)
+
+    # --- dict views used by advanced_dijkstra ---
+
+    def monster_dict(self):
+        return {(int(x), int(y)): kind for (x, y), kind in zip(self.monster_xy, self.monster_kinds)}
+
+    def bridge_dict(self):
+        return {(int(x), int(y)): ORIENTATIONS[d] for (x, y), d in zip(self.bridge_xy, self.bridge_dirs)}
+
+    def gem_list(self):
+        return [(int(x), int(y)) for x, y in self.gems]
+
+    def heart_list(self):
+        return [(int(x), int(y)) for x, y in self.hearts]
+
+    # --- copy-on-write overlays ---
+
+    def with_edits(self, cells=None, remove_monsters=()):
+        """
+        Returns an overlay of this maze with some cells set to new values
+        ({(x, y): value}, e.g. 0 to open a wall) and some monsters removed.
+        Nothing is copied until the overlay's grid is read, and unchanged
+        entity arrays are shared with this maze.
+        """
+        new = object.__new__(Maze)
+        new.__dict__.update(self.__dict__)
+        new._rows = None
+        new._hash = None
+        if cells:
+            if self._grid is None:
+                base, edits = self._base
+                edits = dict(edits)
+            else:
+                base, edits = self._grid, {}
+            edits.update(cells)
+            new._base = (base, edits)
+            new._grid = None
+        if remove_monsters:
+            removed = set(map(tuple, remove_monsters))
+            keep = [i for i, (x, y) in enumerate(self.monster_xy.tolist()) if (x, y) not in removed]
+            new.monster_xy = self.monster_xy[keep]
+            new.monster_kinds = [self.monster_kinds[i] for i in keep]
+        return new
+
+    def open_cells(self, cells):
+        # overlay with the given (x, y) cells turned into paths
+        return self.with_edits({tuple(c): PATH for c in cells})
+
+    def without_monsters(self, cells):
+        """
+        Overlay with the monsters at 'cells' defeated: they are removed and
+        their tiles opened, like advanced_dijkstra does after each segment.
+        """
+        cells = [tuple(c) for c in cells]
+        return self.with_edits({c: PATH for c in cells}, remove_monsters=cells)
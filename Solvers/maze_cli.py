@@ -0,0 +1,268 @@
+"""
+One command-line entry point for the solvers.
+
+Run from the Solvers folder (or through main.py in the repository root):
+    python -m maze_cli bfs level.maze --mode wavefront --gif maze_sols/level_bfs.gif
+    python -m maze_cli bfs maze_data_generated_mazemate.py --no-flip
+    python -m maze_cli dijkstra mazes/dijkstra_default.png --start 25 5 --end 9 220 --out path.png
+    python -m maze_cli plan maze_data_generated_mazemate.py --planner held_karp --image solved_path.png
+    python -m maze_cli plan level.maze --cache ~/.cache/maze_solutions    # solution_cache.py
+    python -m maze_cli render level.maze level.png --solve bfs
+    python -m maze_cli bench suite --quick       # benchmark.py's commands
+    python -m maze_cli bench startup             # cold-start budget check
+
+A maze is a .maze file, a generated MazeMate module (.py) or, for
+dijkstra, an image. Modules are flipped to row indices like
+advanced_dijkstra.py does; --no-flip reads them the way
+BreadthFirstSearch.py's demo does. Start and end default to the maze's own.
+
+Importing this module only imports argparse; each subcommand imports the
+solver it runs when it runs, and PIL, cv2 and matplotlib are only loaded
+for images, GIFs and benchmarks. A headless bfs solve stays well inside
+benchmark.STARTUP_BUDGET.
+"""
+
+import argparse
+import sys
+
+
+def load_level(spec, flip_y=True):
+    # A Maze from a .maze file or a MazeMate module (see Maze.from_module for flip_y)
+    from maze import Maze, as_maze
+
+    if spec.endswith('.py'):
+        import runpy
+        from types import SimpleNamespace
+
+        return Maze.from_module(SimpleNamespace(**runpy.run_path(spec)), flip_y=flip_y)
+    if spec.endswith('.maze'):
+        return as_maze(spec)
+    raise ValueError(f"{spec} is not a .maze file or a MazeMate module")
+
+
+def _point(value):
+    return None if value is None else tuple(value)
+
+
+def _report(args, path, **extra):
+    if args.json:
+        import json
+
+        print(json.dumps(dict(extra, path=[list(p) for p in path])))
+    else:
+        print(f"Path: {len(path)} cells" + "".join(f", {k} {v}" for k, v in extra.items()))
+    if args.stats is not None:
+        if getattr(args, 'cache_hit', False):
+            print("stats: cache hit, nothing was solved", file=sys.stderr)
+        else:
+            print(args.stats.as_dict(), file=sys.stderr)
+
+
+def _solver_output(args):
+    # with --json stdout holds only the result, so solver messages go to stderr
+    import contextlib
+
+    return contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext()
+
+
+def _cache(args):
+    if not args.cache:
+        return None
+    from solution_cache import SolutionCache
+
+    return SolutionCache(args.cache)
+
+
+def _cached(args, cache, method, *call_args, **options):
+    # cache.<method>(...), noting in args.cache_hit whether the result was stored
+    hits = cache.hits
+    result = getattr(cache, method)(*call_args, **options)
+    args.cache_hit = cache.hits > hits
+    return result
+
+
+def cmd_bfs(args):
+    from BreadthFirstSearch import solve_bfs
+
+    maze = load_level(args.maze, not args.no_flip)
+    start, end = _point(args.start) or maze.start, _point(args.end) or maze.end
+    cache = _cache(args)
+    if cache is not None:
+        path = _cached(args, cache, "bfs", maze, start, end, args.mode, gif=args.gif, every=args.every,
+                       stats=args.stats)
+    elif args.gif:
+        from frame_sinks import GifSink
+
+        with GifSink(args.gif, duration=50, every=args.every) as sink:
+            path = solve_bfs(maze, start, end, mode=args.mode, sink=sink, stats=args.stats)
+    else:
+        path = solve_bfs(maze, start, end, mode=args.mode, stats=args.stats)
+    _report(args, path)
+    return 0 if path else 1
+
+
+def cmd_dijkstra(args):
+    from Dijkstra import find_shortest_path, drawPath
+
+    if args.maze.endswith('.maze'):
+        maze = load_level(args.maze, not args.no_flip)
+    else:
+        import cv2  # install opencv-python package to use cv2
+        from maze import Maze
+
+        image = cv2.imread(args.maze)
+        if image is None:
+            raise ValueError(f"Could not read image {args.maze}")
+        maze = Maze.from_image(image)
+    start, end = _point(args.start) or maze.start, _point(args.end) or maze.end
+    if start is None or end is None:
+        raise ValueError("an image maze needs --start and --end")
+    cache = _cache(args)
+    if cache is not None:
+        path = _cached(args, cache, "shortest_path", maze, start, end, engine=args.engine, mode=args.mode,
+                       stats=args.stats)
+    else:
+        path = find_shortest_path(maze, start, end, engine=args.engine, mode=args.mode, stats=args.stats)
+    if args.out:
+        import cv2  # install opencv-python package to use cv2
+
+        image = maze.image.copy()
+        drawPath(image, path)
+        cv2.imwrite(args.out, image)
+    _report(args, path)
+    return 0
+
+
+def _planner_options(args):
+    import advanced_dijkstra
+
+    options = {"start_hp": args.hp}
+    for name in ('start', 'end'):
+        if getattr(args, name, None) is not None:
+            options[name] = tuple(getattr(args, name))
+    if args.planner == "prefix_tree":
+        options["workers"] = args.workers
+    if getattr(args, 'stats', None) is not None:
+        import functools
+
+        options["stats"] = args.stats
+        options["solver"] = functools.partial(advanced_dijkstra.solve_dijkstra_complex, stats=args.stats)
+    return options
+
+
+def _plan(args, maze):
+    import advanced_dijkstra
+
+    return getattr(advanced_dijkstra, "plan_" + args.planner)(maze, **_planner_options(args))
+
+
+def cmd_plan(args):
+    maze = load_level(args.maze, not args.no_flip)
+    cache = _cache(args)
+    with _solver_output(args):
+        if cache is not None:
+            path, score, sequence = _cached(args, cache, "plan", maze, args.planner, image=args.image,
+                                            **_planner_options(args))
+        else:
+            path, score, sequence = _plan(args, maze)
+            if path and args.image:
+                import advanced_dijkstra
+
+                advanced_dijkstra.generate_maze_image(maze.rows(), path, maze.monster_dict(), maze.gem_list(),
+                                                      maze.start, maze.end, filename=args.image)
+    _report(args, path, score=score, order=list(sequence) if sequence else None)
+    return 0 if path else 1
+
+
+def cmd_render(args):
+    import advanced_dijkstra
+
+    maze = load_level(args.maze, not args.no_flip)
+    path = []
+    if args.solve == "bfs":
+        from BreadthFirstSearch import solve_bfs
+
+        path = solve_bfs(maze)
+    elif args.solve == "plan":
+        path = _plan(args, maze)[0]
+    advanced_dijkstra.generate_maze_image(maze.rows(), path, maze.monster_dict(), maze.gem_list(), maze.start,
+                                          maze.end, filename=args.output)
+    print(f"Wrote {args.output}")
+    return 0
+
+
+def cmd_bench(args):
+    import benchmark
+
+    return benchmark.main(args.rest)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="maze_cli", description="Solve, render and benchmark mazes.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add(name, handler, help_text):
+        sub = commands.add_parser(name, help=help_text)
+        sub.set_defaults(handler=handler)
+        return sub
+
+    def add_solve(sub, maze_help=".maze file or MazeMate module (.py)"):
+        sub.add_argument('maze', help=maze_help)
+        sub.add_argument('--start', type=int, nargs=2, metavar=('X', 'Y'))
+        sub.add_argument('--end', type=int, nargs=2, metavar=('X', 'Y'))
+        sub.add_argument('--no-flip', action='store_true', help="keep a module's y values as row indices")
+        sub.add_argument('--json', action='store_true', help="print the result as one JSON object")
+        sub.add_argument('--stats', action='store_true', help="print search counters and timings to stderr")
+        sub.add_argument('--cache', metavar='DIR', help="reuse results and renders stored here (solution_cache.py)")
+
+    def add_planner(sub):
+        sub.add_argument('--planner', default="held_karp", choices=("held_karp", "permutations", "prefix_tree"))
+        sub.add_argument('--hp', type=int, default=300, help="starting HP")
+        sub.add_argument('--workers', type=int, help="prefix_tree processes (default: none, plan in this process)")
+
+    bfs = add('bfs', cmd_bfs, "shortest path over the 0 cells (BreadthFirstSearch.solve_bfs)")
+    add_solve(bfs)
+    bfs.add_argument('--mode', default="queue", choices=("queue", "scan", "jps", "wavefront"))
+    bfs.add_argument('--gif', help="write the search animation here")
+    bfs.add_argument('--every', type=int, default=1, help="keep every n-th animation frame")
+
+    dijkstra = add('dijkstra', cmd_dijkstra, "shortest path through an image maze (Dijkstra.find_shortest_path)")
+    add_solve(dijkstra, "maze image, or a .maze file holding one")
+    dijkstra.add_argument('--engine', default="heapq", choices=("heapq", "legacy"))
+    dijkstra.add_argument('--mode', default="full", choices=("full", "early", "astar", "bidirectional"))
+    dijkstra.add_argument('--out', help="write the image with the path drawn on it here")
+
+    plan = add('plan', cmd_plan, "best gem order and path (advanced_dijkstra planners)")
+    add_solve(plan)
+    add_planner(plan)
+    plan.add_argument('--image', help="write the solution image here")
+
+    render = add('render', cmd_render, "draw a level, optionally with a solution, as a PNG")
+    render.add_argument('maze', help=".maze file or MazeMate module (.py)")
+    render.add_argument('output', help="PNG to write")
+    render.add_argument('--no-flip', action='store_true', help="keep a module's y values as row indices")
+    render.add_argument('--solve', default="none", choices=("none", "bfs", "plan"))
+    add_planner(render)
+
+    bench = add('bench', cmd_bench, "run benchmark.py with the remaining arguments")
+    bench.add_argument('rest', nargs=argparse.REMAINDER)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if getattr(args, 'stats', False):
+        from search_stats import SearchStats
+
+        args.stats = SearchStats()
+    else:
+        args.stats = None
+    try:
+        return args.handler(args)
+    except (ValueError, OSError) as exc:
+        print(f"error: {exc}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
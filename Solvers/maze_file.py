@@ -0,0 +1,189 @@
+"""
+Binary .maze files: a compact, memory-mapped replacement for the generated
+MazeMate Python modules.
+
+Importing maze_data_generated_mazemate.py builds every grid cell as a Python
+int inside nested lists, which takes tens of seconds (and gigabytes) for a
+5000x5000 maze and leaves .pyc files behind. A .maze file stores the same
+level as raw bytes, and load_maze() maps the grid with np.memmap, so opening
+it is near-instant and only the pages a solver touches are ever read.
+
+Convert once, then hand the file to any solver:
+
+    python maze_file.py maze_data_generated_mazemate.py level.maze
+    python maze_file.py mazes/dijkstra_default.png default.maze --src 25 5 --dst 9 220
+
+    solve_bfs('level.maze')
+    plan_held_karp('level.maze')
+    find_shortest_path('default.maze')
+
+Layout (little-endian):
+
+    header      HEADER struct below
+    gems        int32 (n_gems, 2)      x, y
+    hearts      int32 (n_hearts, 2)    x, y
+    monsters    int32 (n_monsters, 3)  x, y, index into the kind names
+    bridges     int32 (n_bridges, 3)   x, y, index into maze.ORIENTATIONS
+    kind names  UTF-8, newline separated
+    grid        uint8 (height, width) at grid_offset, 0 path / 1 wall / 2 bridge
+    image       uint8 (height, width, 3) at image_offset, only if FLAG_IMAGE
+
+Coordinates are the ones the solvers use (y is a row index, already flipped
+from MazeMate's Unity coordinates). Grid and image start on a 64 byte
+boundary so they can be mapped directly.
+"""
+
+import argparse
+import os
+import runpy
+import struct
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+
+from maze import Maze, ORIENTATIONS
+
+MAGIC = b'MAZE'
+VERSION = 1
+FLAG_START, FLAG_END, FLAG_IMAGE = 1, 2, 4
+ALIGN = 64
+
+# magic, version, flags, width, height, start x/y, end x/y,
+# n_gems, n_hearts, n_monsters, n_bridges, names length, grid offset, image offset
+HEADER = struct.Struct('<4sHHIIiiiiIIIIIQQ')
+
+
+def _align(offset):
+    return (offset + ALIGN - 1) // ALIGN * ALIGN
+
+
+def save_maze(maze, filename):
+    """
+    Writes a Maze to 'filename' in the .maze format. The grid (and image,
+    if any) are written straight from their arrays, so memory use stays at
+    one copy of the maze.
+    """
+    height, width = maze.shape
+    flags = 0
+    start = end = (0, 0)
+    if maze.start is not None:
+        flags |= FLAG_START
+        start = maze.start
+    if maze.end is not None:
+        flags |= FLAG_END
+        end = maze.end
+    if maze.image is not None:
+        if maze.image.shape[:2] != (height, width):
+            raise ValueError(f"Image shape {maze.image.shape} does not match grid {maze.shape}")
+        flags |= FLAG_IMAGE
+
+    kinds = list(dict.fromkeys(maze.monster_kinds))
+    monsters = np.zeros((len(maze.monster_kinds), 3), dtype=np.int32)
+    monsters[:, :2] = maze.monster_xy
+    monsters[:, 2] = [kinds.index(k) for k in maze.monster_kinds]
+    bridges = np.zeros((len(maze.bridge_dirs), 3), dtype=np.int32)
+    bridges[:, :2] = maze.bridge_xy
+    bridges[:, 2] = maze.bridge_dirs
+    names = '\n'.join(kinds).encode('utf-8')
+
+    tables = b''.join(np.ascontiguousarray(t, dtype='<i4').tobytes()
+                      for t in (maze.gems, maze.hearts, monsters, bridges)) + names
+    grid_offset = _align(HEADER.size + len(tables))
+    image_offset = _align(grid_offset + height * width) if flags & FLAG_IMAGE else 0
+
+    with open(filename, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, flags, width, height, start[0], start[1], end[0], end[1],
+                            len(maze.gems), len(maze.hearts), len(monsters), len(bridges), len(names),
+                            grid_offset, image_offset))
+        f.write(tables)
+        f.write(b'\0' * (grid_offset - f.tell()))
+        np.ascontiguousarray(maze.grid, dtype=np.uint8).tofile(f)
+        if image_offset:
+            f.write(b'\0' * (image_offset - f.tell()))
+            np.ascontiguousarray(maze.image, dtype=np.uint8).tofile(f)
+
+
+def load_maze(filename, mode='r'):
+    """
+    Opens a .maze file. The grid and image are np.memmap views of the file
+    (read-only by default; mode='r+' writes edits back, 'c' is
+    copy-on-write), the small entity tables are read into memory.
+    """
+    with open(filename, 'rb') as f:
+        header = f.read(HEADER.size)
+        if len(header) < HEADER.size or header[:4] != MAGIC:
+            raise ValueError(f"{filename} is not a .maze file")
+        (_, version, flags, width, height, sx, sy, ex, ey, n_gems, n_hearts, n_monsters, n_bridges,
+         names_len, grid_offset, image_offset) = HEADER.unpack(header)
+        if version != VERSION:
+            raise ValueError(f"{filename}: unsupported .maze version {version}")
+
+        def table(n, columns):
+            return np.frombuffer(f.read(n * columns * 4), dtype='<i4').reshape(n, columns)
+
+        gems = table(n_gems, 2)
+        hearts = table(n_hearts, 2)
+        monsters = table(n_monsters, 3)
+        bridges = table(n_bridges, 3)
+        kinds = f.read(names_len).decode('utf-8').split('\n') if names_len else []
+
+    grid = np.memmap(filename, dtype=np.uint8, mode=mode, offset=grid_offset, shape=(height, width))
+    image = None
+    if flags & FLAG_IMAGE:
+        image = np.memmap(filename, dtype=np.uint8, mode=mode, offset=image_offset, shape=(height, width, 3))
+    return Maze(
+        grid,
+        start=(sx, sy) if flags & FLAG_START else None,
+        end=(ex, ey) if flags & FLAG_END else None,
+        gems=gems,
+        hearts=hearts,
+        monsters={(int(x), int(y)): kinds[k] for x, y, k in monsters.tolist()},
+        bridges={(int(x), int(y)): ORIENTATIONS[d] for x, y, d in bridges.tolist()},
+        image=image,
+    )
+
+
+def convert_module(source, filename):
+    """
+    Converts a generated MazeMate module (given as a path to the .py file)
+    to a .maze file. The module is executed with runpy, so no .pyc is
+    written for it.
+    """
+    module = SimpleNamespace(**runpy.run_path(source))
+    maze = Maze.from_module(module)
+    save_maze(maze, filename)
+    return maze
+
+
+def convert_image(source, filename, start=None, end=None):
+    # Converts an image maze for Dijkstra.py (read with cv2, so BGR) to a .maze file
+    import cv2  # install opencv-python package to use cv2
+    image = cv2.imread(source)
+    if image is None:
+        raise ValueError(f"Could not read image {source}")
+    maze = Maze.from_image(image, start, end)
+    save_maze(maze, filename)
+    return maze
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a MazeMate module or image maze to a .maze file.")
+    parser.add_argument('source', help="maze_data_*.py module or maze image")
+    parser.add_argument('output', help="the .maze file to write")
+    parser.add_argument('--src', type=int, nargs=2, metavar=('X', 'Y'), help="start point (images only)")
+    parser.add_argument('--dst', type=int, nargs=2, metavar=('X', 'Y'), help="end point (images only)")
+    args = parser.parse_args(argv)
+
+    if args.source.endswith('.py'):
+        maze = convert_module(args.source, args.output)
+    else:
+        maze = convert_image(args.source, args.output, args.src, args.dst)
+    height, width = maze.shape
+    print(f"Wrote {args.output}: {width}x{height}, {len(maze.gems)} gems, {len(maze.monster_kinds)} monsters, "
+          f"{len(maze.bridge_dirs)} bridges, {os.path.getsize(args.output)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
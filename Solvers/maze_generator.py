@@ -0,0 +1,167 @@
+"""
+Seeded synthetic mazes for benchmarks and experiments.
+
+Every generator takes a seed, so the same arguments always give the same
+maze:
+
+    maze = generate_maze("perfect", 201, 201, seed=1, gems=4, monster_density=0.02, bridges=3)
+    image_maze = generate_image_maze(cells=50, scale=8, seed=1)
+
+Kinds:
+    perfect  a spanning-tree maze (one route between any two cells)
+    rooms    a mostly open floor divided into rooms with doorways
+    random   independent random walls (wall_density), may be disconnected
+
+Grid mazes use the MazeMate values (0 path, 1 wall, 2 bridge) and solver
+coordinates (x = column, y = row). Image mazes are white corridors on black
+for Dijkstra.py.
+"""
+
+import numpy as np
+
+from maze import Maze, PATH, WALL, BRIDGE
+
+MONSTER_KINDS = ("Bat", "Ghost", "Skeleton", "Plant", "Golem", "Cactus", "Dragon")
+
+
+def perfect_grid(width, height, rng):
+    """
+    Iterative depth-first carving on the odd cells of a width x height grid
+    (even sizes are rounded down to odd). Every open cell is reachable.
+    """
+    width -= 1 - width % 2
+    height -= 1 - height % 2
+    grid = np.ones((height, width), dtype=np.uint8)
+    cw, ch = width // 2, height // 2
+    visited = np.zeros((ch, cw), dtype=bool)
+    steps = ((0, -1), (1, 0), (0, 1), (-1, 0))
+    stack = [(0, 0)]
+    visited[0, 0] = True
+    grid[1, 1] = PATH
+    while stack:
+        cx, cy = stack[-1]
+        options = [(dx, dy) for dx, dy in steps
+                   if 0 <= cx + dx < cw and 0 <= cy + dy < ch and not visited[cy + dy, cx + dx]]
+        if not options:
+            stack.pop()
+            continue
+        dx, dy = options[rng.integers(len(options))]
+        nx, ny = cx + dx, cy + dy
+        visited[ny, nx] = True
+        grid[2 * cy + 1 + dy, 2 * cx + 1 + dx] = PATH
+        grid[2 * ny + 1, 2 * nx + 1] = PATH
+        stack.append((nx, ny))
+    return grid
+
+
+def rooms_grid(width, height, rng, room_size=12, wall_density=0.02):
+    """
+    Open floor split by walls every ~room_size cells, with one doorway per
+    wall segment, plus a sprinkle of single wall cells.
+    """
+    grid = (rng.random((height, width)) < wall_density).astype(np.uint8)
+    xs = list(range(room_size, width - 1, room_size))
+    ys = list(range(room_size, height - 1, room_size))
+    for x in xs:
+        grid[:, x] = WALL
+    for y in ys:
+        grid[y, :] = WALL
+    # one doorway in every wall segment between two wall crossings
+    for x in xs:
+        for lo, hi in zip([0] + ys, ys + [height]):
+            grid[rng.integers(lo, hi), x] = PATH
+    for y in ys:
+        for lo, hi in zip([0] + xs, xs + [width]):
+            grid[y, rng.integers(lo, hi)] = PATH
+    return grid
+
+
+def random_grid(width, height, rng, wall_density=0.3):
+    return (rng.random((height, width)) < wall_density).astype(np.uint8)
+
+
+def _open_cells(grid):
+    # (x, y) of every path cell, in row-major order
+    return np.argwhere(grid == PATH)[:, ::-1]
+
+
+def _pick(rng, cells, count, taken):
+    # 'count' distinct cells not in 'taken' (which is updated)
+    picked = []
+    for i in rng.permutation(len(cells)):
+        if len(picked) == count:
+            break
+        cell = (int(cells[i][0]), int(cells[i][1]))
+        if cell not in taken:
+            taken.add(cell)
+            picked.append(cell)
+    return picked
+
+
+def _bridge_sites(grid):
+    # Corridor cells a bridge fits in: open on exactly two opposite sides
+    rows, cols = grid.shape
+    open_ = np.zeros((rows + 2, cols + 2), dtype=bool)
+    open_[1:-1, 1:-1] = grid == PATH
+    up, down = open_[:-2, 1:-1], open_[2:, 1:-1]
+    left, right = open_[1:-1, :-2], open_[1:-1, 2:]
+    here = grid == PATH
+    ns = here & up & down & ~left & ~right
+    ew = here & left & right & ~up & ~down
+    return [((int(x), int(y)), "NS") for y, x in np.argwhere(ns)] + \
+           [((int(x), int(y)), "EW") for y, x in np.argwhere(ew)]
+
+
+def generate_maze(kind="perfect", width=101, height=101, seed=0, gems=0, monster_density=0.0, bridges=0,
+                  wall_density=None):
+    """
+    Builds a Maze of the given kind. Start and end are the first and last
+    open cells (top-left and bottom-right for perfect mazes); gems,
+    monsters (monster_density is a fraction of the open cells) and bridges
+    are placed on distinct open cells.
+    """
+    rng = np.random.default_rng(seed)
+    if kind == "perfect":
+        grid = perfect_grid(width, height, rng)
+    elif kind == "rooms":
+        grid = rooms_grid(width, height, rng, wall_density=0.02 if wall_density is None else wall_density)
+    elif kind == "random":
+        grid = random_grid(width, height, rng, 0.3 if wall_density is None else wall_density)
+        grid[0, 0] = grid[-1, -1] = PATH
+    else:
+        raise ValueError(f"Unknown maze kind: {kind!r}")
+
+    cells = _open_cells(grid)
+    start = (int(cells[0][0]), int(cells[0][1]))
+    end = (int(cells[-1][0]), int(cells[-1][1]))
+    taken = {start, end}
+
+    bridge_data = {}
+    if bridges:
+        sites = [s for s in _bridge_sites(grid) if s[0] not in taken]
+        for i in rng.permutation(len(sites))[:bridges]:
+            (x, y), orientation = sites[i]
+            grid[y, x] = BRIDGE
+            bridge_data[(x, y)] = orientation
+            taken.add((x, y))
+
+    gem_cells = _pick(rng, cells, gems, taken)
+    n_monsters = int(round(monster_density * len(cells)))
+    monsters = {c: MONSTER_KINDS[rng.integers(len(MONSTER_KINDS))] for c in _pick(rng, cells, n_monsters, taken)}
+    return Maze(grid, start, end, gems=gem_cells, monsters=monsters, bridges=bridge_data)
+
+
+def generate_image_maze(cells=50, scale=8, seed=0):
+    """
+    A perfect maze of cells x cells rendered as a BGR image for Dijkstra.py:
+    every grid cell becomes a scale x scale block, white for paths and black
+    for walls. Start and end are the centres of the first and last cells.
+    """
+    rng = np.random.default_rng(seed)
+    grid = perfect_grid(2 * cells + 1, 2 * cells + 1, rng)
+    pixels = np.where(grid == PATH, 255, 0).astype(np.uint8)
+    pixels = np.repeat(np.repeat(pixels, scale, axis=0), scale, axis=1)
+    image = np.repeat(pixels[:, :, None], 3, axis=2)
+    centre = scale + scale // 2
+    far = (2 * cells - 1) * scale + scale // 2
+    return Maze.from_image(image, (centre, centre), (far, far))
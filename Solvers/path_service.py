@@ -0,0 +1,396 @@
+"""
+Resident path-query service.
+
+Keeps mazes and precomputed structures (BFS distance fields, image edge
+weights) loaded in a pool of worker processes, so a query does not pay for
+starting Python, importing PIL/cv2/matplotlib and reloading the maze.
+
+    python path_service.py serve                      # 127.0.0.1:8765
+    python path_service.py serve --unix /tmp/maze.sock --workers 4
+    python path_service.py loadgen --requests 2000 --concurrency 32
+
+Protocol: one JSON object per line in each direction. Requests carry an
+"op", the "maze" file (a .maze file, or an image for "dijkstra") and the
+query arguments; the response echoes "id":
+
+    {"id": 1, "op": "bfs", "maze": "level.maze", "start": [1, 1], "end": [9, 9]}
+    {"id": 2, "op": "dijkstra", "maze": "mazes/dijkstra_default.png", "start": [25, 5], "end": [9, 220]}
+    {"id": 3, "op": "plan", "maze": "level.maze", "start_hp": 300}
+    {"id": 4, "op": "stats"}
+
+    {"id": 1, "ok": true, "result": {"path": [[1, 1], ...]}, "seconds": 0.0012}
+    {"id": 9, "ok": false, "error": "ValueError: ..."}
+
+Start/end default to the maze's own. Queries for the same (op, maze) that
+arrive within batch_window seconds of each other are sent to a worker as
+one batch: BFS queries from the same start share one distance field, and
+every query in a batch shares the loaded maze.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+
+DEFAULT_HOST, DEFAULT_PORT = "127.0.0.1", 8765
+
+
+# --- worker side: runs in the pool processes ---
+
+MAX_MAZES = 4  # mazes (and their weights) each worker keeps loaded
+
+_mazes = OrderedDict()  # (path, mtime) -> Maze, per worker process
+_weights = {}  # (path, mtime) -> flat Dijkstra weights of an image maze
+_fields = None  # FieldCache of BFS distance fields, per worker process
+
+
+def _load(path):
+    from maze import Maze
+    from maze_file import load_maze
+
+    key = (os.path.abspath(path), os.path.getmtime(path))
+    maze = _mazes.get(key)
+    if maze is not None:
+        _mazes.move_to_end(key)
+        return key, maze
+    if path.endswith('.maze'):
+        maze = load_maze(path)
+    else:
+        import cv2  # install opencv-python package to use cv2
+        image = cv2.imread(path)
+        if image is None:
+            raise ValueError(f"Could not read maze {path}")
+        maze = Maze.from_image(image)
+    _mazes[key] = maze
+    while len(_mazes) > MAX_MAZES:
+        old, _ = _mazes.popitem(last=False)
+        _weights.pop(old, None)
+    return key, maze
+
+
+def _point(query, name, default):
+    value = query.get(name)
+    if value is None:
+        if default is None:
+            raise ValueError(f"No {name} given and the maze has none")
+        return default
+    return int(value[0]), int(value[1])
+
+
+def _answer_bfs(key, maze, query):
+    # the path solve_bfs would return, from a cached distance field of the start
+    global _fields
+    from distance_fields import DistanceFields, FieldCache
+
+    if _fields is None:
+        _fields = FieldCache()
+    path = DistanceFields(maze, _fields).path(_point(query, "start", maze.start), _point(query, "end", maze.end))
+    return {"path": path, "length": len(path)}
+
+
+def _answer_dijkstra(key, maze, query):
+    # find_shortest_path(mode="early" or "full") with the edge weights kept between queries
+    import Dijkstra
+
+    if maze.image is None:
+        raise ValueError("dijkstra needs an image maze")
+    mode = query.get("mode", "early")
+    if mode not in ("full", "early"):
+        raise ValueError(f"Unsupported dijkstra mode for the service: {mode!r}")
+    weights = _weights.get(key)
+    if weights is None:
+        weights = _weights[key] = Dijkstra.flat_weights(maze.image, "list")
+    down, right = weights
+    rows, cols = maze.image.shape[:2]
+    src, dst = _point(query, "start", maze.start), _point(query, "end", maze.end)
+    state = Dijkstra.new_search_state(rows * cols, "list")
+    target = None if mode == "full" else dst[1] * cols + dst[0]
+    Dijkstra.dijkstra_search(down, right, cols, src[1] * cols + src[0], target, state)
+    path = Dijkstra.trace_path(state[1], cols, src, dst)
+    return {"path": path, "length": len(path)}
+
+
+def _answer_plan(key, maze, query):
+    import advanced_dijkstra
+
+    path, score, sequence = advanced_dijkstra.plan_held_karp(
+        maze, _point(query, "start", maze.start), _point(query, "end", maze.end),
+        start_hp=query.get("start_hp", 300))
+    return {"path": path, "score": score if path else None, "sequence": list(sequence) if sequence else None}
+
+
+ANSWER = {"bfs": _answer_bfs, "dijkstra": _answer_dijkstra, "plan": _answer_plan}
+
+
+def _start_key(query):
+    # groups queries by start; a malformed start sorts last and fails on its own
+    try:
+        start = query.get("start")
+        return (0, tuple(int(v) for v in start)) if start else (1, ())
+    except (AttributeError, TypeError, ValueError):
+        return (2, ())
+
+
+def solve_batch(op, maze_path, queries):
+    """
+    Answers a batch of queries for one maze in a worker process. Returns
+    one {"ok": ..., "result"/"error": ...} per query, so a bad query does
+    not fail the rest of the batch.
+    """
+    try:
+        key, maze = _load(maze_path)
+    except Exception as e:
+        return [{"ok": False, "error": f"{type(e).__name__}: {e}"}] * len(queries)
+    answer = ANSWER[op]
+    # queries from the same start run back to back (one distance field each for BFS)
+    order = sorted(range(len(queries)), key=lambda i: _start_key(queries[i]))
+    results = [None] * len(queries)
+    for i in order:
+        try:
+            results[i] = {"ok": True, "result": answer(key, maze, queries[i])}
+        except Exception as e:
+            results[i] = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+    return results
+
+
+# --- server side ---
+
+class PathService:
+    """
+    asyncio front end: parses requests, batches them per (op, maze) and
+    hands each batch to the process pool.
+    """
+
+    def __init__(self, workers=None, batch_window=0.002, max_batch=64):
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self.pending = {}  # (op, maze) -> [(query, future), ...]
+        self.served = 0
+        self.batches = 0
+        self.latencies = []
+
+    async def submit(self, op, maze, query):
+        key = (op, maze)
+        future = asyncio.get_running_loop().create_future()
+        batch = self.pending.setdefault(key, [])
+        batch.append((query, future))
+        if len(batch) == 1:
+            asyncio.get_running_loop().call_later(self.batch_window, self._flush, key)
+        elif len(batch) >= self.max_batch:
+            self._flush(key)
+        return await future
+
+    def _flush(self, key):
+        batch = self.pending.pop(key, None)
+        if batch:
+            self.batches += 1
+            asyncio.ensure_future(self._run(key, batch))
+
+    async def _run(self, key, batch):
+        op, maze = key
+        loop = asyncio.get_running_loop()
+        try:
+            results = await loop.run_in_executor(self.pool, solve_batch, op, maze, [q for q, _ in batch])
+        except Exception as e:  # the worker died
+            results = [{"ok": False, "error": f"{type(e).__name__}: {e}"}] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    def stats(self):
+        lat = sorted(self.latencies)
+        out = {"served": self.served, "batches": self.batches,
+               "mean_batch": self.served / self.batches if self.batches else 0.0}
+        if lat:
+            out["p50_seconds"] = lat[len(lat) // 2]
+            out["p99_seconds"] = lat[min(len(lat) - 1, int(len(lat) * 0.99))]
+        return out
+
+    async def answer(self, request):
+        t0 = time.perf_counter()
+        op = request.get("op")
+        if op == "stats":
+            response = {"ok": True, "result": self.stats()}
+        elif op not in ANSWER:
+            response = {"ok": False, "error": f"Unknown op: {op!r}"}
+        elif not request.get("maze"):
+            response = {"ok": False, "error": "No maze given"}
+        else:
+            response = dict(await self.submit(op, request["maze"], request))
+            self.served += 1
+            self.latencies.append(time.perf_counter() - t0)
+            if len(self.latencies) > 100000:
+                del self.latencies[:50000]
+        response["id"] = request.get("id")
+        response["seconds"] = time.perf_counter() - t0
+        return response
+
+    async def handle(self, reader, writer):
+        # requests on one connection are answered concurrently, in any order
+        lock = asyncio.Lock()
+        tasks = set()
+
+        async def reply(line):
+            # every request line gets exactly one response, whatever goes wrong
+            request = None
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise ValueError("a request must be a JSON object")
+                response = await self.answer(request)
+            except ValueError as e:
+                response = {"ok": False, "error": f"Bad request: {e}"}
+            except Exception as e:
+                response = {"ok": False, "error": f"{type(e).__name__}: {e}"}
+            if "id" not in response and isinstance(request, dict):
+                response["id"] = request.get("id")
+            async with lock:
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if line.strip():
+                    task = asyncio.ensure_future(reply(line))
+                    tasks.add(task)
+                    task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+        finally:
+            writer.close()
+
+    def close(self):
+        self.pool.shutdown(cancel_futures=True)
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None, workers=None, batch_window=0.002, ready=None):
+    service = PathService(workers, batch_window)
+    if unix:
+        server = await asyncio.start_unix_server(service.handle, path=unix)
+        where = unix
+    else:
+        server = await asyncio.start_server(service.handle, host, port)
+        where = f"{host}:{port}"
+    print(f"Path service listening on {where}", file=sys.stderr)
+    if ready is not None:
+        ready.set()
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+        if unix and os.path.exists(unix):
+            os.remove(unix)
+
+
+# --- load generator ---
+
+async def _connect(host, port, unix):
+    if unix:
+        return await asyncio.open_unix_connection(unix)
+    return await asyncio.open_connection(host, port)
+
+
+async def load_test(requests, concurrency=16, host=DEFAULT_HOST, port=DEFAULT_PORT, unix=None):
+    """
+    Sends 'requests' (dicts) over 'concurrency' connections, each keeping
+    one request in flight, and returns throughput and latency percentiles
+    as seen by the client.
+    """
+    queue = list(reversed(requests))
+    latencies = []
+    failed = 0
+
+    async def client():
+        nonlocal failed
+        reader, writer = await _connect(host, port, unix)
+        try:
+            while queue:
+                request = queue.pop()
+                t0 = time.perf_counter()
+                writer.write((json.dumps(request) + '\n').encode())
+                await writer.drain()
+                response = json.loads(await reader.readline())
+                latencies.append(time.perf_counter() - t0)
+                failed += not response.get("ok")
+        finally:
+            writer.close()
+
+    t0 = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    wall = time.perf_counter() - t0
+    latencies.sort()
+    return {"requests": len(latencies), "failed": failed, "concurrency": concurrency, "wall_seconds": wall,
+            "requests_per_second": len(latencies) / wall if wall else 0.0,
+            "p50_seconds": latencies[len(latencies) // 2] if latencies else None,
+            "p99_seconds": latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))] if latencies else None}
+
+
+def make_requests(maze_file, maze, count, seed=0, op="bfs", starts=8):
+    """
+    'count' random queries between open cells of 'maze' (a Maze saved as
+    maze_file), drawn from a few starts so batching has work to share.
+    """
+    import numpy as np
+
+    rng = random.Random(seed)
+    cells = [tuple(int(v) for v in c) for c in np.argwhere(maze.grid == 0)[:, ::-1]]
+    start_cells = rng.sample(cells, min(starts, len(cells)))
+    return [{"id": i, "op": op, "maze": maze_file, "start": rng.choice(start_cells), "end": rng.choice(cells)}
+            for i in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Resident maze path-query service.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("serve", "loadgen"):
+        p = sub.add_parser(name)
+        p.add_argument('--host', default=DEFAULT_HOST)
+        p.add_argument('--port', type=int, default=DEFAULT_PORT)
+        p.add_argument('--unix', help="Unix socket path instead of host:port")
+    sub.choices["serve"].add_argument('--workers', type=int, default=None)
+    sub.choices["serve"].add_argument('--batch-window', type=float, default=0.002)
+    loadgen = sub.choices["loadgen"]
+    loadgen.add_argument('--maze', help=".maze file to query (default: a generated 301x301 maze)")
+    loadgen.add_argument('--requests', type=int, default=1000)
+    loadgen.add_argument('--concurrency', type=int, default=16)
+    loadgen.add_argument('--seed', type=int, default=0)
+    loadgen.add_argument('--warmup', type=int, default=200, help="untimed requests sent first (loads workers)")
+    args = parser.parse_args(argv)
+
+    if args.command == "serve":
+        try:
+            asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.batch_window))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    from maze_file import load_maze, save_maze
+    from maze_generator import generate_maze
+
+    maze_file = args.maze
+    if maze_file is None:
+        maze_file = os.path.join(tempfile.gettempdir(), f"path_service_loadgen_{args.seed}.maze")
+        save_maze(generate_maze("rooms", 301, 301, seed=args.seed), maze_file)
+    requests = make_requests(os.path.abspath(maze_file), load_maze(maze_file), args.warmup + args.requests,
+                             args.seed)
+    if args.warmup:
+        asyncio.run(load_test(requests[:args.warmup], args.concurrency, args.host, args.port, args.unix))
+    report = asyncio.run(load_test(requests[args.warmup:], args.concurrency, args.host, args.port, args.unix))
+    print(json.dumps(report))
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,129 @@
+"""
+Vectorised raster rendering for maze frames and solution images.
+
+Drawing every cell with ImageDraw each frame costs O(cells) Python calls
+per frame. A TileCanvas instead keeps the picture as one NumPy array of
+zoom x zoom cells: the static layer (walls, start/end, gems, monsters) is
+filled in a few whole-array operations, and each frame only stamps the
+cells that changed since the last one (newly visited cells, new path
+segments).
+
+    canvas = TileCanvas(rows, cols, zoom)
+    canvas.fill_cells(wall_mask, (0, 0, 0))
+    dot = shape_mask(zoom, "ellipse", (6, 6, zoom - 7, zoom - 7))
+    canvas.stamp(ys, xs, dot, (255, 0, 0))
+    canvas.draw_path(path, (255, 0, 0), width=5)
+    frame = canvas.image()
+
+Shapes are rasterised once by PIL into a per-cell mask, so the pixels are
+the same as drawing them cell by cell with ImageDraw.
+"""
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+def shape_mask(zoom, shape, coords):
+    """
+    Bool (zoom, zoom) mask of one ImageDraw shape ("rectangle", "ellipse"
+    or "polygon") with 'coords' relative to the cell's top-left corner.
+    """
+    im = Image.new('L', (zoom, zoom), 0)
+    getattr(ImageDraw.Draw(im), shape)(coords, fill=255)
+    return np.asarray(im) > 0
+
+
+class TileCanvas:
+    def __init__(self, rows, cols, zoom, background=(255, 255, 255)):
+        self.rows, self.cols, self.zoom = rows, cols, zoom
+        self.pixels = np.empty((rows * zoom, cols * zoom, 3), dtype=np.uint8)
+        row = np.empty((cols * zoom, 3), dtype=np.uint8)
+        row[:] = background
+        self.pixels[:] = row  # row by row: much faster than broadcasting one pixel
+        # cells[y, :, x, :] is the zoom x zoom block of cell (x, y)
+        self.cells = self.pixels.reshape(rows, zoom, cols, zoom, 3)
+        self.segments = 0  # path segments drawn so far by draw_path
+        self._lines = {}
+
+    def fill_cells(self, where, colors, overflow=False):
+        """
+        Fills whole cells: 'where' is a (rows, cols) bool mask and 'colors'
+        one (r, g, b) or a (rows, cols, 3) array. overflow=True copies
+        ImageDraw.rectangle's habit of including the far corner, so each
+        rectangle spills one pixel into the next cell right and below
+        (later cells in row-major order win, as when drawn one by one).
+        """
+        where = np.asarray(where, dtype=bool)
+        colors = np.broadcast_to(np.asarray(colors, dtype=np.uint8), where.shape + (3,))
+        ys, xs = np.nonzero(where)
+        self.cells[ys, :, xs] = colors[ys, xs][:, None, None]
+        if not overflow or self.zoom < 2:
+            return
+        # left column / top row of a cell without a rectangle of its own
+        ys, xs = np.nonzero(where[:, :-1] & ~where[:, 1:])
+        self.cells[ys, 1:, xs + 1, 0] = colors[ys, xs][:, None]
+        ys, xs = np.nonzero(where[:-1] & ~where[1:])
+        self.cells[ys + 1, 0, xs, 1:] = colors[ys, xs][:, None]
+        # a cell's top-left pixel is covered by up to four rectangles
+        padded = np.pad(where, ((1, 0), (1, 0)))
+        padded_colors = np.pad(colors, ((1, 0), (1, 0), (0, 0)))
+        corners = self.cells[:, 0, :, 0]
+        for dy, dx in ((-1, -1), (-1, 0), (0, -1), (0, 0)):
+            rows = slice(1 + dy, self.rows + 1 + dy)
+            cols = slice(1 + dx, self.cols + 1 + dx)
+            np.copyto(corners, padded_colors[rows, cols], where=padded[rows, cols][:, :, None])
+
+    def stamp(self, ys, xs, mask, color):
+        # Paints 'color' over the pixels of 'mask' in each cell (xs[i], ys[i])
+        ys = np.asarray(ys, dtype=np.intp)
+        xs = np.asarray(xs, dtype=np.intp)
+        if not len(ys):
+            return
+        block = self.cells[ys, :, xs]  # (n, zoom, zoom, 3) copy
+        block[:, mask] = color
+        self.cells[ys, :, xs] = block
+
+    def stamp_flat(self, cells, mask, color):
+        # stamp() for flat cell indices (y * cols + x)
+        ys, xs = np.divmod(np.asarray(cells, dtype=np.intp), self.cols)
+        self.stamp(ys, xs, mask, color)
+
+    def draw_path(self, path, color, width=5):
+        """
+        Draws the segments of 'path' ([(x, y), ...], centre to centre) that
+        were not drawn by an earlier call, so a growing path costs one
+        segment per frame. A segment's pixels only depend on its direction,
+        so ImageDraw rasterises each direction once and later segments are
+        mask copies.
+        """
+        z = self.zoom
+        for u in range(self.segments, len(path) - 1):
+            (x0, y0), (x1, y1) = path[u], path[u + 1]
+            mask = self._line_mask(x1 - x0, y1 - y0, width)
+            top, left = min(y0, y1) * z, min(x0, x1) * z
+            self.pixels[top:top + mask.shape[0], left:left + mask.shape[1]][mask] = color
+        self.segments = max(self.segments, len(path) - 1)
+
+    def _line_mask(self, dx, dy, width):
+        # pixels of a centre-to-centre line over the cells it spans, cached per direction
+        key = (dx, dy, width)
+        if key not in self._lines:
+            z = self.zoom
+            h = z // 2
+            x0 = 0 if dx >= 0 else -dx
+            y0 = 0 if dy >= 0 else -dy
+            im = Image.new('L', ((abs(dx) + 1) * z, (abs(dy) + 1) * z), 0)
+            ImageDraw.Draw(im).line((x0 * z + h, y0 * z + h, (x0 + dx) * z + h, (y0 + dy) * z + h),
+                                    fill=255, width=width)
+            self._lines[key] = np.asarray(im) > 0
+        return self._lines[key]
+
+    def outline(self, color, width):
+        # ImageDraw.rectangle((0, 0, W, H), outline=color, width=width) around the whole image
+        im = self.image()
+        ImageDraw.Draw(im).rectangle((0, 0, self.pixels.shape[1], self.pixels.shape[0]), outline=color, width=width)
+        self.pixels[:] = np.asarray(im)
+
+    def image(self):
+        # A PIL copy of the current picture (Pillow copies RGB arrays)
+        return Image.fromarray(self.pixels)
@@ -0,0 +1,126 @@
+"""
+Search instrumentation shared by the solvers.
+
+solve_bfs, find_shortest_path and solve_dijkstra_complex accept
+stats=SearchStats(). Without one they skip all bookkeeping beyond a couple
+of local integers.
+
+    stats = SearchStats(on_frontier=print, sample_every=50000)
+    path = find_shortest_path(img, src, dst, stats=stats)
+    print(stats.counters)   # searches, expanded, pops, pushes, relaxations, peak_frontier, ...
+    print(stats.timings)    # seconds per phase: weights, search, trace, render, ...
+
+Counters add up, so one SearchStats can be passed to many solves (e.g. all
+the segments of a gem-order plan) to get totals. Phase timings are
+exclusive: time spent rendering frames inside the search loop is counted
+under "render", and time in on_frontier under "sample", not "search".
+
+on_frontier(sample) is called every 'sample_every' queue pops with a dict
+describing the search at that moment (solver, pops, expanded,
+frontier_size, best_key, elapsed and the live frontier itself, which
+must not be modified).
+"""
+
+import time
+from contextlib import nullcontext
+
+_NO_PHASE = nullcontext()
+
+
+class SearchStats:
+    def __init__(self, on_frontier=None, sample_every=10000):
+        if sample_every < 1:
+            raise ValueError("sample_every must be at least 1")
+        self.counters = {}
+        self.timings = {}
+        self.on_frontier = on_frontier
+        self.sample_every = sample_every
+        self.samples = 0
+        self._stack = []  # open phases: [name, start of the current slice]
+        self._t0 = time.perf_counter()
+
+    def count(self, name, n=1):
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def peak(self, name, value):
+        # keeps the largest value seen, e.g. peak_frontier
+        if value > self.counters.get(name, 0):
+            self.counters[name] = value
+
+    def record_heap(self, pops, expanded, queued, peak, initial=1):
+        """
+        Counters for one heap-based search. Every push is either popped or
+        still queued, and every push after the initial ones improved a
+        label, so pushes and relaxations need no counting in the hot loop.
+        """
+        pushes = pops + queued
+        self.count("searches")
+        self.count("pops", pops)
+        self.count("expanded", expanded)
+        self.count("pushes", pushes)
+        self.count("relaxations", pushes - initial)
+        self.peak("peak_frontier", peak)
+
+    def add_time(self, name, seconds):
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def phase(self, name):
+        return _Phase(self, name)
+
+    def first_sample(self):
+        # pop count at which a solver should first call sample(), or -1 for never
+        return self.sample_every if self.on_frontier is not None else -1
+
+    def sample(self, solver, pops, expanded, frontier, best_key=None):
+        # the callback runs in its own "sample" phase, so it is not timed as search
+        self.samples += 1
+        with self.phase("sample"):
+            self._call_on_frontier(solver, pops, expanded, frontier, best_key)
+
+    def _call_on_frontier(self, solver, pops, expanded, frontier, best_key):
+        self.on_frontier({
+            "solver": solver,
+            "pops": pops,
+            "expanded": expanded,
+            "frontier_size": len(frontier),
+            "best_key": best_key,
+            "elapsed": time.perf_counter() - self._t0,
+            "frontier": frontier,
+        })
+
+    def as_dict(self):
+        return {"counters": dict(self.counters), "timings": dict(self.timings)}
+
+    def __repr__(self):
+        return f"SearchStats(counters={self.counters}, timings={self.timings})"
+
+
+class _Phase:
+    # Times one phase; entering a nested phase pauses the enclosing one
+    __slots__ = ("stats", "name")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        now = time.perf_counter()
+        stack = self.stats._stack
+        if stack:
+            outer = stack[-1]
+            self.stats.add_time(outer[0], now - outer[1])
+        stack.append([self.name, now])
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        now = time.perf_counter()
+        stack = self.stats._stack
+        name, start = stack.pop()
+        self.stats.add_time(name, now - start)
+        if stack:
+            stack[-1][1] = now
+
+
+def phase(stats, name):
+    # stats.phase(name), or a shared no-op context when stats is None
+    return _NO_PHASE if stats is None else stats.phase(name)
@@ -0,0 +1,319 @@
+"""
+Persistent, content-addressed cache of solver results.
+
+Pipelines send the same PNGs through Dijkstra.find_shortest_path and the
+same MazeMate levels through the gem planners again and again. A
+SolutionCache keeps each result on disk under a key hashed from
+everything that decides it: the maze content (grid or image pixels, plus
+start, end, gems, hearts, monsters and bridges), the query endpoints, the
+solver and its options, and the scoring parameters read from
+advanced_dijkstra (gem_score, hp_score, step_score, monster_stats). Any
+change to one of them gives a new key, never a stale hit.
+
+    cache = SolutionCache("maze_cache", max_bytes=256 * 2 ** 20)
+    path = cache.shortest_path(img, (25, 5), (9, 220), mode="astar")
+    path = cache.bfs(maze, gif='maze_sols/default_bfs_sol.gif')
+    path, score, order = cache.plan(maze, image='solved_path.png')
+
+Renders (BFS GIFs, plan images) are cached next to the result, so a hit
+writes the file without solving or drawing anything.
+
+Each entry is <key>.json plus one file per render, spread over 256
+subdirectories. Files are written under a temporary name and moved into
+place with os.replace, so several processes can share one directory: a
+reader sees a whole file or none. A hit refreshes the entry's mtime.
+Each process rescans the directory after storing a tenth of max_bytes
+and deletes the least recently used entries beyond max_bytes. A file
+that another process deletes under a reader is a miss.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+from maze import Maze, as_maze, grid_hash
+
+STALE_TEMP_SECONDS = 3600  # temporary files this old were left by a writer that died
+RESULT_NEUTRAL = ("solver", "workers", "verbose", "stats")  # options left out of the query (solver: see solver_name)
+
+
+def _canonical(value):
+    # JSON-ready form of a query value: tuples become lists, dicts sorted [key, value] pairs
+    if isinstance(value, dict):
+        return sorted(([_canonical(k), _canonical(v)] for k, v in value.items()), key=json.dumps)
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if hasattr(value, 'tolist'):  # NumPy arrays and scalars
+        return _canonical(value.tolist())
+    return value
+
+
+def _digest(value):
+    return hashlib.blake2b(json.dumps(_canonical(value)).encode(), digest_size=16).hexdigest()
+
+
+def scoring_params():
+    # the advanced_dijkstra settings every complex solve and plan depends on
+    import advanced_dijkstra
+
+    return {"gem_score": advanced_dijkstra.gem_score, "hp_score": advanced_dijkstra.hp_score,
+            "step_score": advanced_dijkstra.step_score, "monster_stats": advanced_dijkstra.monster_stats}
+
+
+def maze_digest(a):
+    """
+    Hex digest of everything a solver sees in 'a': the pixels of a cv2
+    image, the cells of a list of rows, or a Maze's (or .maze file's)
+    grid, image and entities.
+    """
+    a = as_maze(a)
+    if not isinstance(a, Maze):
+        return grid_hash(a)
+    entities = {"start": a.start, "end": a.end, "gems": a.gem_list(), "hearts": a.heart_list(),
+                "monsters": a.monster_dict(), "bridges": a.bridge_dict(),
+                "image": None if a.image is None else grid_hash(a.image)}
+    return _digest([a.content_hash(), entities])
+
+
+def solver_name(solver):
+    """
+    Stable identity of a planner solver for cache keys: the qualified name
+    of a function or method, the class of a callable instance (e.g.
+    incremental.IncrementalSolver), and for a functools.partial its
+    function and keywords other than 'stats'. Different solvers can find
+    different plans, so each gets its own entries.
+    """
+    import functools
+
+    if isinstance(solver, functools.partial):
+        keywords = {k: v for k, v in solver.keywords.items() if k != "stats"}
+        return [solver_name(solver.func), _canonical(list(solver.args)), _canonical(keywords)]
+    if not hasattr(solver, '__qualname__'):  # a callable instance
+        solver = type(solver)
+    return f"{solver.__module__}.{solver.__qualname__}"
+
+
+def solution_key(solver, digest, query):
+    # cache key of one solve: solver name, maze_digest() and the query/options dict
+    return _digest([solver, digest, query])
+
+
+def _points(path):
+    return [tuple(p) for p in path]
+
+
+def _remove(filename):
+    try:
+        os.remove(filename)
+        return True
+    except FileNotFoundError:  # another process got there first
+        return False
+
+
+class SolutionCache:
+    def __init__(self, directory, max_bytes=256 * 2 ** 20):
+        if max_bytes < 0:
+            raise ValueError("max_bytes must not be negative")
+        self.directory = os.path.expanduser(directory)
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self.hits = 0
+        self.misses = 0
+        self._written = None  # bytes stored since the last eviction scan (None: never scanned)
+
+    def _file(self, key, name):
+        return os.path.join(self.directory, key[:2], f"{key}.{name}")
+
+    def _write(self, filename, data):
+        # atomic: the data appears under 'filename' all at once or not at all
+        folder = os.path.dirname(filename) or '.'
+        os.makedirs(folder, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix='.tmp-', dir=folder)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp, filename)
+        except BaseException:
+            _remove(tmp)
+            raise
+
+    # --- raw entries ---
+
+    def load(self, key):
+        """
+        The result stored under 'key', or None. A hit marks the entry as
+        recently used.
+        """
+        filename = self._file(key, 'json')
+        try:
+            with open(filename, 'rb') as f:
+                result = json.loads(f.read())["result"]
+            os.utime(filename)
+        except (FileNotFoundError, ValueError, KeyError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def load_render(self, key, name):
+        # bytes of the render 'name' ("png", "gif", ...) stored with 'key', or None
+        try:
+            with open(self._file(key, name), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def store(self, key, result, renders=None):
+        """
+        Stores a JSON-serialisable result and optional renders ({name:
+        bytes}) under 'key'. Renders are written first, so an entry whose
+        .json exists is complete unless eviction removed a render since.
+        """
+        written = 0
+        for name, data in (renders or {}).items():
+            self._write(self._file(key, name), data)
+            written += len(data)
+        data = json.dumps({"result": result}).encode()
+        self._write(self._file(key, 'json'), data)
+        written += len(data)
+        if self._written is None or self._written + written > self.max_bytes // 10:
+            self.evict()
+        else:
+            self._written += written
+
+    def evict(self):
+        """
+        Deletes least recently used entries until at most max_bytes are
+        stored, plus temporary files left by dead writers. Safe while other
+        processes use the cache. Returns the number of entries deleted.
+        """
+        entries = {}  # key -> [mtime of its .json (0 if missing), bytes, files]
+        now = time.time()
+        for folder in os.scandir(self.directory):
+            if not folder.is_dir():
+                continue
+            for entry in os.scandir(folder.path):
+                try:
+                    st = entry.stat()
+                except FileNotFoundError:
+                    continue
+                if entry.name.startswith('.tmp-'):
+                    if now - st.st_mtime > STALE_TEMP_SECONDS:
+                        _remove(entry.path)
+                    continue
+                key, _, name = entry.name.partition('.')
+                record = entries.setdefault(key, [0.0, 0, []])
+                record[1] += st.st_size
+                record[2].append(entry.path)
+                if name == 'json':
+                    record[0] = st.st_mtime
+        total = sum(record[1] for record in entries.values())
+        removed = 0
+        # renders whose .json is gone sort first (mtime 0)
+        for mtime, size, files in sorted(entries.values(), key=lambda record: record[0]):
+            if total <= self.max_bytes:
+                break
+            for filename in sorted(files, key=lambda f: not f.endswith('.json')):  # .json first: no half hits
+                _remove(filename)
+            total -= size
+            removed += 1
+        self._written = 0
+        return removed
+
+    def clear(self):
+        for folder in os.scandir(self.directory):
+            if folder.is_dir():
+                for entry in os.scandir(folder.path):
+                    _remove(entry.path)
+
+    # --- cached solvers ---
+
+    def _render(self, key, name, filename, draw):
+        # writes the cached render to 'filename', or draws it and caches it; True if it was cached
+        data = self.load_render(key, name)
+        if data is None:
+            draw()
+            with open(filename, 'rb') as f:
+                self._write(self._file(key, name), f.read())
+            return False
+        self._write(filename, data)
+        return True
+
+    def shortest_path(self, img, src=None, dst=None, **options):
+        """
+        Dijkstra.find_shortest_path(img, src, dst, **options), cached.
+        'img' is a cv2 image, an image Maze or a .maze file. A 'stats'
+        option only sees the search on a miss.
+        """
+        from Dijkstra import find_shortest_path
+
+        query = {k: v for k, v in options.items() if k not in RESULT_NEUTRAL}
+        key = solution_key("dijkstra", maze_digest(img), {"src": src, "dst": dst, "options": query})
+        path = self.load(key)
+        if path is None:
+            path = find_shortest_path(img, src, dst, **options)
+            self.store(key, path)
+        return _points(path)
+
+    def bfs(self, maze, start=None, end=None, mode="queue", gif=None, duration=50, every=1, stats=None):
+        """
+        BreadthFirstSearch.solve_bfs(maze, start, end, mode), cached. With
+        'gif', a filename, the animation (frame_sinks.GifSink with
+        'duration' and 'every') is written there and cached too. 'stats' is
+        passed to the search on a miss and left untouched on a hit.
+        """
+        from BreadthFirstSearch import solve_bfs
+
+        key = solution_key("bfs", maze_digest(maze), {"start": start, "end": end, "mode": mode})
+        path = self.load(key)
+        if path is None:
+            path = solve_bfs(maze, start, end, mode=mode, stats=stats)
+            self.store(key, path)
+        if gif is not None:
+            def draw():
+                from frame_sinks import GifSink
+
+                with GifSink(gif, duration=duration, every=every) as sink:
+                    solve_bfs(maze, start, end, mode=mode, sink=sink)
+
+            self._render(key, f"{_digest([duration, every])[:8]}.gif", gif, draw)
+        return _points(path)
+
+    def plan(self, maze, planner="held_karp", start_hp=300, image=None, **options):
+        """
+        advanced_dijkstra.plan_<planner>(maze, start_hp=start_hp, **options),
+        cached: returns (best_path, best_score, best_sequence). 'maze' is a
+        Maze or .maze file. With 'image', a filename, generate_maze_image's
+        picture of the plan is written there and cached too.
+
+        The solver is part of the key (see solver_name), since solvers can
+        break ties between equally scored segments differently and so find
+        different plans. The 'workers', 'verbose' and 'stats' options are
+        not: they do not change the result. 'stats' is only used on a miss.
+        """
+        import advanced_dijkstra
+
+        maze = as_maze(maze)
+        if not isinstance(maze, Maze):
+            raise ValueError("SolutionCache.plan needs a Maze or a .maze file")
+        query = {k: v for k, v in options.items() if k not in RESULT_NEUTRAL}
+        query.update(planner=planner, start_hp=start_hp, scoring=scoring_params(),
+                     solver=solver_name(options.get("solver", advanced_dijkstra.solve_dijkstra_complex)))
+        key = solution_key("plan", maze_digest(maze), query)
+        result = self.load(key)
+        if result is None:
+            path, score, sequence = getattr(advanced_dijkstra, "plan_" + planner)(maze, start_hp=start_hp, **options)
+            result = [path, score, sequence]
+            self.store(key, result)
+        path, score, sequence = _points(result[0]), result[1], None if result[2] is None else tuple(_points(result[2]))
+        if image is not None and path:
+            def draw():
+                grid, start, end, gems, monsters, _ = advanced_dijkstra.unpack_plan(
+                    maze, options.get("start"), options.get("end"), options.get("gems"), options.get("monsters"),
+                    options.get("bridges"))
+                advanced_dijkstra.generate_maze_image(grid, path, monsters, gems, start, end, filename=image)
+
+            self._render(key, "png", image, draw)
+        return path, score, sequence
@@ -0,0 +1,7 @@
+import os
+import sys
+
+# the solvers import each other as top-level modules, as when run from Solvers/
+SOLVERS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, SOLVERS)
+os.environ.setdefault("MPLBACKEND", "Agg")
@@ -0,0 +1,44 @@
+import io
+import json
+
+import cv2
+import numpy as np
+
+from Dijkstra import find_shortest_path
+from batch_dijkstra import jobs_from_manifest, run_batch
+
+
+def write_manifest(tmp_path):
+    img = np.random.default_rng(0).integers(0, 8, size=(10, 12, 3), dtype=np.uint8)
+    cv2.imwrite(str(tmp_path / "a.png"), img)
+    lines = [{"image": "a.png", "src": [0, 0], "dst": [11, 9]},
+             {"image": "a.png", "id": "no_src", "dst": [11, 9]},  # fails on its own
+             {"image": "missing.png", "src": [0, 0], "dst": [1, 1]},
+             {"src": [0, 0], "dst": [1, 1]}]  # no image: skipped when loading
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text("".join(json.dumps(line) + "\n" for line in lines))
+    return str(manifest), img
+
+
+def test_bad_jobs_do_not_stop_the_batch(tmp_path, capsys):
+    manifest, img = write_manifest(tmp_path)
+    jobs = jobs_from_manifest(manifest)
+    assert len(jobs) == 3
+    assert "jobs.jsonl:4" in capsys.readouterr().err
+    out = io.StringIO()
+    summary = run_batch(jobs, str(tmp_path / "out"), workers=1, results=out, mode="full")
+    results = {r["id"]: r for r in map(json.loads, out.getvalue().splitlines())}
+    assert (summary["jobs"], summary["failed"]) == (3, 2)
+    assert not results["no_src"]["ok"] and "KeyError" in results["no_src"]["error"]
+    assert not results["missing"]["ok"]
+    assert results["a"]["path_length"] == len(find_shortest_path(img, (0, 0), (11, 9)))
+    with open(results["a"]["path_file"]) as f:
+        assert [tuple(p) for p in json.load(f)] == find_shortest_path(img, (0, 0), (11, 9))
+
+
+def test_csv_manifest(tmp_path, capsys):
+    (tmp_path / "jobs.csv").write_text("image,src_x,src_y,dst_x,dst_y\n# comment\na.png,0,0,11,9\nb.png,1\n")
+    jobs = jobs_from_manifest(str(tmp_path / "jobs.csv"))
+    assert [(j["src"], j["dst"]) for j in jobs] == [([0, 0], [11, 9])]
+    assert jobs[0]["image"] == str(tmp_path / "a.png")
+    assert "jobs.csv:4" in capsys.readouterr().err
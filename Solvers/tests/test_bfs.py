@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+from BreadthFirstSearch import solve_bfs
+from frame_sinks import ListSink
+from maze_generator import generate_maze
+
+MODES = ["queue", "wavefront"]
+
+
+def random_level(seed):
+    # a small random level with no bridges; the end is unreachable on some seeds
+    maze = generate_maze("random", width=13, height=11, seed=seed, wall_density=0.3)
+    return maze.grid.tolist(), maze.start, maze.end
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("seed", range(20))
+def test_modes_match_scan(mode, seed):
+    grid, start, end = random_level(seed)
+    assert solve_bfs(grid, start, end, mode=mode) == solve_bfs(grid, start, end, mode="scan")
+
+
+@pytest.mark.parametrize("mode", MODES)
+@pytest.mark.parametrize("seed", [2, 3, 4])  # levels where the end is reachable
+def test_frames_match_scan(mode, seed):
+    grid, start, end = random_level(seed)
+    frames = {}
+    for m in ("scan", mode):
+        sink = ListSink()
+        solve_bfs(grid, start, end, mode=m, sink=sink)
+        frames[m] = [np.asarray(im).tobytes() for im in sink.images]
+    assert frames["scan"]
+    assert frames[mode] == frames["scan"]
+
+
+def test_wall_endpoint():
+    assert solve_bfs([[0, 1], [0, 0]], (1, 0), (1, 1)) == []
@@ -0,0 +1,27 @@
+import pytest
+
+import advanced_dijkstra as ad
+from maze_generator import generate_maze
+
+
+@pytest.mark.parametrize("seed", range(8))
+def test_buckets_match_heapq(seed):
+    maze = generate_maze("rooms", 11, 11, seed=seed, gems=3, monster_density=0.06, bridges=2)
+    grid, bridges, monsters = maze.rows(), maze.bridge_dict(), maze.monster_dict()
+    for goal in maze.gem_list() + [maze.end]:
+        for hp in (60, 150, 300):
+            expected = ad.solve_dijkstra_complex(grid, maze.start, goal, hp, bridges, monsters)
+            assert ad.solve_dijkstra_complex(grid, maze.start, goal, hp, bridges, monsters, engine="buckets") == expected
+
+
+def test_unknown_engine():
+    maze = generate_maze("rooms", 11, 11, seed=0, gems=1)
+    with pytest.raises(ValueError):
+        ad.solve_dijkstra_complex(maze.rows(), maze.start, maze.end, 300, engine="radix")
+
+
+def test_buckets_need_integer_scores(monkeypatch):
+    maze = generate_maze("rooms", 11, 11, seed=0, gems=1)
+    monkeypatch.setattr(ad, "step_score", 0.5)
+    with pytest.raises(ValueError):
+        ad.solve_dijkstra_complex(maze.rows(), maze.start, maze.end, 300, engine="buckets")
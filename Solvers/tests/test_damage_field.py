@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+import advanced_dijkstra as ad
+from maze_generator import generate_maze
+
+
+def scanned_damage(x, y, monsters):
+    # the original per-step scan: contact damage plus the 8 surrounding monsters
+    damage = 0
+    if (x, y) in monsters:
+        stat = ad.monster_stats[monsters[(x, y)]]
+        damage += stat["damage"] * stat["freq"]
+    for sy in range(y - 1, y + 2):
+        for sx in range(x - 1, x + 2):
+            if (sx, sy) in monsters and (sx, sy) != (x, y):
+                damage += ad.monster_stats[monsters[(sx, sy)]]["damage"]
+    return damage
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_field_matches_scan(seed):
+    maze = generate_maze("rooms", 12, 10, seed=seed, monster_density=0.2)
+    monsters = dict(maze.monster_dict())
+    monsters[(-1, 3)] = "Dragon"  # monsters just outside the grid still reach its edge
+    field = ad.build_damage_field((10, 12), monsters)
+    assert field.tolist() == [[scanned_damage(x, y, monsters) for x in range(12)] for y in range(10)]
+
+
+def test_clear_monsters_patches_the_field():
+    maze = generate_maze("rooms", 12, 10, seed=1, monster_density=0.2)
+    grid, monsters = maze.rows(), maze.monster_dict()
+    field = ad.build_damage_field((10, 12), monsters)
+    path = list(monsters)[::2]
+    new_grid, remaining, new_field = ad.clear_monsters(grid, monsters, path, field)
+    assert set(remaining) == set(monsters) - set(path)
+    assert np.array_equal(new_field, ad.build_damage_field((10, 12), remaining))
+    assert all(new_grid[y][x] == 0 for x, y in path)
+    # the inputs are left untouched
+    assert len(monsters) == len(maze.monster_dict())
+    assert np.array_equal(field, ad.build_damage_field((10, 12), monsters))
+    assert grid == maze.rows()
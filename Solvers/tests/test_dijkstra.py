@@ -0,0 +1,64 @@
+import numpy as np
+import pytest
+
+from Dijkstra import down_right_weights, find_shortest_path, get_distance
+
+
+def path_cost(img, path):
+    # the summed get_distance of a [dst, ..., src] path (repeated points cost nothing)
+    cells = [p for i, p in enumerate(path) if i == 0 or p != path[i - 1]]
+    return sum(get_distance(img, (y1, x1), (y2, x2)) for (x1, y1), (x2, y2) in zip(cells, cells[1:]))
+
+
+def noise(seed, shape=(9, 12, 3)):
+    return np.random.default_rng(seed).integers(0, 8, size=shape, dtype=np.uint8)
+
+
+def test_weights_match_get_distance():
+    img = noise(0, (5, 7, 3))
+    down, right = down_right_weights(img)
+    for r in range(5):
+        for c in range(7):
+            assert down[r, c] == (get_distance(img, (r, c), (r + 1, c)) if r < 4 else np.inf)
+            assert right[r, c] == (get_distance(img, (r, c), (r, c + 1)) if c < 6 else np.inf)
+
+
+@pytest.mark.parametrize("store", ["list", "array"])
+@pytest.mark.parametrize("seed", range(5))
+def test_heapq_matches_legacy(seed, store):
+    img = noise(seed)
+    src, dst = (0, 0), (11, 8)
+    expected = path_cost(img, find_shortest_path(img, src, dst, engine="legacy"))
+    path = find_shortest_path(img, src, dst, store=store)
+    assert path[0] == dst and path[-1] == src
+    assert path_cost(img, path) == pytest.approx(expected)
+
+
+def test_stores_find_the_same_path():
+    img = noise(7, (20, 25, 3))
+    assert find_shortest_path(img, (3, 2), (24, 19), store="array") == find_shortest_path(img, (3, 2), (24, 19))
+    with pytest.raises(ValueError):
+        find_shortest_path(img, (3, 2), (24, 19), store="dict")
+
+
+@pytest.mark.parametrize("mode", ["early", "astar", "bidirectional"])
+@pytest.mark.parametrize("seed", range(5))
+def test_modes_match_full(seed, mode):
+    img = noise(seed, (15, 18, 3))
+    src, dst = (2, 1), (17, 14)
+    expected = path_cost(img, find_shortest_path(img, src, dst, mode="full"))
+    for store in ("list", "array"):
+        path = find_shortest_path(img, src, dst, store=store, mode=mode)
+        assert path[0] == dst and path[-1] == src
+        assert path_cost(img, path) == pytest.approx(expected)
+
+
+def test_same_source_and_target():
+    img = noise(0)
+    for mode in ("full", "early", "astar", "bidirectional"):
+        assert path_cost(img, find_shortest_path(img, (4, 4), (4, 4), mode=mode)) == 0
+
+
+def test_modes_need_the_heapq_engine():
+    with pytest.raises(ValueError):
+        find_shortest_path(noise(0), (0, 0), (1, 1), engine="legacy", mode="astar")
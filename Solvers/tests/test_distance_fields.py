@@ -0,0 +1,60 @@
+import pytest
+
+import maze_data_generated_mazemate as maze_data
+from BreadthFirstSearch import solve_bfs
+from distance_fields import DistanceFields, FieldCache
+from maze import BRIDGE, Maze
+from maze_generator import generate_maze
+
+
+def test_start_on_bridge_cell():
+    # the BFS demo's view of the bundled level starts on a value-2 cell
+    maze = Maze.from_module(maze_data, flip_y=False)
+    assert maze.cell(*maze.start) == BRIDGE
+    fields = DistanceFields(maze, FieldCache())
+    assert fields.path(maze.start, maze.end) == solve_bfs(maze)
+
+
+def test_wall_source_rejected():
+    maze = Maze([[0, 1], [0, 0]], start=(0, 0), end=(1, 1))
+    with pytest.raises(ValueError):
+        DistanceFields(maze, FieldCache()).path((1, 0), (1, 1))
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_paths_match_bfs(seed):
+    maze = generate_maze("random", 13, 11, seed=seed, wall_density=0.3)
+    grid = maze.grid.tolist()
+    expected = solve_bfs(grid, maze.start, maze.end)
+    fields = DistanceFields(grid, FieldCache())
+    assert fields.path(maze.start, maze.end) == expected
+    assert fields.distance(maze.start, maze.end) == (len(expected) - 1 if expected else None)
+
+
+def test_waypoints_and_matrix():
+    maze = generate_maze("rooms", 21, 21, seed=3, gems=3)
+    cache = FieldCache()
+    fields = DistanceFields(maze, cache)
+    points = fields.points_of_interest()
+    matrix = fields.distance_matrix()
+    for i, a in enumerate(points):
+        for j, b in enumerate(points):
+            assert matrix[i, j] == len(solve_bfs(maze, a, b)) - 1
+    legs = [solve_bfs(maze, a, b) for a, b in zip(points, points[1:])]
+    assert len(fields.waypoint_path(points)) == sum(len(leg) - 1 for leg in legs) + 1
+    assert cache.misses == len(points) and cache.hits > 0
+
+
+def test_cache_evicts_least_recently_used():
+    maze = generate_maze("rooms", 21, 21, seed=3)
+    fields = DistanceFields(maze, FieldCache())
+    size = fields.field(maze.start).nbytes
+    cache = FieldCache(max_bytes=2 * size)
+    fields = DistanceFields(maze, cache)
+    a, b, c = maze.start, maze.end, (2, 2)
+    fields.field(a), fields.field(b), fields.field(a), fields.field(c)
+    assert len(cache) == 2 and cache.nbytes <= 2 * size
+    fields.field(a)
+    assert cache.hits == 2  # a stayed, b was dropped
+    fields.field(b)
+    assert cache.misses == 4
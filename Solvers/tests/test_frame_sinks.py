@@ -0,0 +1,73 @@
+import pytest
+from PIL import Image
+
+from frame_sinks import ApngSink, DirectorySink, GifSink, ListSink, NullSink, open_sink
+
+
+def frames(n):
+    return [Image.new('RGB', (8, 6), (40 * i % 256, 0, 0)) for i in range(n)]
+
+
+def offer(sink, images):
+    for im in images:
+        if sink.wants():
+            sink.add(im)
+
+
+def test_every_and_max_frames():
+    sink = ListSink(every=3)
+    offer(sink, frames(10))
+    assert (sink.offered, sink.written) == (10, 4)  # frames 0, 3, 6, 9
+    sink = ListSink(every=2, max_frames=2)
+    offer(sink, frames(10))
+    assert sink.written == 2
+    assert sink.wants(final=True)  # the held final frame ignores both limits
+
+
+def test_closed_sink_rejects_frames():
+    with ListSink() as sink:
+        sink.add(frames(1)[0])
+    assert sink.closed
+    with pytest.raises(ValueError):
+        sink.add(frames(1)[0])
+
+
+def test_streamed_files(tmp_path):
+    for sink_type, name in ((GifSink, "a.gif"), (ApngSink, "a.png")):
+        filename = str(tmp_path / name)
+        with sink_type(filename, every=2) as sink:
+            offer(sink, frames(7))
+        sink.close()  # closing twice is harmless
+        with Image.open(filename) as im:
+            assert im.n_frames == 4
+            assert im.size == (8, 6)
+
+
+def test_open_sink(tmp_path):
+    assert isinstance(open_sink(None), NullSink)
+    assert isinstance(open_sink(str(tmp_path / "a.GIF")), GifSink)
+    assert isinstance(open_sink(str(tmp_path / "a.apng")), ApngSink)
+    assert isinstance(open_sink(str(tmp_path / "frames")), DirectorySink)
+    assert isinstance(open_sink(str(tmp_path / "frames.d") + "/"), DirectorySink)
+    with pytest.raises(ValueError):
+        open_sink(str(tmp_path / "out.gfi"))
+    assert not (tmp_path / "out.gfi").exists()
+
+
+def test_solves_in_threads_keep_their_own_frames():
+    from concurrent.futures import ThreadPoolExecutor
+
+    import numpy as np
+
+    from BreadthFirstSearch import solve_bfs
+
+    grids = [[[0, 0, 0, 0], [1, 1, 0, 1], [0, 0, 0, 0]], [[0, 1, 0], [0, 1, 0], [0, 0, 0]]]
+
+    def run(grid):
+        sink = ListSink()
+        path = solve_bfs(grid, (0, 0), (len(grid[0]) - 1, len(grid) - 1), sink=sink)
+        return path, [np.asarray(im).tobytes() for im in sink.images]
+
+    expected = [run(grid) for grid in grids]
+    with ThreadPoolExecutor(4) as pool:
+        assert list(pool.map(run, grids * 4)) == expected * 4
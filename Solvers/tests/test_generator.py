@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+import benchmark
+from BreadthFirstSearch import solve_bfs
+from maze_generator import generate_image_maze, generate_maze
+
+
+@pytest.mark.parametrize("kind", ["perfect", "rooms", "random"])
+def test_seeded(kind):
+    a = generate_maze(kind, 21, 15, seed=3, gems=3, monster_density=0.05, bridges=2)
+    b = generate_maze(kind, 21, 15, seed=3, gems=3, monster_density=0.05, bridges=2)
+    assert np.array_equal(a.grid, b.grid)
+    assert (a.start, a.end, a.gem_list(), a.monster_dict(), a.bridge_dict()) == \
+        (b.start, b.end, b.gem_list(), b.monster_dict(), b.bridge_dict())
+    assert not np.array_equal(a.grid, generate_maze(kind, 21, 15, seed=4).grid)
+    cells = [a.start, a.end] + a.gem_list() + list(a.monster_dict()) + list(a.bridge_dict())
+    assert len(set(cells)) == len(cells)  # entities sit on distinct cells
+
+
+def test_perfect_mazes_are_spanning_trees():
+    maze = generate_maze("perfect", 21, 21, seed=5)
+    open_ = maze.grid == 0
+    corridors = int((open_[1:] & open_[:-1]).sum() + (open_[:, 1:] & open_[:, :-1]).sum())
+    assert corridors == int(open_.sum()) - 1  # n open cells joined by n - 1 corridors, no loops
+    assert solve_bfs(maze)
+
+
+def test_image_maze():
+    maze = generate_image_maze(cells=3, scale=4, seed=1)
+    assert maze.image.shape == (28, 28, 3)
+    assert tuple(maze.image[maze.start[1], maze.start[0]]) == (255, 255, 255)
+    assert tuple(maze.image[maze.end[1], maze.end[0]]) == (255, 255, 255)
+
+
+def test_compare_reports():
+    old = {"results": {"a": {"seconds": 1.0, "peak_bytes": 100, "path_length": 9, "expanded": 50}}}
+    new = {"results": {"a": {"seconds": 1.1, "peak_bytes": 200, "path_length": 9, "expanded": 51}}}
+    problems = benchmark.compare_reports(old, new)
+    assert len(problems) == 2
+    assert problems[0].startswith("a: peak_bytes") and problems[1].startswith("a: expanded changed")
+
+
+def test_run_case():
+    record = benchmark.run_case("bfs", {"kind": "perfect", "width": 21, "height": 21, "seed": 1}, repeat=1)
+    assert record["path_length"] == len(solve_bfs(generate_maze("perfect", 21, 21, seed=1)))
+    assert record["cells"] == 21 * 21 and record["expanded"] > 0
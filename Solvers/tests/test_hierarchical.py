@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from BreadthFirstSearch import solve_bfs
+from Dijkstra import find_shortest_path, get_distance
+from hierarchical import HierarchicalGraph
+from maze_generator import generate_image_maze, generate_maze
+
+
+def is_walk(grid, path):
+    return all(grid[y][x] == 0 for x, y in path) and \
+        all(abs(x1 - x2) + abs(y1 - y2) == 1 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("kind, seed", [("rooms", s) for s in range(4)] + [("perfect", s) for s in range(4)])
+def test_grid_paths_are_near_bfs(kind, seed):
+    maze = generate_maze(kind, 41, 41, seed=seed, wall_density=0.04 if kind == "rooms" else None)
+    graph = HierarchicalGraph.from_grid(maze.grid, cluster_size=8)
+    expected = solve_bfs(maze)
+    path, cost = graph.path(maze.start, maze.end)
+    assert bool(path) == bool(expected)
+    if path:
+        assert (path[0], path[-1]) == (maze.start, maze.end) and is_walk(maze.rows(), path)
+        assert cost == len(path) - 1
+        assert len(expected) <= len(path) <= 1.25 * len(expected)
+
+
+def test_edits_match_a_new_graph():
+    maze = generate_maze("rooms", 41, 41, seed=2, wall_density=0.04)
+    graph = HierarchicalGraph.from_grid(maze.grid.copy(), cluster_size=8)
+    path, _ = graph.path(maze.start, maze.end)
+    edits = {path[len(path) // 2]: 1, path[len(path) // 3]: 1}
+    graph.edit_grid(edits)
+    grid = maze.grid.copy()
+    for (x, y), v in edits.items():
+        grid[y, x] = v
+    assert graph.path(maze.start, maze.end) == HierarchicalGraph.from_grid(grid, cluster_size=8).path(
+        maze.start, maze.end)
+    assert not set(edits) & set(graph.path(maze.start, maze.end)[0])
+
+
+def test_image_paths_cost_at_least_the_optimum():
+    maze = generate_image_maze(cells=6, scale=4, seed=1)
+    img = maze.image.copy()
+    img[::3] //= 2  # uneven weights
+    graph = HierarchicalGraph.from_image(img, cluster_size=16)
+    path, cost = graph.path(maze.start, maze.end)
+    assert cost == pytest.approx(sum(get_distance(img, (y1, x1), (y2, x2))
+                                     for (x1, y1), (x2, y2) in zip(path, path[1:])))
+    best = find_shortest_path(img, maze.start, maze.end)
+    optimum = sum(get_distance(img, (y1, x1), (y2, x2)) for (x1, y1), (x2, y2) in zip(best[1:], best[2:]))
+    assert optimum <= cost + 1e-9
+    assert graph.path(maze.start, maze.start) == ([maze.start], 0.0)
@@ -0,0 +1,28 @@
+import numpy as np
+import pytest
+
+import advanced_dijkstra as ad
+from BreadthFirstSearch import solve_bfs
+from incremental import IncrementalSolver, LPAStar
+from maze_generator import generate_maze
+
+
+@pytest.mark.parametrize("seed", [0, 2, 5, 28, 41])
+@pytest.mark.parametrize("monster_density", [0.06, 0.12])
+def test_plans_match_solve_dijkstra_complex(seed, monster_density):
+    # equally scored segments can pass different monsters, so ties must break the same way
+    maze = generate_maze("rooms", 11, 11, seed=seed, gems=3, monster_density=monster_density, bridges=2)
+    assert ad.plan_held_karp(maze, solver=IncrementalSolver()) == ad.plan_held_karp(maze)
+
+
+def test_repair_matches_new_search():
+    maze = generate_maze("random", 15, 15, seed=3, wall_density=0.3)
+    grid = maze.grid.copy()
+    search = LPAStar.from_grid(grid, maze.start, maze.end)
+    search.path()
+    walls = np.argwhere(grid == 1)[:20]
+    grid[walls[:, 0], walls[:, 1]] = 0
+    search.set_costs({(int(x), int(y)): 1.0 for y, x in walls})
+    expected = solve_bfs(grid.tolist(), maze.start, maze.end)
+    assert expected and len(search.path()) == len(expected)
+    assert search.path() == LPAStar.from_grid(grid, maze.start, maze.end).path()
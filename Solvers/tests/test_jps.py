@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+
+import maze_data_generated_mazemate as maze_data
+from BreadthFirstSearch import solve_bfs
+from incremental import LPAStar
+from jump_point_search import solve_jps
+from maze import BRIDGE, Maze
+from maze_generator import generate_maze
+
+
+def is_walk(grid, path, bridges):
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        if abs(x1 - x2) + abs(y1 - y2) != 1 or grid[y2][x2] == 1:
+            return False
+        if (x1, y1) in bridges and (bridges[(x1, y1)] == "NS") != (x1 == x2):
+            return False
+    return True
+
+
+def test_modes_agree_on_bridge_start():
+    # the BFS demo's view of the bundled level starts on a value-2 cell
+    maze = Maze.from_module(maze_data, flip_y=False)
+    assert maze.cell(*maze.start) == BRIDGE
+    expected = solve_bfs(maze, mode="scan")
+    assert expected
+    for mode in ("queue", "wavefront"):
+        assert solve_bfs(maze, mode=mode) == expected
+    assert len(solve_bfs(maze, mode="jps")) == len(expected)
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_length_matches_bfs(seed):
+    maze = generate_maze("rooms", 21, 21, seed=seed, wall_density=0.2)
+    grid = maze.grid.tolist()
+    expected = solve_bfs(grid, maze.start, maze.end)
+    path = solve_jps(grid, maze.start, maze.end)
+    assert len(path) == len(expected)
+    assert not path or (path[0], path[-1]) == (maze.start, maze.end) and is_walk(grid, path, {})
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_bridges(seed):
+    # bridges are only left along their orientation; LPA* over unit costs follows the same rules
+    maze = generate_maze("rooms", 21, 21, seed=seed, bridges=6)
+    bridges = maze.bridge_dict()
+    assert bridges
+    costs = np.where((maze.grid == 0) | (maze.grid == BRIDGE), 1.0, np.inf)
+    expected = LPAStar(costs, maze.start, maze.end, bridges, min_cost=1.0).path()
+    path = solve_jps(maze)
+    assert len(path) == len(expected)
+    assert not path or is_walk(maze.rows(), path, bridges)
+
+
+def test_wall_endpoint_rejected():
+    assert solve_jps([[0, 1], [0, 0]], (1, 0), (1, 1)) == []
@@ -0,0 +1,57 @@
+import pytest
+
+import advanced_dijkstra as ad
+from BreadthFirstSearch import solve_bfs
+from junction_graph import JunctionGraph, binarise
+from maze_generator import generate_image_maze, generate_maze
+
+
+def is_walk(path):
+    return all(abs(x1 - x2) + abs(y1 - y2) == 1 for (x1, y1), (x2, y2) in zip(path, path[1:]))
+
+
+@pytest.mark.parametrize("kind, seed", [("rooms", s) for s in (1, 2, 3)] + [("perfect", s) for s in range(3)])
+def test_grid_paths_match_bfs(kind, seed):
+    maze = generate_maze(kind, 41, 41, seed=seed, wall_density=0.04 if kind == "rooms" else None)
+    path = JunctionGraph.from_grid(maze).shortest_path(maze.start, maze.end)
+    expected = solve_bfs(maze)
+    assert len(path) == len(expected)
+    assert (path[0], path[-1]) == (maze.start, maze.end) and is_walk(path)
+    assert all(maze.grid[y, x] == 0 for x, y in path)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_planner_segments_match_dijkstra(seed):
+    # equal-length routes may cross different monsters, so only each segment is compared
+    maze = generate_maze("rooms", 11, 11, seed=seed, gems=3, monster_density=0.06, bridges=2)
+    graph = JunctionGraph.from_level(maze)
+    segments = []
+
+    def both(*args):
+        expected = ad.solve_dijkstra_complex(*args)
+        result = graph.solve_complex(*args)
+        segments.append((result and (len(result[0]), result[1]), expected and (len(expected[0]), expected[1])))
+        if result:
+            assert (result[0][0], result[0][-1]) == args[1:3] and is_walk(result[0])
+        return expected
+
+    ad.plan_held_karp(maze, solver=both)
+    assert segments and all(got == expected for got, expected in segments)
+    path, score, order = ad.plan_held_karp(maze, solver=graph.solve_complex)
+    assert (order is None) == (ad.plan_held_karp(maze)[2] is None)
+    if order is not None:
+        assert path[0] == maze.start and path[-1] == maze.end and is_walk(path)
+
+
+def test_image_paths_match_bfs():
+    maze = generate_image_maze(cells=6, scale=4, seed=1)
+    path = JunctionGraph.from_image(maze).shortest_path(maze.start, maze.end)
+    expected = solve_bfs(binarise(maze.image), maze.start, maze.end)
+    assert path and len(path) == len(expected)
+
+
+def test_unknown_node():
+    maze = generate_maze("perfect", 21, 21, seed=0)
+    graph = JunctionGraph.from_grid(maze)
+    with pytest.raises(ValueError):
+        graph.shortest_path(maze.start, (0, 0))
@@ -0,0 +1,74 @@
+import pytest
+
+import advanced_dijkstra as ad
+from maze_generator import generate_maze
+
+
+def route(field, path, hp):
+    # (score, hp) of a path, or None if some step is not survivable
+    score = 0
+    for x, y in path[1:]:
+        hp -= int(field[y, x])
+        if hp <= 0:
+            return None
+        score -= int(field[y, x]) * ad.hp_score + ad.step_score
+    return score, hp
+
+
+def best_route(grid, monsters, field, start, end, hp):
+    # exhaustive search over simple paths (revisiting a tile never helps)
+    rows, cols = len(grid), len(grid[0])
+    best = None
+    path = [start]
+
+    def walk(x, y, hp):
+        nonlocal best
+        if (x, y) == end:
+            score = route(field, path, hp0)[0]
+            best = score if best is None else max(best, score)
+            return
+        for nx, ny in ((x, y - 1), (x - 1, y), (x, y + 1), (x + 1, y)):
+            if 0 <= nx < cols and 0 <= ny < rows and (nx, ny) not in path \
+                    and (grid[ny][nx] != 1 or (nx, ny) in monsters) and hp - field[ny, nx] > 0:
+                path.append((nx, ny))
+                walk(nx, ny, hp - field[ny, nx])
+                path.pop()
+
+    hp0 = hp
+    walk(*start, hp)
+    return best
+
+
+@pytest.mark.parametrize("seed", range(12))
+def test_labels_find_the_best_survivable_route(seed):
+    maze = generate_maze("random", 6, 5, seed=seed, wall_density=0.1, monster_density=0.1)
+    grid, monsters = maze.rows(), maze.monster_dict()
+    field = ad.build_damage_field((5, 6), monsters)
+    for hp in (60, 100, 160):
+        expected = best_route(grid, monsters, field, maze.start, maze.end, hp)
+        result = ad.solve_dijkstra_labels(grid, maze.start, maze.end, hp, {}, monsters)
+        if expected is None:
+            assert result is None
+            continue
+        path, new_hp = result
+        assert route(field, path, hp) == (expected, new_hp)
+        complex_result = ad.solve_dijkstra_complex(grid, maze.start, maze.end, hp, {}, monsters)
+        if complex_result is not None:
+            assert route(field, complex_result[0], hp)[0] <= expected
+
+
+def test_keeps_routes_that_need_hp_later():
+    # the single-label solver spends HP early and finds no survivable plan here
+    maze = generate_maze("rooms", 11, 11, seed=164, gems=2, monster_density=0.12, bridges=2)
+    assert ad.plan_held_karp(maze, start_hp=160)[1] == -float('inf')
+    path, score, sequence = ad.plan_held_karp(maze, start_hp=160, solver=ad.solve_dijkstra_labels)
+    assert (score, sequence) == (480, ((7, 9), (5, 6)))
+
+
+def test_front_is_non_dominated():
+    maze = generate_maze("rooms", 11, 11, seed=164, gems=2, monster_density=0.12, bridges=2)
+    front = ad.solve_dijkstra_labels(maze, maze.start, maze.end, 300, return_front=True)
+    assert front
+    assert [s for _, _, s in front] == sorted((s for _, _, s in front), reverse=True)
+    for i, (_, hp, score) in enumerate(front):
+        assert not any(s >= score and h >= hp for j, (_, h, s) in enumerate(front) if j != i)
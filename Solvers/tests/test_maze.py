@@ -0,0 +1,39 @@
+import numpy as np
+
+import advanced_dijkstra as ad
+import maze_data_generated_mazemate as maze_data
+from BreadthFirstSearch import solve_bfs
+from maze import PATH, Maze
+
+
+def test_from_module_flips_y():
+    height = len(maze_data.maze_grid)
+    maze = Maze.from_module(maze_data)
+    assert maze.start == (maze_data.start[0], height - 1 - maze_data.start[1])
+    assert maze.gem_list() == [(x, height - 1 - y) for x, y in maze_data.gem_positions]
+    assert maze.monster_dict() == {(x, height - 1 - y): t for (x, y), t in maze_data.monster_types.items()}
+    unflipped = Maze.from_module(maze_data, flip_y=False)
+    assert unflipped.start == tuple(maze_data.start)
+    assert unflipped.rows() == maze_data.maze_grid
+
+
+def test_overlays_leave_the_base_alone():
+    maze = Maze.from_module(maze_data)
+    before = maze.grid.copy()
+    wall = tuple(int(v) for v in np.argwhere(before == 1)[0][::-1])
+    opened = maze.open_cells([wall])
+    assert opened.cell(*wall) == PATH and opened.grid[wall[1], wall[0]] == PATH
+    assert np.array_equal(maze.grid, before)
+    assert opened.content_hash() != maze.content_hash()
+    monster = next(iter(maze.monster_dict()))
+    cleared = maze.without_monsters([monster])
+    assert monster not in cleared.monster_dict() and cleared.cell(*monster) == PATH
+    assert monster in maze.monster_dict()
+
+
+def test_solvers_accept_a_maze():
+    maze = Maze.from_module(maze_data, flip_y=False)
+    assert solve_bfs(maze, mode="scan") == solve_bfs(maze.rows(), maze.start, maze.end, mode="scan")
+    maze = Maze.from_module(maze_data)
+    assert ad.plan_held_karp(maze) == ad.plan_held_karp(maze.rows(), maze.start, maze.end, maze.gem_list(),
+                                                        maze.monster_dict(), maze.bridge_dict())
@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+import advanced_dijkstra as ad
+import maze_cli
+from BreadthFirstSearch import solve_bfs
+from maze_file import save_maze
+from maze_generator import generate_maze
+
+
+@pytest.fixture
+def level(tmp_path):
+    maze = generate_maze("rooms", 11, 11, seed=1, gems=3, monster_density=0.06, bridges=2)
+    filename = str(tmp_path / "level.maze")
+    save_maze(maze, filename)
+    return maze, filename
+
+
+def test_bfs_json(level, capsys):
+    maze, filename = level
+    assert maze_cli.main(["bfs", filename, "--json", "--mode", "wavefront"]) == 0
+    result = json.loads(capsys.readouterr().out)
+    assert [tuple(p) for p in result["path"]] == solve_bfs(maze)
+
+
+def test_plan_json_with_image(level, tmp_path, capsys):
+    maze, filename = level
+    image = tmp_path / "solved.png"
+    assert maze_cli.main(["plan", filename, "--json", "--image", str(image)]) == 0
+    result = json.loads(capsys.readouterr().out)  # the image message went to stderr
+    path, score, order = ad.plan_held_karp(maze)
+    assert result == {"score": score, "order": [list(p) for p in order], "path": [list(p) for p in path]}
+    assert image.exists()
+
+
+def test_bad_file(tmp_path, capsys):
+    assert maze_cli.main(["bfs", str(tmp_path / "missing.maze")]) == 2
+    assert capsys.readouterr().err.startswith("error:")
+    assert maze_cli.main(["plan", str(tmp_path / "level.txt")]) == 2
+
+
+def test_stats_with_cache(level, tmp_path, capsys):
+    _, filename = level
+    argv = ["plan", filename, "--stats", "--cache", str(tmp_path / "cache")]
+    assert maze_cli.main(argv) == 0
+    first = capsys.readouterr()
+    assert "cache hit" not in first.err
+    assert maze_cli.main(argv) == 0
+    second = capsys.readouterr()
+    assert second.out == first.out
+    assert "stats: cache hit, nothing was solved" in second.err
@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+
+import advanced_dijkstra as ad
+import maze_data_generated_mazemate as maze_data
+from maze import Maze
+from maze_file import convert_module, load_maze, save_maze
+from maze_generator import generate_image_maze, generate_maze
+
+
+def same_level(a, b):
+    return (np.array_equal(a.grid, b.grid) and (a.start, a.end) == (b.start, b.end)
+            and a.gem_list() == b.gem_list() and a.heart_list() == b.heart_list()
+            and a.monster_dict() == b.monster_dict() and a.bridge_dict() == b.bridge_dict())
+
+
+def test_round_trip(tmp_path):
+    maze = generate_maze("rooms", 17, 13, seed=4, gems=3, monster_density=0.05, bridges=3)
+    maze.hearts = [(1, 1)]
+    save_maze(maze, str(tmp_path / "a.maze"))
+    loaded = load_maze(str(tmp_path / "a.maze"))
+    assert same_level(loaded, maze)
+    assert not loaded.grid.flags.writeable  # mapped read-only by default
+
+
+def test_module_conversion_stores_row_indices(tmp_path):
+    # the file holds the flipped coordinates advanced_dijkstra uses, not MazeMate's
+    filename = str(tmp_path / "level.maze")
+    convert_module(maze_data.__file__, filename)
+    loaded = load_maze(filename)
+    assert same_level(loaded, Maze.from_module(maze_data))
+    height = len(maze_data.maze_grid)
+    assert loaded.start == (maze_data.start[0], height - 1 - maze_data.start[1])
+    assert ad.plan_held_karp(filename) == ad.plan_held_karp(Maze.from_module(maze_data))
+
+
+def test_image_round_trip(tmp_path):
+    maze = generate_image_maze(cells=4, scale=3)
+    save_maze(maze, str(tmp_path / "img.maze"))
+    loaded = load_maze(str(tmp_path / "img.maze"))
+    assert np.array_equal(loaded.image, maze.image)
+    assert (loaded.start, loaded.end) == (maze.start, maze.end)
+
+
+def test_overlay_is_saved_with_its_edits(tmp_path):
+    maze = Maze.from_module(maze_data).open_cells([(0, 0)])
+    save_maze(maze, str(tmp_path / "a.maze"))
+    assert load_maze(str(tmp_path / "a.maze")).cell(0, 0) == 0
+
+
+def test_not_a_maze_file(tmp_path):
+    (tmp_path / "x.maze").write_bytes(b"not a maze")
+    with pytest.raises(ValueError):
+        load_maze(str(tmp_path / "x.maze"))
@@ -0,0 +1,65 @@
+import asyncio
+import json
+
+import maze_data_generated_mazemate as maze_data
+from BreadthFirstSearch import solve_bfs
+from maze import Maze
+from maze_file import save_maze
+from path_service import PathService, solve_batch
+
+
+class _Writer:
+    # the parts of asyncio.StreamWriter that PathService.handle uses
+    def __init__(self):
+        self.data = b""
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _serve(lines):
+    async def run():
+        service = PathService(workers=1, batch_window=0.0)
+        reader = asyncio.StreamReader()
+        reader.feed_data("".join(line + "\n" for line in lines).encode())
+        reader.feed_eof()
+        writer = _Writer()
+        try:
+            await asyncio.wait_for(service.handle(reader, writer), 60)
+        finally:
+            service.close()
+        return [json.loads(line) for line in writer.data.decode().splitlines()]
+    return asyncio.run(run())
+
+
+def test_bfs_from_bridge_start(tmp_path):
+    maze = Maze.from_module(maze_data, flip_y=False)
+    filename = str(tmp_path / "level.maze")
+    save_maze(maze, filename)
+    [result] = solve_batch("bfs", filename, [{}])
+    assert result["ok"], result
+    assert [tuple(p) for p in result["result"]["path"]] == solve_bfs(maze)
+
+
+def test_every_line_gets_one_response():
+    responses = _serve(['[1, 2]', '"text"', 'not json', '{"id": 7, "op": "nope", "maze": "x"}',
+                        '{"id": 8, "op": "stats"}'])
+    assert len(responses) == 5
+    assert sum(not r["ok"] for r in responses) == 4
+    assert {r.get("id") for r in responses} >= {7, 8}
+
+
+def test_malformed_query_fails_alone(tmp_path):
+    maze = Maze.from_module(maze_data, flip_y=False)
+    filename = str(tmp_path / "level.maze")
+    save_maze(maze, filename)
+    queries = [{}, {"start": 5}, {"start": ["a", None]}, {"start": list(maze.end), "end": list(maze.start)}]
+    results = solve_batch("bfs", filename, queries)
+    assert [r["ok"] for r in results] == [True, False, False, True]
+    assert [tuple(p) for p in results[0]["result"]["path"]] == solve_bfs(maze)
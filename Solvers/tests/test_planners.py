@@ -0,0 +1,29 @@
+import pytest
+
+import advanced_dijkstra as ad
+from maze_generator import generate_maze
+
+
+def level(seed):
+    return generate_maze("rooms", width=11, height=11, seed=seed, gems=3, monster_density=0.06, bridges=2)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_held_karp_matches_permutations(seed):
+    maze = level(seed)
+    assert ad.plan_held_karp(maze) == ad.plan_permutations(maze)
+
+
+def test_unsurvivable_level():
+    maze = generate_maze("rooms", 11, 11, seed=164, gems=2, monster_density=0.12, bridges=2)
+    assert ad.plan_held_karp(maze, start_hp=160) == ad.plan_permutations(maze, start_hp=160) == ([], -float('inf'), None)
+
+
+@pytest.mark.parametrize("seed", range(6))
+def test_prefix_tree_matches_permutations(seed, monkeypatch):
+    maze = level(seed)
+    expected = ad.plan_permutations(maze)
+    assert ad.plan_prefix_tree(maze, workers=2) == expected
+    # without workers no process pool is started
+    monkeypatch.setattr(ad, "ProcessPoolExecutor", None)
+    assert ad.plan_prefix_tree(maze) == expected
@@ -0,0 +1,51 @@
+import numpy as np
+from PIL import Image, ImageDraw
+
+import advanced_dijkstra as ad
+from maze_generator import generate_maze
+from raster import TileCanvas, shape_mask
+
+ZOOM = 12
+
+
+def reference(grid, path):
+    # the same picture drawn cell by cell with ImageDraw
+    rows, cols = grid.shape
+    im = Image.new('RGB', (cols * ZOOM, rows * ZOOM), (255, 255, 255))
+    draw = ImageDraw.Draw(im)
+    for y in range(rows):
+        for x in range(cols):
+            if grid[y, x] == 1:
+                draw.rectangle([x * ZOOM, y * ZOOM, (x + 1) * ZOOM, (y + 1) * ZOOM], fill=(0, 0, 0))
+            elif grid[y, x] == 2:
+                draw.ellipse([x * ZOOM + 3, y * ZOOM + 3, (x + 1) * ZOOM - 3, (y + 1) * ZOOM - 3], fill=(0, 0, 255))
+    h = ZOOM // 2
+    for (x0, y0), (x1, y1) in zip(path, path[1:]):
+        draw.line((x0 * ZOOM + h, y0 * ZOOM + h, x1 * ZOOM + h, y1 * ZOOM + h), fill=(255, 0, 0), width=3)
+    return np.asarray(im)
+
+
+def test_canvas_matches_imagedraw():
+    maze = generate_maze("rooms", 21, 15, seed=3, wall_density=0.1)
+    grid = maze.grid.copy()
+    grid[2, 3] = grid[5, 7] = 2
+    path = [(0, 0), (1, 0), (2, 0), (2, 1), (2, 2), (1, 2), (1, 1)]
+    canvas = TileCanvas(*grid.shape, ZOOM)
+    canvas.fill_cells(grid == 1, (0, 0, 0), overflow=True)
+    ys, xs = np.nonzero(grid == 2)
+    canvas.stamp(ys, xs, shape_mask(ZOOM, "ellipse", (3, 3, ZOOM - 3, ZOOM - 3)), (0, 0, 255))
+    # a growing path is drawn in pieces
+    canvas.draw_path(path[:3], (255, 0, 0), width=3)
+    canvas.draw_path(path, (255, 0, 0), width=3)
+    assert canvas.segments == len(path) - 1
+    assert np.array_equal(np.asarray(canvas.image()), reference(grid, path))
+
+
+def test_solution_image_size(tmp_path):
+    maze = generate_maze("rooms", 11, 9, seed=1, gems=2, monster_density=0.06)
+    filename = tmp_path / "solved.png"
+    ad.generate_maze_image(maze.grid, [maze.start, maze.end], maze.monster_dict(), maze.gem_list(), maze.start,
+                           maze.end, filename=str(filename))
+    with Image.open(filename) as im:
+        assert im.size == (11 * 40, 9 * 40)
+        assert im.getpixel((maze.start[0] * 40 + 2, maze.start[1] * 40 + 2))[:3] == (0, 128, 0)
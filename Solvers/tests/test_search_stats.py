@@ -0,0 +1,57 @@
+import time
+
+import numpy as np
+import pytest
+
+import advanced_dijkstra as ad
+from BreadthFirstSearch import solve_bfs
+from Dijkstra import find_shortest_path
+from maze_generator import generate_maze
+from search_stats import SearchStats, phase
+
+
+def test_phases_are_exclusive():
+    stats = SearchStats()
+    with stats.phase("search"):
+        time.sleep(0.01)
+        with stats.phase("render"):
+            time.sleep(0.03)
+    assert stats.timings["render"] >= 0.03
+    assert 0.01 <= stats.timings["search"] < 0.03
+    with phase(None, "search"):  # no stats: nothing to record
+        pass
+
+
+def test_results_do_not_change():
+    maze = generate_maze("rooms", 21, 21, seed=2, gems=2, monster_density=0.05)
+    for mode in ("queue", "scan", "wavefront", "jps"):
+        stats = SearchStats()
+        assert solve_bfs(maze, mode=mode, stats=stats) == solve_bfs(maze, mode=mode)
+        assert stats.counters["searches"] == 1 and stats.counters["expanded"] > 0
+    img = np.random.default_rng(0).integers(0, 8, size=(9, 12, 3), dtype=np.uint8)
+    stats = SearchStats()
+    assert find_shortest_path(img, (0, 0), (11, 8), stats=stats) == find_shortest_path(img, (0, 0), (11, 8))
+    assert stats.counters["expanded"] == 9 * 12  # full mode settles every pixel
+    assert stats.counters["pushes"] == stats.counters["pops"]  # nothing left queued
+
+
+def test_frontier_samples():
+    maze = generate_maze("rooms", 31, 31, seed=1)
+    samples = []
+    stats = SearchStats(on_frontier=samples.append, sample_every=20)
+    ad.solve_dijkstra_complex(maze, maze.start, maze.end, 300, stats=stats)
+    assert samples and stats.samples == len(samples)
+    assert [s["pops"] for s in samples] == sorted(s["pops"] for s in samples)
+    assert "sample" in stats.timings  # the callback is not timed as search
+    with pytest.raises(ValueError):
+        SearchStats(sample_every=0)
+
+
+@pytest.mark.parametrize("planner", ["permutations", "held_karp", "prefix_tree"])
+def test_planner_stats(planner):
+    maze = generate_maze("rooms", 11, 11, seed=0, gems=3, monster_density=0.06, bridges=2)
+    stats = SearchStats()
+    plan = getattr(ad, "plan_" + planner)
+    assert plan(maze, stats=stats) == ad.plan_permutations(maze)
+    assert stats.counters["segments"] > 0
+    assert "plan" in stats.timings
@@ -0,0 +1,60 @@
+import functools
+import os
+
+from BreadthFirstSearch import solve_bfs
+from advanced_dijkstra import plan_held_karp, plan_permutations, solve_dijkstra_complex, solve_dijkstra_labels
+from incremental import IncrementalSolver
+from maze_generator import generate_maze
+from solution_cache import SolutionCache, solver_name
+
+
+def test_round_trip(tmp_path):
+    maze = generate_maze("rooms", width=11, height=11, seed=1, gems=2, monster_density=0.05)
+    cache = SolutionCache(tmp_path)
+    expected = solve_bfs(maze)
+    assert cache.bfs(maze) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert SolutionCache(tmp_path).bfs(maze) == expected  # read back from disk
+    path, score, sequence = plan_permutations(maze)
+    assert cache.plan(maze, "permutations") == (path, score, tuple(sequence))
+    assert cache.plan(maze, "permutations") == (path, score, tuple(sequence))
+    assert (cache.hits, cache.misses) == (1, 2)
+    assert cache.bfs(maze, mode="scan") == expected  # another query, another key
+    assert cache.misses == 3
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = SolutionCache(tmp_path)
+    keys = [f"{i:02x}" * 16 for i in range(6)]
+    for key in keys:
+        cache.store(key, list(range(40)))  # ~140 bytes each
+        os.utime(cache._file(key, 'json'), (0, keys.index(key)))  # distinct mtimes, oldest first
+    cache.load(keys[0])  # refreshes the oldest entry
+    cache.max_bytes = 600
+    assert cache.evict() > 0
+    stored = sum(os.path.getsize(os.path.join(folder, f)) for folder, _, files in os.walk(tmp_path) for f in files)
+    assert stored <= 600
+    assert cache.load(keys[0]) is not None
+    assert cache.load(keys[1]) is None
+    assert cache.load(keys[-1]) is not None
+
+
+def test_solvers_get_their_own_entries(tmp_path):
+    # the two solvers break ties differently: only the labels solver survives this level
+    maze = generate_maze("rooms", 11, 11, seed=164, gems=2, monster_density=0.12, bridges=2)
+    cache = SolutionCache(tmp_path)
+    assert cache.plan(maze, start_hp=160)[1:] == (-float('inf'), None)
+    expected = plan_held_karp(maze, start_hp=160, solver=solve_dijkstra_labels)
+    assert expected[1] > 0
+    assert cache.plan(maze, start_hp=160, solver=solve_dijkstra_labels) == expected
+    assert (cache.hits, cache.misses) == (0, 2)
+
+
+def test_solver_name():
+    assert solver_name(solve_dijkstra_complex) == "advanced_dijkstra.solve_dijkstra_complex"
+    assert solver_name(IncrementalSolver()) == "incremental.IncrementalSolver"
+    # stats do not change the result, an engine could
+    assert solver_name(functools.partial(solve_dijkstra_complex, stats=object())) == \
+        solver_name(functools.partial(solve_dijkstra_complex))
+    assert solver_name(functools.partial(solve_dijkstra_complex, engine="buckets")) != \
+        solver_name(functools.partial(solve_dijkstra_complex))
@@ -0,0 +1,73 @@
+"""
+Vectorised BFS wavefront for plain 0/1 grids.
+
+solve_bfs's queue mode handles one cell per Python loop iteration. Here a
+whole BFS level is a handful of NumPy operations on the frontier's cell
+indices: step every frontier cell in the four directions, keep the open
+cells not labelled yet, and label them all at once. The labels use
+solve_bfs's convention (the distance map 'm': 0 = not reached, start = 1,
+a cell k steps away = k + 1), so backtracking and frames work unchanged:
+
+    m = np.zeros(rows * cols, dtype=np.int32)
+    m[start] = 1
+    for label, cells in wavefront_levels(free, cols, start, m):
+        if m[end]:
+            break
+
+    dist = distance_map(grid, (x, y))     # steps, -1 where unreachable
+
+Each level costs a few NumPy calls however small it is, so this pays off
+on open floors and rooms (wide wavefronts, few levels). In one-cell-wide
+corridor mazes the levels are tiny and solve_bfs's queue mode is faster.
+"""
+
+import numpy as np
+
+from maze import PATH
+
+
+def wavefront_levels(free, cols, start, m):
+    """
+    Labels 'm' (flat int32, updated in place) level by level from the flat
+    cell index 'start' over the flat bool array 'free' (open cells), and
+    yields (label, cells) for each level, 'cells' being the flat indices
+    that just got 'label'. Stops when no new cells are reached.
+    """
+    n = len(free)
+    last_row = n - cols
+    frontier = np.array([start], dtype=np.intp)
+    label = int(m[start])
+    while True:
+        label += 1
+        column = frontier % cols
+        step = np.concatenate((frontier[frontier >= cols] - cols, frontier[column > 0] - 1,
+                               frontier[frontier < last_row] + cols, frontier[column < cols - 1] + 1))
+        step = step[free[step]]
+        step = step[m[step] == 0]
+        # a cell reached from several frontier cells appears several times:
+        # write distinct negative tags into m and keep the entry whose tag stuck
+        tags = -np.arange(1, len(step) + 1, dtype=np.int32)
+        m[step] = tags
+        step = step[m[step] == tags]
+        if not len(step):
+            return
+        m[step] = label
+        yield label, step
+        frontier = step
+
+
+def distance_map(grid, source):
+    """
+    Steps from 'source' ((x, y)) to every cell of a 0/1 grid (only 0 cells
+    are open), as an int32 array indexed [y, x] with -1 for walls and
+    unreachable cells.
+    """
+    grid = np.asarray(grid)
+    rows, cols = grid.shape
+    x, y = source
+    m = np.zeros(rows * cols, dtype=np.int32)
+    m[y * cols + x] = 1
+    for _ in wavefront_levels((grid == PATH).ravel(), cols, y * cols + x, m):
+        pass
+    m -= 1
+    return m.reshape(rows, cols)
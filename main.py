@@ -1,16 +1,19 @@
-# This is a sample Python script.
+"""
+Entry point for the maze solvers; forwards to Solvers/maze_cli.py.
 
-# Press Shift+F10 to execute it or replace it with your code.
-# Press Double Shift to search everywhere for classes, files, tool windows, actions, and settings.
+    python main.py bfs Solvers/maze_data_generated_mazemate.py --no-flip
+    python main.py plan level.maze --image solved_path.png
+    python main.py bench startup
+"""
 
+import os
+import sys
 
-def print_hi(name):
-    # Use a breakpoint in the code line below to debug your script.
-    print(f'Hi, {name}')  # Press Ctrl+F8 to toggle the breakpoint.
+# the solvers import each other as top-level modules
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "Solvers"))
 
 
-# Press the green button in the gutter to run the script.
 if __name__ == '__main__':
-    print_hi('PyCharm')
+    import maze_cli
 
-# See PyCharm help at https://www.jetbrains.com/help/pycharm/
+    sys.exit(maze_cli.main())